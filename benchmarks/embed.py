@@ -0,0 +1,76 @@
+"""
+Compare the template-based embed factory against the previous dict-based path.
+
+Usage (from the repository root): DATA_PATH=/tmp python -m benchmarks.embed
+"""
+import datetime
+import logging
+import timeit
+
+import hikari
+from tzlocal import get_localzone
+
+from remi.res.resource import Resource
+from remi.util.embed import create_success_embed
+from remi.util.typing import EmbedDict
+
+NUMBER = 20_000
+FIELDS = [{"name": "Moderator", "value": "None", "inline": True}]
+
+
+def legacy_create_embed_from_dict(data: EmbedDict) -> hikari.Embed:
+    author = data.pop("author", None)
+    footer = data.pop("footer", None)
+    fields = data.pop("fields", None)
+    thumbnail = data.pop("thumbnail", None)
+    image = data.pop("image", None)
+
+    timestamp = data.pop("timestamp", None)
+    if not timestamp:
+        timestamp = datetime.datetime.now()
+        logging.debug("Timestamp for embed not found. Adding timestamp.")
+
+    if not timestamp.tzinfo:
+        timestamp = timestamp.replace(tzinfo=get_localzone())
+        logging.debug("No timezone data found in timestamp. Applying local timezone.")
+
+    embed = hikari.Embed(**data, timestamp=timestamp)
+
+    if author:
+        embed.set_author(**author)
+    if footer:
+        embed.set_footer(**footer)
+    if thumbnail:
+        embed.set_thumbnail(thumbnail)
+    if image:
+        embed.set_image(image)
+    if fields:
+        [embed.add_field(**field) for field in fields]
+
+    return embed
+
+
+def legacy_create_success_embed(title=None, description=None, fields=None) -> hikari.Embed:
+    match "SUCCESS":
+        case "FAILURE":
+            default_title, thumbnail, color = "Something went wrong!", Resource.FAILURE_ICON.resource, 0xED254E
+        case "WARNING":
+            default_title, thumbnail, color = "Warning!", Resource.WARNING_ICON.resource, 0xF9DC5C
+        case "SUCCESS":
+            default_title, thumbnail, color = "Success!", Resource.SUCCESS_ICON.resource, 0x71F79F
+
+    return legacy_create_embed_from_dict(
+        EmbedDict(
+            title=title or default_title, description=description, thumbnail=thumbnail, fields=fields, color=color
+        )
+    )
+
+
+def main():
+    for name, func in (("legacy", legacy_create_success_embed), ("template", create_success_embed)):
+        seconds = min(timeit.repeat(lambda f=func: f(description="Done", fields=FIELDS), number=NUMBER, repeat=5))
+        print(f"{name:>8}: {seconds / NUMBER * 1e6:6.2f} µs/embed")
+
+
+if __name__ == "__main__":
+    main()
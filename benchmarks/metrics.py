@@ -0,0 +1,33 @@
+"""
+Cost of updating a metric, which has to stay well under a microsecond.
+
+Usage (from the repository root): python -m benchmarks.metrics
+"""
+import timeit
+
+from remi.core.metrics import MetricsRegistry
+
+NUMBER = 1_000_000
+
+
+def main() -> None:
+    registry = MetricsRegistry("benchmark")
+    counter = registry.counter("counter_total", "Counter.")
+    labelled = registry.counter("labelled_total", "Labelled counter.", ("command",))
+    child = labelled.labels("about")
+    histogram = registry.histogram("histogram_seconds", "Histogram.")
+
+    cases = {
+        "Counter.inc()": counter.inc,
+        "Counter.labels(...).inc()": lambda: labelled.labels("about").inc(),
+        "Cached child .inc()": child.inc,
+        "Histogram.observe()": lambda: histogram.observe(0.003),
+    }
+
+    for name, func in cases.items():
+        elapsed = timeit.timeit(func, number=NUMBER)
+        print(f"{name:<28} {elapsed / NUMBER * 1e9:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
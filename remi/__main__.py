@@ -1,16 +1,142 @@
+# pylint: disable=logging-fstring-interpolation
+import logging
 import os
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable
 
-from remi.core.bot import bot
+import click
 
-if os.name != "nt":
-    import uvloop
 
-    uvloop.install()
+def _confirm_data_path() -> None:
+    """Have the user confirm a relative or missing DATA_PATH, then pin it to the absolute path"""
+    data_path = Path(os.getenv("DATA_PATH") or ".")
+    if data_path.is_absolute():
+        return
 
+    data_path = data_path.absolute()
+    if not click.confirm(f"Do you want to use '{data_path}' to store bot's data?"):
+        sys.exit(1)
+
+    logging.info(f"Using '{data_path}' as data folder.")
+    logging.info(f"To suppress this message, set `DATA_PATH` to '{data_path}'.")
+    os.environ["DATA_PATH"] = str(data_path)
+
+
+def _load_environment(verbose: int, file: bool, log_sql: bool, log_sample: tuple[str, ...]) -> None:
+    """Load the .env file, set logging up and settle the data path, before anything reads them on import"""
+    # pylint: disable=import-outside-toplevel
+    from dotenv import load_dotenv
+
+    from remi.log import parse_log_sampling, setup_logging
+
+    load_dotenv()
+    setup_logging(verbose, file, log_sql, parse_log_sampling(log_sample))
+    _confirm_data_path()
+
+
+def _env_override(name: str) -> Callable[[click.Context, click.Parameter, Any], None]:
+    """
+    Option callback setting the `name` environment variable when the option is given, to "True" for flags.
+    Those are read on import, and take precedence over the .env file, which doesn't override them
+    """
+
+    def callback(_ctx: click.Context, _param: click.Parameter, value: Any) -> None:
+        if value is not None and value is not False:
+            os.environ[name] = "True" if value is True else str(value)
+
+    return callback
+
+
+@click.command()
+@click.option("-v", "--verbose", help="Increase verbosity (can be stacked).", count=True)
+@click.option("-f", "--file", help="Enable writing log files (rotated at midnight).", is_flag=True)
+@click.option(
+    "--dev", help="Enable developer mode.", is_flag=True, callback=_env_override("REMI_DEVMODE"), expose_value=False
+)
+@click.option("--log-sql", help="Enable logging of SQL.", is_flag=True)
+@click.option(
+    "--slow-query-ms",
+    help="Log statements slower than this, with their query plan (overrides SLOW_QUERY_MS).",
+    type=click.FloatRange(min=0),
+    callback=_env_override("SLOW_QUERY_MS"),
+    expose_value=False,
+)
+@click.option(
+    "--log-sample",
+    help="Keep 1 in N records below WARNING of a logger, e.g. hikari.gateway=10 (can be stacked).",
+    metavar="LOGGER=N",
+    multiple=True,
+)
+@click.option(
+    "--db-profile",
+    help="SQLite tuning profile (overrides DB_PROFILE).",
+    type=click.Choice(["throughput", "durable"]),
+    callback=_env_override("DB_PROFILE"),
+    expose_value=False,
+)
+@click.option(
+    "--profile-startup",
+    help="Print the slowest imports and the time taken until the bot has started.",
+    is_flag=True,
+)
+@click.option(
+    "--lazy-plugins",
+    help="Import plugins on first use, except those in PRELOAD_PLUGINS.",
+    is_flag=True,
+    callback=_env_override("LAZY_PLUGINS"),
+    expose_value=False,
+)
+@click.option(
+    "--metrics-port",
+    help="Serve Prometheus metrics on this port (overrides METRICS_PORT).",
+    type=int,
+    callback=_env_override("METRICS_PORT"),
+    expose_value=False,
+)
+@click.option(
+    "--trace-sample-rate",
+    help="Fraction of commands to trace, from 0 to 1 (overrides TRACE_SAMPLE_RATE).",
+    type=click.FloatRange(0, 1),
+    callback=_env_override("TRACE_SAMPLE_RATE"),
+    expose_value=False,
+)
+def main(verbose: int, file: bool, log_sql: bool, log_sample: tuple[str, ...], profile_startup: bool):
+    # pylint: disable=import-outside-toplevel
+    started_at = time.perf_counter()
+
+    # Everything below reads its configuration from the environment on import, so it goes first, after the
+    # options that override it
+    _load_environment(verbose, file, log_sql, log_sample)
+
+    from remi.startup import ImportProfiler, print_startup_report
+
+    profiler = ImportProfiler() if profile_startup else None
+    with profiler or nullcontext():
+        import hikari
+        from rich import print as rprint
+
+        from remi.core.bot import bot
+        from remi.core.constant import get_banner_text
+
+    rprint(get_banner_text())
+
+    if profiler:
+
+        async def on_started(_) -> None:
+            print_startup_report(profiler, time.perf_counter() - started_at)
+
+        bot.subscribe(hikari.StartedEvent, on_started)
+
+    if os.name != "nt":
+        import uvloop
+
+        uvloop.install()
 
-def main():
     bot.run()
 
 
 if __name__ == "__main__":
-    main()
+    main()  # pylint: disable=no-value-for-parameter
@@ -1,5 +0,0 @@
-import remi.command.core.about
-import remi.command.core.plugin_manager
-import remi.command.core.prefix
-import remi.command.core.self
-import remi.command.core.staff_role
@@ -6,6 +6,7 @@ import loguru
 from lightbulb import context
 
 from remi.core.constant import Global
+from remi.core.response_memo import MemoScope, memoize_response
 from remi.util.embed import create_embed_from_dict
 from remi.util.typing import EmbedDict, EmbedField
 
@@ -22,18 +23,18 @@ def _get_owner(ctx: context.Context):
 @about.command
 @lightbulb.command(name="about", description="About the bot.")
 @lightbulb.implements(*Global.COMMAND_IMPLEMENTS)
-async def core_about(ctx: context.Context):
-    owner = _get_owner(ctx)
+@memoize_response(MemoScope.GLOBAL, ttl=3600, invalidate_on=(hikari.OwnUserUpdateEvent,))
+async def core_about(ctx: context.Context) -> hikari.Embed:
     author = "https://github.com/PythonTryHard"
     remi_repo = author + "/remi"
 
     red_repo = "https://github.com/Cog-Creators/Red-DiscordBot"
 
-    info_embed = create_embed_from_dict(
+    return create_embed_from_dict(
         EmbedDict(
             color=0xF9DC5C,
             fields=[
-                EmbedField(name="Instance's owner", value=owner, inline=True),
+                EmbedField(name="Instance's owner", value=_get_owner(ctx), inline=True),
                 EmbedField(
                     name="Built on",
                     value="\n".join([f"\N{BULLET} {i.__name__} v{i.__version__}" for i in (hikari, lightbulb, loguru)]),
@@ -57,4 +58,3 @@ async def core_about(ctx: context.Context):
             thumbnail=ctx.bot.get_me().avatar_url,
         )
     )
-    await ctx.respond(embed=info_embed)
@@ -0,0 +1,52 @@
+import pkgutil
+from typing import Iterable
+
+import lightbulb
+
+from remi.core.lazy_plugin import LazyPlugin
+
+from .plg_scan import plugin_registry
+
+
+def _resolve_checks(paths: Iterable[str]) -> tuple[lightbulb.Check, ...]:
+    """Import the checks read from a plugin's source, raising `ValueError` if any of them isn't a check"""
+    try:
+        checks = tuple(pkgutil.resolve_name(path) for path in paths)
+    except (ImportError, AttributeError) as ex:
+        raise ValueError(f"Could not import a check: {ex}") from ex
+
+    if not all(isinstance(check, lightbulb.Check) for check in checks):
+        raise ValueError("Not a check")
+
+    return checks
+
+
+def add_lazy_plugins(app: lightbulb.BotApp, load_paths: Iterable[str]) -> list[str]:
+    """
+    Add a `LazyPlugin` in place of each of `load_paths`, built from the plugin registry. Returns the
+    load paths that have to be loaded right away instead, as their commands or checks couldn't be read
+    statically
+    """
+    plugin_registry.refresh()
+    by_load_path = {info.load_path: (name, info) for name, info in plugin_registry.by_name.items()}
+
+    eager = []
+    for load_path in load_paths:
+        if (entry := by_load_path.get(load_path)) is None or not entry[1].commands:
+            eager.append(load_path)
+            continue
+
+        name, info = entry
+        try:
+            checks = _resolve_checks(info.checks)
+            commands = [
+                (command.name, command.description, command.group, _resolve_checks(command.checks))
+                for command in info.commands
+            ]
+        except ValueError:
+            eager.append(load_path)
+            continue
+
+        app.add_plugin(LazyPlugin(name, info.description, load_path, commands, checks))
+
+    return eager
@@ -1,21 +1,31 @@
 import sys
 from functools import partial
-from importlib import reload
 
 import hikari
 import lightbulb
 from lightbulb import commands, context
 
+from remi.core.check_plan import get_check_plan
 from remi.core.constant import Global
-from remi.core.exceptions import ProtectedPlugin
+from remi.core.events import PluginsChangedEvent
+from remi.core.exceptions import HotReloadFailed, ProtectedPlugin
+from remi.core.hot_reload import hot_reloader
+from remi.core.lazy_plugin import LazyPlugin
+from remi.core.metrics import metrics
+from remi.core.response_memo import MemoScope, memoize_response
 from remi.util.embed import (
     EmbedDict,
     create_embed_from_dict,
     create_failure_embed,
+    create_info_embed,
     create_success_embed,
 )
 
-from .plg_scan import _get_all_plugin_info, _get_all_plugin_name_mapping
+from .plg_scan import plugin_registry
+
+_plugin_operations = metrics.counter(
+    "plugin_operations_total", "Plugin (un/re)loads, by operation and result (ok, failed).", ("operation", "result")
+)
 
 plugin_manager = lightbulb.Plugin("Plugin Manager", description="Manage Remi's plugins.")
 plugin_manager.add_checks(lightbulb.checks.owner_only)
@@ -24,7 +34,7 @@ plugin_manager.add_checks(lightbulb.checks.owner_only)
 @plugin_manager.set_error_handler
 async def on_cog_command_error(event: lightbulb.CommandErrorEvent) -> bool:
     # Unpack the exception since we're going do it anyway
-    exception = event.exception or event.exception.__cause__
+    exception = event.exception.__cause__ or event.exception
 
     # Prime up a failure embed template
     failure_template = partial(create_failure_embed, title=exception.args[0])
@@ -48,6 +58,9 @@ async def on_cog_command_error(event: lightbulb.CommandErrorEvent) -> bool:
         case ProtectedPlugin():
             resp = failure_template(description="This plugin is critical to the bot's operation!")
 
+        case HotReloadFailed():
+            resp = failure_template(description="The previous version is still loaded, check the log for details.")
+
         # Default case for everything not handled.
         case _:
             resp = create_failure_embed(
@@ -70,27 +83,51 @@ async def plg_man(ctx: context.Context) -> None:
 
 async def plg_man_handler(ctx: context.Context, operation: str):
     """Handler for all plugin-related operation"""
+    try:
+        await _plg_man_operation(ctx, operation)
+    except Exception:
+        _plugin_operations.labels(operation.lower(), "failed").inc()
+        raise
+
+    _plugin_operations.labels(operation.lower(), "ok").inc()
+
+
+def _extension_modules(load_path: str) -> list[str]:
+    return [i for i in sys.modules if i == load_path or i.startswith(f"{load_path}.")]
+
+
+async def _plg_man_operation(ctx: context.Context, operation: str):
     target_plugin = ctx.options.plugin
 
-    if target_plugin not in (mapping := _get_all_plugin_name_mapping()):
+    plugin_registry.refresh()
+    if (info := plugin_registry.get(target_plugin)) is None:
         raise lightbulb.ExtensionNotFound(f"No extension by the name {target_plugin!r} was found.")
 
-    load_path = mapping[target_plugin]
-
-    reload_target = [i for i in sys.modules if load_path in i]
+    load_path = info.load_path
+    lazy_plugin = plugin_manager.app.get_plugin(target_plugin)
+    lazy_plugin = lazy_plugin if isinstance(lazy_plugin, LazyPlugin) else None
 
     match operation:
+        case "LOAD" if lazy_plugin:
+            await lazy_plugin.activate(plugin_manager.app)
+
+        case "UNLOAD" if lazy_plugin:
+            plugin_manager.app.remove_plugin(lazy_plugin)
+
         case "LOAD":
             plugin_manager.app.load_extensions(load_path)
 
         case "UNLOAD":
-            [reload(sys.modules[i]) for i in reload_target]
             plugin_manager.app.unload_extensions(load_path)
+            # lightbulb only drops the extension itself, loading it again would reuse its stale submodules
+            hot_reloader.forget(_extension_modules(load_path))
+
+        case "RELOAD" if load_path not in plugin_manager.app.extensions:
+            raise lightbulb.ExtensionNotLoaded(f"Extension {load_path!r} is not loaded.")
 
         case "RELOAD":
-            [reload(sys.modules[i]) for i in reload_target]
-            plugin_manager.app.unload_extensions(load_path)
-            plugin_manager.app.load_extensions(load_path)
+            # Only the extension's own modules, and whatever imports them, in dependency order
+            hot_reloader.reload(plugin_manager.app, _extension_modules(load_path))
 
     load_status_embed = create_success_embed(
         title=f"Successfully {operation.lower()}ed plugins `{target_plugin}`",
@@ -140,11 +177,25 @@ async def plg_man_reload(ctx: context.Context) -> None:
     await plg_man_handler(ctx, "RELOAD")
 
 
+def _load_status(app: lightbulb.BotApp, plugin_name: str, load_path: str) -> str:
+    if isinstance(app.get_plugin(plugin_name), LazyPlugin):
+        return "~"
+
+    return "x" if load_path in app.extensions else " "
+
+
+def _listing_version(ctx: context.Context) -> tuple:
+    # Plugins added or removed on disk, and extensions loaded without adding a plugin, dispatch no event
+    plugin_registry.refresh()
+    return plugin_registry.generation, tuple(ctx.bot.extensions)
+
+
 @plg_man.child
 @lightbulb.command(name="list", description="List available plugins and status.")
 @lightbulb.implements(*Global.SUB_COMMAND_IMPLEMENTS)
-async def plg_man_list(ctx: context.Context) -> None:
-    plugin_mapping_all = _get_all_plugin_info()
+@memoize_response(MemoScope.GLOBAL, invalidate_on=(PluginsChangedEvent,), version=_listing_version)
+async def plg_man_list(ctx: context.Context) -> hikari.Embed:
+    plugin_mapping_all = plugin_registry.by_category
 
     # Build plugin listing and status for each plugin category
     embed_text = []
@@ -155,7 +206,7 @@ async def plg_man_list(ctx: context.Context) -> None:
         for plugin_name, info_object in mapping.items():
             category_listing.append(
                 listing_template.format(
-                    status="x" if info_object.load_path in ctx.bot.extensions else " ",
+                    status=_load_status(ctx.bot, plugin_name, info_object.load_path),
                     name=plugin_name,
                     description=info_object.description,
                 )
@@ -163,13 +214,39 @@ async def plg_man_list(ctx: context.Context) -> None:
 
         embed_text.append(f"**{category}**\n" + "\n".join(category_listing))
 
-    resp_embed = create_embed_from_dict(
+    return create_embed_from_dict(
         EmbedDict(
             title="Available plugins",
             description="\n".join(embed_text),
-            footer={"text": "[x] means loaded, otherwise [ ]"},
+            footer={"text": "[x] means loaded, [~] loaded on first use, otherwise [ ]"},
             color=0x7CB7FF,
         )
     )
 
+
+@plg_man.child
+@lightbulb.option(
+    name="command",
+    description="The command's full name, e.g. `staff set`.",
+    type=str,
+    required=True,
+    modifier=commands.OptionModifier.CONSUME_REST,
+)
+@lightbulb.command(name="checks", description="Show the compiled check plan of a command.")
+@lightbulb.implements(*Global.SUB_COMMAND_IMPLEMENTS)
+async def plg_man_checks(ctx: context.Context) -> None:
+    command = ctx.bot.get_prefix_command(ctx.options.command)
+
+    if command is None or (plan := get_check_plan(command)) is None:
+        await ctx.respond(embed=create_failure_embed(title=f"No check plan found for `{ctx.options.command}`"))
+        return
+
+    steps = [
+        f"`{index}.` `{check.__name__.strip('_')}` - {cost.name}" for index, (cost, check) in enumerate(plan.steps, 1)
+    ]
+
+    resp_embed = create_info_embed(
+        title=f"Check plan for `{plan.command}`",
+        description="\n".join(steps) or "*No checks*",
+    )
     await ctx.respond(embed=resp_embed)
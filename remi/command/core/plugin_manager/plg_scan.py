@@ -1,55 +1,286 @@
+# pylint: disable=logging-fstring-interpolation
+import ast
 import importlib
-import sys
+import importlib.util
+import logging
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
 
 _CORE_COMMAND_PACKAGE = "remi.command.core"
 _BUNDLED_COMMAND_PACKAGE = "remi.command.ext"
 
+_PLUGIN_PACKAGES = {"Core": _CORE_COMMAND_PACKAGE, "Bundled": _BUNDLED_COMMAND_PACKAGE}
+
+# (file name, mtime, size) of every source file in a plugin's directory
+Fingerprint = tuple[tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class CommandInfo:
+    name: str
+    description: str
+    group: bool = False
+    # Import paths of the checks added to the command itself
+    checks: tuple[str, ...] = ()
+
 
 @dataclass(frozen=True)
 class PluginInfo:
     load_path: str
     description: str
+    # Top-level commands, empty if they, or the checks of the plugin or of any of them, can't all be read statically
+    commands: tuple[CommandInfo, ...] = ()
+    # Import paths of the checks added to the plugin
+    checks: tuple[str, ...] = ()
 
 
-def _scan_plugin(plugin_package: str) -> dict[str, PluginInfo]:
-    # Back up sys.modules, as importlib.import_module() will import the package and register to
-    # sys.module, causing issues with lightbulb.bot.BotApp.load_extensions() and unload_extensions()
-    old = sys.modules.copy()
+@dataclass(frozen=True)
+class _Entry:
+    fingerprint: Fingerprint
+    name: Optional[str]  # None if the directory isn't a plugin
+    info: Optional[PluginInfo]
 
-    package = importlib.import_module(plugin_package)
-    alias_mapping = {}
 
-    for attr_str in dir(package):
-        attr = getattr(package, attr_str)
+def _fingerprint(directory: Path) -> Fingerprint:
+    return tuple(
+        sorted((file.name, (stat := file.stat()).st_mtime_ns, stat.st_size) for file in directory.glob("*.py"))
+    )
 
-        if not attr_str.startswith("__") and all(
-            hasattr(attr, i) for i in ("load", "unload", "__plugin_name__", "__plugin_description__")
-        ):
-            alias_mapping[attr.__plugin_name__] = PluginInfo(
-                load_path=attr.__name__, description=attr.__plugin_description__
-            )
 
-    # Restore the old sys.module
-    sys.modules = old
+def _find_assignment(tree: ast.Module, target: str) -> Optional[ast.expr]:
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(i, ast.Name) and i.id == target for i in node.targets):
+            return node.value
 
-    return alias_mapping
+    return None
 
 
-# noinspection PyDictCreation
-def _get_all_plugin_info() -> dict[str, dict[str, PluginInfo]]:
-    """Get all plugin currently available to the bot"""
-    plugin_mapping = {}
+def _call_argument(call: ast.expr, attribute: str) -> Optional[str]:
+    """Get `name` or `description` out of a `lightbulb.Plugin(...)` or `lightbulb.command(...)` call, if literal"""
+    if not isinstance(call, ast.Call):
+        return None
+
+    position = {"name": 0, "description": 1}[attribute]
+    arguments = {keyword.arg: keyword.value for keyword in call.keywords}
+    if len(call.args) > position:
+        arguments[attribute] = call.args[position]
+
+    if isinstance(value := arguments.get(attribute), ast.Constant) and isinstance(value.value, str):
+        return value.value
+
+    return None
+
+
+def _resolve_metadata(directory: Path, tree: ast.Module, value: Optional[ast.expr]) -> Optional[str]:
+    """
+    Statically evaluate `__plugin_name__`/`__plugin_description__`, either a string literal or the
+    `name`/`description` of a plugin defined in the package or in one of its modules
+    """
+    match value:
+        case ast.Constant(value=str() as literal):
+            return literal
+
+        case ast.Attribute(value=ast.Name(id=plugin), attr="name" | "description" as attribute):
+            if (call := _find_assignment(tree, plugin)) is not None:
+                return _call_argument(call, attribute)
+
+            # `from .module import plugin`, follow it one level down
+            for node in tree.body:
+                if not (isinstance(node, ast.ImportFrom) and node.level == 1 and node.module):
+                    continue
+
+                for alias in node.names:
+                    if (alias.asname or alias.name) == plugin:
+                        module_tree = ast.parse((directory / f"{node.module}.py").read_text(encoding="utf-8"))
+                        call = _find_assignment(module_tree, alias.name)
+                        return _call_argument(call, attribute) if call is not None else None
+
+    return None
+
+
+def _import_aliases(tree: ast.Module) -> dict[str, str]:
+    """What each name imported at the top of a module refers to, e.g. `{"checks": "lightbulb.checks"}`"""
+    aliases = {}
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                # `import a.b` binds `a`, `import a.b as c` binds `c` to `a.b`
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    aliases[alias.name.partition(".")[0]] = alias.name.partition(".")[0]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            for alias in node.names:
+                aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    return aliases
+
+
+def _check_paths(call: ast.Call, aliases: dict[str, str]) -> tuple[str, ...]:
+    """The import paths of the checks passed to an `add_checks(...)` call, which must all be imported names"""
+    paths = []
+    for argument in call.args:
+        attributes = []
+        while isinstance(argument, ast.Attribute):
+            attributes.append(argument.attr)
+            argument = argument.value
+
+        if not isinstance(argument, ast.Name) or argument.id not in aliases:
+            raise ValueError(f"Check {ast.unparse(argument)!r} isn't an imported name")
+
+        paths.append(".".join([aliases[argument.id], *reversed(attributes)]))
+
+    return tuple(paths)
+
+
+def _read_command(function: ast.FunctionDef | ast.AsyncFunctionDef, aliases: dict[str, str]) -> Optional[CommandInfo]:
+    """Read a command added to the plugin itself, decorated with `@<plugin>.command` and `@lightbulb.command(...)`"""
+    if not any(isinstance(i, ast.Attribute) and i.attr == "command" for i in function.decorator_list):
+        return None
+
+    name = description = None
+    group = False
+    checks = ()
+    for decorator in function.decorator_list:
+        match decorator:
+            case ast.Call(func=ast.Attribute(value=ast.Name(id="lightbulb"), attr="command")):
+                name, description = _call_argument(decorator, "name"), _call_argument(decorator, "description")
+
+            case ast.Call(func=ast.Attribute(value=ast.Name(id="lightbulb"), attr="add_checks")):
+                checks += _check_paths(decorator, aliases)
 
-    plugin_mapping["Core"] = _scan_plugin(_CORE_COMMAND_PACKAGE)
-    plugin_mapping["Bundled"] = _scan_plugin(_BUNDLED_COMMAND_PACKAGE)
+            case ast.Call(func=ast.Attribute(value=ast.Name(id="lightbulb"), attr="implements")):
+                group = any(
+                    isinstance(i, ast.Attribute) and i.attr in {"GROUP_IMPLEMENTS", "PrefixCommandGroup"}
+                    for i in ast.walk(decorator)
+                )
 
-    return plugin_mapping
+    if name is None or description is None:
+        raise ValueError(f"Command {function.name!r} isn't declared with literals")
 
+    return CommandInfo(name, description, group, checks)
 
-def _get_all_plugin_name_mapping() -> dict[str, str]:
-    """Get only all plugin's name-load path mapping"""
-    mapping = _scan_plugin(_CORE_COMMAND_PACKAGE) | _scan_plugin(_BUNDLED_COMMAND_PACKAGE)
-    mapping = {name: info_object.load_path for name, info_object in mapping.items()}
 
-    return mapping
+def _read_commands(directory: Path) -> tuple[tuple[CommandInfo, ...], tuple[str, ...]]:
+    """Read the plugin's top-level commands, and the checks added to the plugin with `<plugin>.add_checks(...)`"""
+    commands, checks = [], ()
+    try:
+        for file in sorted(directory.glob("*.py")):
+            tree = ast.parse(file.read_text(encoding="utf-8"))
+            aliases = _import_aliases(tree)
+
+            for node in tree.body:
+                match node:
+                    case ast.FunctionDef() | ast.AsyncFunctionDef():
+                        if command := _read_command(node, aliases):
+                            commands.append(command)
+
+                    case ast.Expr(value=ast.Call(func=ast.Attribute(attr="add_checks")) as call):
+                        checks += _check_paths(call, aliases)
+
+    except (OSError, SyntaxError, ValueError):
+        return (), ()
+
+    return tuple(commands), checks
+
+
+def _read_plugin(directory: Path, load_path: str) -> tuple[Optional[str], Optional[PluginInfo]]:
+    """Read a plugin's metadata from its source, only importing it if that can't be done statically"""
+    tree = ast.parse((directory / "__init__.py").read_text(encoding="utf-8"))
+
+    functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+    name_node = _find_assignment(tree, "__plugin_name__")
+    description_node = _find_assignment(tree, "__plugin_description__")
+
+    if not {"load", "unload"} <= functions or name_node is None or description_node is None:
+        return None, None
+
+    try:
+        name = _resolve_metadata(directory, tree, name_node)
+        description = _resolve_metadata(directory, tree, description_node)
+    except (OSError, SyntaxError):
+        name = description = None
+
+    if name is None or description is None:
+        logging.debug(f"Could not read the metadata of plugin {load_path!r} statically, importing it.")
+        module = importlib.import_module(load_path)
+        name, description = module.__plugin_name__, module.__plugin_description__
+
+    commands, checks = _read_commands(directory)
+    return name, PluginInfo(load_path=load_path, description=description, commands=commands, checks=checks)
+
+
+class PluginRegistry:
+    """
+    Every plugin available to the bot, by category and name. A refresh only stats the plugins'
+    source files, and reads the metadata of those whose files changed since, without importing them
+    """
+
+    def __init__(self, packages: dict[str, str]):
+        self.packages = packages
+        self._entries: dict[str, _Entry] = {}  # Keyed on load path
+        self._by_category: dict[str, dict[str, PluginInfo]] = {}
+        self._by_name: dict[str, PluginInfo] = {}
+        self.generation = 0  # Bumped by every refresh that changes anything
+
+    def _package_directories(self, package: str) -> list[Path]:
+        # find_spec() imports the parent packages, not the package itself, which imports every plugin
+        try:
+            spec = importlib.util.find_spec(package)
+        except ModuleNotFoundError:
+            spec = None
+
+        return [Path(i) for i in spec.submodule_search_locations] if spec else []
+
+    def refresh(self) -> bool:
+        """Pick up added, changed and removed plugins. Returns whether anything changed"""
+        entries = {}
+        for package in self.packages.values():
+            for package_directory in self._package_directories(package):
+                for directory in sorted(package_directory.iterdir()):
+                    if not (directory / "__init__.py").is_file():
+                        continue
+
+                    load_path = f"{package}.{directory.name}"
+                    fingerprint = _fingerprint(directory)
+                    if (entry := self._entries.get(load_path)) is None or entry.fingerprint != fingerprint:
+                        entry = _Entry(fingerprint, *_read_plugin(directory, load_path))
+
+                    entries[load_path] = entry
+
+        if entries == self._entries:
+            return False
+
+        self._entries = entries
+        self._by_category = {
+            category: {
+                entry.name: entry.info
+                for load_path, entry in entries.items()
+                if entry.info and load_path.startswith(f"{package}.")
+            }
+            for category, package in self.packages.items()
+        }
+        self._by_name = {name: info for mapping in self._by_category.values() for name, info in mapping.items()}
+        self.generation += 1
+        return True
+
+    def get(self, name: str) -> Optional[PluginInfo]:
+        return self._by_name.get(name)
+
+    @property
+    def by_category(self) -> dict[str, dict[str, PluginInfo]]:
+        return self._by_category
+
+    @property
+    def by_name(self) -> dict[str, PluginInfo]:
+        return self._by_name
+
+
+plugin_registry = PluginRegistry(_PLUGIN_PACKAGES)
+
+
+def _get_all_plugin_info() -> dict[str, dict[str, PluginInfo]]:
+    """Get all plugin currently available to the bot"""
+    plugin_registry.refresh()
+    return plugin_registry.by_category
@@ -4,13 +4,16 @@ from lightbulb import commands, context
 from sqlalchemy import delete, select
 
 import remi.core.checks
+from remi.core.cache import prefix_cache
 from remi.core.constant import Global
 from remi.db.engine import async_config_session
 from remi.db.schema.config import ServerPrefix
 from remi.util.embed import create_success_embed
 
 prefix_manager = lightbulb.Plugin("Prefix Manager", description="Manage this server's prefix.")
-prefix_manager.add_checks(lightbulb.checks.guild_only, remi.core.checks.is_administrator)
+prefix_manager.add_checks(
+    lightbulb.checks.guild_only, remi.core.checks.database_ready, remi.core.checks.is_administrator
+)
 
 
 @prefix_manager.command
@@ -32,14 +35,19 @@ async def prefixman_setprefix(ctx: context.Context):
 
     async with async_config_session() as session:
         stmt = select(ServerPrefix).where(ServerPrefix.guild_id == ctx.guild_id)
-        if config_entry := await session.scalars(stmt).one():
+        if config_entry := (await session.scalars(stmt)).first():
+            old_prefix = config_entry.prefix
             config_entry.prefix = prefix
         else:
+            old_prefix = None
             entry = ServerPrefix(guild_id=ctx.guild_id, prefix=prefix)
             session.add(entry)
 
         await session.commit()
 
+    prefix_cache.set(ctx.guild_id, (prefix,))
+    ctx.bot.prefix_index.replace((old_prefix,), (prefix,))
+
     await ctx.respond(embed=create_success_embed(title=f"Prefix for your server has been set to `{prefix}`!"))
 
 
@@ -48,9 +56,15 @@ async def prefixman_setprefix(ctx: context.Context):
 @lightbulb.implements(*Global.COMMAND_IMPLEMENTS)
 async def prefixman_unsetprefix(ctx: context.Context):
     async with async_config_session() as session:
+        select_stmt = select(ServerPrefix.prefix).where(ServerPrefix.guild_id == ctx.guild_id)
+        old_prefixes = (await session.scalars(select_stmt)).all()
+
         stmt = delete(ServerPrefix).where(ServerPrefix.guild_id == ctx.guild_id)
 
         await session.execute(stmt)
         await session.commit()
 
+    prefix_cache.set(ctx.guild_id, ())
+    ctx.bot.prefix_index.discard(*old_prefixes)
+
     await ctx.respond(embed=create_success_embed(title="Prefix for your server has been unset!"))
@@ -0,0 +1,21 @@
+import lightbulb
+
+from remi.core.constant import Client
+from remi.core.exceptions import ProtectedPlugin
+
+from .profiler import profiler_plugin, profiling
+
+__plugin_name__ = profiler_plugin.name
+__plugin_description__ = profiler_plugin.description
+
+
+def load(bot: lightbulb.BotApp) -> None:
+    bot.add_plugin(profiler_plugin)
+
+
+def unload(bot: lightbulb.BotApp) -> None:
+    if Client.DEV_MODE:
+        profiling.cancel()
+        bot.remove_plugin(profiler_plugin)
+    else:
+        raise ProtectedPlugin(f"Cannot unload protected plugin {profiler_plugin.name}!")
@@ -0,0 +1,134 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import logging
+from typing import Optional
+
+import hikari
+import lightbulb
+from lightbulb import context
+
+from remi.core.constant import Global
+from remi.util.embed import create_failure_embed, create_success_embed
+from remi.util.profiler import Profile, SamplingProfiler
+from remi.util.task import spawn
+
+DEFAULT_PROFILE_SECONDS = 60
+MAX_PROFILE_SECONDS = 3600
+TOP_FUNCTIONS = 50  # Rows of the attached table, the embed shows the first few
+
+profiler_plugin = lightbulb.Plugin("Profiler", description="Profile Remi while she runs")
+profiler_plugin.add_checks(lightbulb.checks.owner_only)
+
+
+class ProfilingSession:
+    """The sampling profiler, along with the task that stops it once its time is up"""
+
+    def __init__(self) -> None:
+        self.profiler = SamplingProfiler()
+        self._auto_stop: Optional[asyncio.Task] = None
+
+    def start(self, seconds: int, channel_id: hikari.Snowflakeish) -> None:
+        self.profiler.start()  # Commands run on the event loop's thread, which is the one sampled
+        self._auto_stop = spawn(self._stop_after(seconds, channel_id), name="stop profiling")
+
+    async def stop(self) -> Optional[Profile]:
+        """Stop profiling, unless the session was already stopped, returning the profile"""
+        if (auto_stop := self._auto_stop) is None:
+            return None
+
+        self._auto_stop = None
+        if auto_stop is not asyncio.current_task():
+            auto_stop.cancel()
+
+        # Joining the sampling thread waits for the sample in progress, which isn't for the event loop to do
+        return await asyncio.to_thread(self.profiler.stop)
+
+    def cancel(self) -> None:
+        """Stop profiling without reporting, for when the plugin is removed"""
+        if (auto_stop := self._auto_stop) is not None:
+            self._auto_stop = None
+            auto_stop.cancel()
+            self.profiler.stop()
+
+    async def _stop_after(self, seconds: int, channel_id: hikari.Snowflakeish) -> None:
+        await asyncio.sleep(seconds)
+        if (profile := await self.stop()) is None:
+            return
+
+        embed, attachments = await _report(profile)
+        try:
+            await profiler_plugin.app.rest.create_message(channel_id, embed=embed, attachments=attachments)
+        except hikari.HikariError as error:
+            logging.warning(f"Could not send the profile to channel {channel_id}: {error}")
+
+
+profiling = ProfilingSession()
+
+
+def _format_profile(profile: Profile) -> tuple[list[tuple[str, int, int]], str, str]:
+    return profile.top(5), profile.collapsed(), profile.format_top(TOP_FUNCTIONS)
+
+
+async def _report(profile: Profile) -> tuple[hikari.Embed, list[hikari.Bytes]]:
+    # Formatting every stack can take a while after minutes of sampling
+    top, collapsed, table = await asyncio.to_thread(_format_profile, profile)
+
+    samples = max(profile.samples, 1)
+    embed = create_success_embed(
+        title="**Profile**",
+        description=f"{profile.samples} samples over {profile.duration:.1f}s, every {profile.interval * 1000:.0f}ms.",
+        fields=[
+            {
+                "name": "Most samples in",
+                "value": "\n".join(f"`{own / samples:.1%}` {label}" for label, own, _ in top) or "Nothing sampled.",
+            }
+        ],
+    )
+    return embed, [hikari.Bytes(collapsed, "profile.collapsed.txt"), hikari.Bytes(table, "profile.top.txt")]
+
+
+@profiler_plugin.command
+@lightbulb.command(name="profile", description="Sample what Remi's event loop spends its time on.")
+@lightbulb.implements(*Global.GROUP_IMPLEMENTS)
+async def profile_command(ctx: context.Context) -> None:
+    pass
+
+
+@profile_command.child
+@lightbulb.option(
+    name="seconds",
+    description=f"How long to profile for, at most {MAX_PROFILE_SECONDS}.",
+    type=int,
+    required=False,
+    default=DEFAULT_PROFILE_SECONDS,
+)
+@lightbulb.command(name="start", description="Start profiling, the profile is sent once done.")
+@lightbulb.implements(*Global.SUB_COMMAND_IMPLEMENTS)
+async def profile_start(ctx: context.Context) -> None:
+    # Still running while a stop is joining its thread
+    if profiling.profiler.running:
+        await ctx.respond(
+            embed=create_failure_embed(
+                title="**Already profiling**",
+                description=f"Started {profiling.profiler.elapsed:.0f}s ago, stop it with `profile stop`.",
+            )
+        )
+        return
+
+    seconds = min(max(ctx.options.seconds, 1), MAX_PROFILE_SECONDS)
+    profiling.start(seconds, ctx.channel_id)
+    logging.info(f"Profiling the event loop for {seconds}s")
+
+    await ctx.respond(embed=create_success_embed(title="**Profiling**", description=f"For the next {seconds}s."))
+
+
+@profile_command.child
+@lightbulb.command(name="stop", description="Stop profiling and send the profile.")
+@lightbulb.implements(*Global.SUB_COMMAND_IMPLEMENTS)
+async def profile_stop(ctx: context.Context) -> None:
+    if (profile := await profiling.stop()) is None:
+        await ctx.respond(embed=create_failure_embed(title="**Not profiling**", description="See `profile start`."))
+        return
+
+    embed, attachments = await _report(profile)
+    await ctx.respond(embed=embed, attachments=attachments)
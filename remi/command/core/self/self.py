@@ -3,7 +3,16 @@ import lightbulb
 from lightbulb import context
 
 from remi.core.constant import Global
-from remi.util.embed import create_success_embed
+from remi.db.engine import config_query_stats
+from remi.util.embed import (
+    EMBED_FIELD_VALUE_LIMIT,
+    EMBED_TOTAL_LIMIT,
+    create_info_embed,
+    create_success_embed,
+    fit_fields,
+    join_lines,
+)
+from remi.util.tracing import to_chrome_trace, to_json_lines, tracer
 
 self = lightbulb.Plugin("Self", description="Interact directly with Remi")
 
@@ -27,3 +36,75 @@ async def core_ping(ctx: context.Context):
 async def core_shutdown(ctx: context.Context):
     await ctx.respond("Shutting down...")
     await self.bot.close()
+
+
+@self.command
+@lightbulb.add_checks(lightbulb.checks.owner_only)
+@lightbulb.option(name="count", description="How many traces to show.", type=int, required=False, default=5)
+@lightbulb.command(name="traces", description="Show the slowest recently traced commands.")
+@lightbulb.implements(*Global.COMMAND_IMPLEMENTS)
+async def core_traces(ctx: context.Context):
+    if not (traces := tracer.slowest(max(ctx.options.count, 1))):
+        description = "No traces yet." if tracer.sample_rate else "Tracing is off, see `TRACE_SAMPLE_RATE`."
+        await ctx.respond(embed=create_info_embed(title="**No traces**", description=description))
+        return
+
+    fields = []
+    for trace in traces:
+        spans = join_lines(
+            [f"{'  ' * depth}{span.name} {span.duration * 1000:.2f}ms" for depth, span in trace.root.walk()],
+            EMBED_FIELD_VALUE_LIMIT - len("```\n\n```"),
+        )
+        fields.append(
+            {
+                "name": f"{trace.root.attributes.get('command', trace.root.name)} ({trace.duration * 1000:.2f}ms)",
+                "value": f"```\n{spans}\n```",
+            }
+        )
+
+    # All of them are attached either way
+    title, unlisted = f"**Slowest {len(traces)} trace(s)**", "{} more in the attachments."
+    fields = fit_fields(fields, EMBED_TOTAL_LIMIT - len(title) - len(unlisted.format(len(traces))))
+    description = unlisted.format(len(traces) - len(fields)) if len(fields) < len(traces) else None
+
+    await ctx.respond(
+        embed=create_info_embed(title=title, description=description, fields=fields),
+        attachments=[
+            hikari.Bytes(to_json_lines(traces), "traces.jsonl"),
+            hikari.Bytes(to_chrome_trace(traces), "traces.chrome.json"),
+        ],
+    )
+
+
+@self.command
+@lightbulb.add_checks(lightbulb.checks.owner_only)
+@lightbulb.option(name="count", description="How many statements to show.", type=int, required=False, default=5)
+@lightbulb.command(name="queries", description="Show the statements the database spends the most time on.")
+@lightbulb.implements(*Global.COMMAND_IMPLEMENTS)
+async def core_queries(ctx: context.Context):
+    if not (statements := config_query_stats.slowest(min(max(ctx.options.count, 1), 25))):
+        await ctx.respond(embed=create_info_embed(title="**No queries**", description="No statements ran yet."))
+        return
+
+    fields = []
+    for stats in statements:
+        # Statements are normalized into a single line, cut short to leave the plan room
+        statement = join_lines([stats.statement], EMBED_FIELD_VALUE_LIMIT // 2 - len("```sql\n\n```"))
+        value = f"```sql\n{statement}\n```"
+        if stats.plan:
+            plan = join_lines(stats.plan.splitlines(), EMBED_FIELD_VALUE_LIMIT - len(value) - len("```\n\n```"))
+            value += f"```\n{plan}\n```"
+
+        fields.append(
+            {
+                "name": (
+                    f"{stats.total * 1000:.1f}ms over {stats.count} run(s), p50 {stats.percentile(0.5) * 1000:.2f}ms, "
+                    f"p99 {stats.percentile(0.99) * 1000:.2f}ms, {stats.rows} row(s)"
+                ),
+                "value": value,
+            }
+        )
+
+    # The title's count only ever shrinks, so it fits in what's left for it either way
+    fields = fit_fields(fields, EMBED_TOTAL_LIMIT - len(f"**Top {len(statements)} statement(s)**"))
+    await ctx.respond(embed=create_info_embed(title=f"**Top {len(fields)} statement(s)**", fields=fields))
@@ -1,13 +1,16 @@
-from typing import Iterable, Union
+# pylint: disable=logging-fstring-interpolation
+import logging
+from typing import Iterable, Mapping, Union
 
 import hikari
 import lightbulb
 import sqlalchemy.ext.asyncio
 from lightbulb import commands, context
-from lightbulb.converters.special import RoleConverter
 from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
 
 import remi.core.checks
+from remi.core.cache import staff_role_cache
 from remi.core.constant import Global
 from remi.db.engine import async_config_session
 from remi.db.schema.config import StaffRole
@@ -17,10 +20,13 @@ from remi.util.embed import (
     create_success_embed,
     create_warning_embed,
 )
+from remi.util.task import spawn
 from remi.util.typing import EmbedDict, EmbedField
 
 staff_role_plugin = lightbulb.Plugin("Staff Role", description="Manage server's designated staff roles")
-staff_role_plugin.add_checks(lightbulb.checks.guild_only, remi.core.checks.is_administrator)
+staff_role_plugin.add_checks(
+    lightbulb.checks.guild_only, remi.core.checks.database_ready, remi.core.checks.is_administrator
+)
 
 
 @staff_role_plugin.command
@@ -41,13 +47,17 @@ def _parse_rank(rank_arg: str) -> Union[str, None]:
     return rank
 
 
-async def _is_in_db(rank: str, *role_ids: int) -> Iterable[int]:
-    session: sqlalchemy.ext.asyncio.AsyncSession
-    async with async_config_session() as session:
-        stmt = select(StaffRole.role_id).where(StaffRole.role_id.in_(role_ids)).where(StaffRole.rank == rank)
-        result = await session.scalars(stmt)
-
-    return result
+async def _is_in_db(
+    session: sqlalchemy.ext.asyncio.AsyncSession, guild_id: int, rank: str, role_ids: Iterable[int]
+) -> set[int]:
+    """Get which of `role_ids` already have `rank` in the guild, in a single query"""
+    stmt = (
+        select(StaffRole.role_id)
+        .where(StaffRole.guild_id == guild_id)
+        .where(StaffRole.rank == rank)
+        .where(StaffRole.role_id.in_(role_ids))
+    )
+    return set(await session.scalars(stmt))
 
 
 def _handler_docstring(remove):
@@ -71,41 +81,61 @@ def _handler_docstring(remove):
     return docstring
 
 
+async def _edit_staff_roles(guild_id: int, rank: str, role_ids: set[int], remove: bool) -> set[int]:
+    """Give or take `rank` from `role_ids`, returning those that are skipped as they already had it, or didn't"""
+    # Whatever the number of roles, this is one SELECT and at most one INSERT or DELETE, in one transaction
+    async with async_config_session() as session, session.begin():
+        in_db = await _is_in_db(session, guild_id, rank, role_ids)
+
+        if remove:
+            if in_db:
+                stmt = (
+                    delete(StaffRole)
+                    .where(StaffRole.guild_id == guild_id)
+                    .where(StaffRole.rank == rank)
+                    .where(StaffRole.role_id.in_(in_db))
+                )
+                await session.execute(stmt)
+            return role_ids - in_db  # Get roles NOT present in DB
+
+        if to_insert := role_ids - in_db:
+            stmt = insert(StaffRole).values(
+                [{"guild_id": guild_id, "rank": rank, "role_id": role_id} for role_id in to_insert]
+            )
+            await session.execute(stmt.on_conflict_do_nothing())
+        return in_db
+
+
+def _format_edit_result(roles: Iterable[hikari.Role], rank: str, role_to_skip: set[int], remove: bool) -> str:
+    operation_result = []
+    for role in roles:
+        if role.id in role_to_skip:
+            if remove:
+                operation_result.append(f"\N{WARNING SIGN} {role.mention} is not `{rank}`")
+            else:
+                operation_result.append(f"\N{WARNING SIGN} {role.mention} is already `{rank}`")
+
+        elif remove:
+            operation_result.append(f"\N{WHITE HEAVY CHECK MARK} {role.mention} removed from `{rank}`")
+        else:
+            operation_result.append(f"\N{WHITE HEAVY CHECK MARK} {role.mention} added as `{rank}`")
+
+    return "\n".join(operation_result)
+
+
 async def staff_edit_handler(ctx: context.Context, remove=False):
     if not (rank := _parse_rank(ctx.options.rank)):
         await ctx.respond(embed=create_failure_embed(title=f"Unknown rank {ctx.options.rank!r}!"))
         return
 
-    operation_result = []
-    async with async_config_session() as session:
-        role_to_skip = await _is_in_db(rank, *[role.id for role in ctx.options.roles])
-        if remove:
-            role_to_skip = set(ctx.options.roles) - set(role_to_skip)  # Get roles NOT present in DB
-
-        dupe_warning = False
-        role: hikari.Role
-        for role in ctx.options.roles:
-            if (role_id := role.id) in role_to_skip:
-                dupe_warning = True
-                if remove:
-                    operation_result.append(f"\N{WARNING SIGN} {role.mention} is not `{rank}`")
-                else:
-                    operation_result.append(f"\N{WARNING SIGN} {role.mention} is already `{rank}`")
+    roles: list[hikari.Role] = ctx.options.roles
+    role_to_skip = await _edit_staff_roles(ctx.guild_id, rank, {role.id for role in roles}, remove)
 
-            else:
-                entry = StaffRole(server_id=ctx.guild_id, rank=rank, role_id=role_id)
-                if remove:
-                    operation_result.append(f"\N{WHITE HEAVY CHECK MARK} {role.mention} removed from `{rank}`")
-                    await session.delete(entry)
-                else:
-                    operation_result.append(f"\N{WHITE HEAVY CHECK MARK} {role.mention} added as `{rank}`")
-                    session.add(entry)
+    staff_role_cache.invalidate(ctx.guild_id)
 
-        await session.commit()
-
-    role_set_embed = EmbedDict(title="Result", description="\n".join(operation_result))
+    role_set_embed = EmbedDict(title="Result", description=_format_edit_result(roles, rank, role_to_skip, remove))
 
-    if dupe_warning:
+    if role_to_skip:
         role_set_embed = create_warning_embed(**role_set_embed)
     else:
         role_set_embed = create_success_embed(**role_set_embed)
@@ -145,37 +175,62 @@ async def staff_remove(ctx: context.Context):
     await staff_edit_handler(ctx, remove=True)
 
 
-async def _query_role(ctx: context.Context, stmt: sqlalchemy.sql.Selectable) -> Iterable[str]:
-    async with async_config_session() as session:
-        result = await session.scalars(stmt)
-    return [(await RoleConverter(ctx).convert(str(role_id))).mention for role_id in result]
+async def _prune_stale_roles(guild_id: int, role_ids: Iterable[int]) -> None:
+    stmt = delete(StaffRole).where(StaffRole.guild_id == guild_id).where(StaffRole.role_id.in_(role_ids))
+
+    async with async_config_session() as session, session.begin():
+        result = await session.execute(stmt)
+
+    staff_role_cache.invalidate(guild_id)
+    logging.info(f"Pruned {result.rowcount} stale staff role(s) of guild {guild_id}.")
+
+
+async def _resolve_roles(ctx: context.Context) -> Mapping[int, hikari.Role]:
+    """Get every role of the guild at once, from hikari's cache or, if it's not cached, in one REST call"""
+    if roles := ctx.bot.cache.get_roles_view_for_guild(ctx.guild_id):
+        return roles
+
+    return {role.id: role for role in await ctx.bot.rest.fetch_roles(ctx.guild_id)}
+
+
+def _format_roles(role_ids: Iterable[int], roles: Mapping[int, hikari.Role]) -> str:
+    lines = [
+        f"\N{BULLET} {roles[role_id].mention}" if role_id in roles else f"\N{BULLET} ~~`{role_id}`~~ (deleted)"
+        for role_id in sorted(role_ids)
+    ]
+    return "\n".join(lines) or "None"
 
 
 @staff_command.child
+@lightbulb.option(
+    name="prune",
+    description="Remove staff roles that no longer exist.",
+    type=bool,
+    default=False,
+    required=False,
+)
 @lightbulb.command(name="info", description="List out current server's rank settings.")
 @lightbulb.implements(*Global.SUB_COMMAND_IMPLEMENTS)
 async def staff_list(ctx: context.Context):
-    base_stmt = select(StaffRole.role_id).where(StaffRole.guild_id == ctx.guild_id)
-    select_moderator = base_stmt.where(StaffRole.rank == "Moderator")
-    select_administrator = base_stmt.where(StaffRole.rank == "Administrator")
+    # Both ranks come from one cached snapshot, and all mentions from one lookup of the guild's roles
+    staff_roles = await staff_role_cache.get(ctx.guild_id)
+    roles = await _resolve_roles(ctx)
+    stale = (staff_roles.moderator | staff_roles.administrator) - roles.keys()
 
     role_info_embed = create_info_embed(
         title=f"Staff role info for `{ctx.get_guild().name}`",
         fields=[
-            EmbedField(
-                name="Moderator",
-                value="\n".join([f"\N{BULLET} {role}" for role in await _query_role(ctx, select_moderator)]) or "None",
-                inline=True,
-            ),
-            EmbedField(
-                name="Administrator",
-                value="\n".join([f"\N{BULLET} {role}" for role in await _query_role(ctx, select_administrator)])
-                or "None",
-                inline=True,
-            ),
+            EmbedField(name="Moderator", value=_format_roles(staff_roles.moderator, roles), inline=True),
+            EmbedField(name="Administrator", value=_format_roles(staff_roles.administrator, roles), inline=True),
         ],
     )
 
+    if stale and ctx.options.prune:
+        spawn(_prune_stale_roles(ctx.guild_id, stale), name=f"prune staff roles of {ctx.guild_id}")
+        role_info_embed.set_footer(f"{len(stale)} deleted role(s) are being removed.")
+    elif stale:
+        role_info_embed.set_footer(f"{len(stale)} role(s) no longer exist, use the prune option to remove them.")
+
     await ctx.respond(embed=role_info_embed)
 
 
@@ -187,5 +242,8 @@ async def staff_reset(ctx: context.Context):
 
     async with async_config_session() as session:
         await session.execute(stmt)
+        await session.commit()
+
+    staff_role_cache.invalidate(ctx.guild_id)
 
     await ctx.respond(embed=create_success_embed(title="Staff roles has been reset for this server!"))
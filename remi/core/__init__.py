@@ -1,2 +1,20 @@
-from .constant import Client, Global
-from .exceptions import *
+import importlib
+
+# Re-exports are resolved on first access, so importing one of remi.core's modules doesn't also load
+# (and configure) everything the others depend on
+_LAZY_EXPORTS = {
+    "Client": ".constant",
+    "Global": ".constant",
+    "ProtectedPlugin": ".exceptions",
+}
+
+
+def __getattr__(name: str):
+    if (module := _LAZY_EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(module, __name__), name)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_EXPORTS])
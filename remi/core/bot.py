@@ -1,32 +1,238 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Iterator, Optional
+
 import hikari
 import lightbulb
-from rich import print as _rprint
 from sqlalchemy import select
 
-from remi.core.constant import Banner, Client
+from remi.core.cache import owner_cache, prefix_cache, staff_role_cache
+from remi.core.check_memo import check_memo_scope
+from remi.core.check_plan import compile_checks
+from remi.core.constant import Client, MetricsConfig, PluginConfig, TracingConfig
+from remi.core.events import PluginsChangedEvent
+from remi.core.exceptions import StartupStageFailed
 from remi.core.help_command import HelpCommand
+from remi.core.hot_reload import hot_reloader
+from remi.core.metrics import MetricsServer, metrics
+from remi.core.pipeline import StartupPipeline
+from remi.core.response_memo import get_response_memos
 from remi.db.engine import (
     async_config_engine,
     async_config_session,
     dispose_all_engines,
+    report_db_profile,
 )
-from remi.db.schema.config import ConfigBase, ServerPrefix
+from remi.db.migration import apply_migrations
+from remi.db.schema.config import ServerPrefix
+from remi.res import assets
+from remi.res.asset import embed_resource_urls
+from remi.util.prefix_index import PrefixIndex
+from remi.util.tracing import span, start_span, tracer
 
-# Banner
-_rprint(Banner.banner_text)
+_prefix_resolution = metrics.histogram("prefix_resolution_seconds", "Time taken to resolve a guild's prefixes.")
+_messages_rejected = metrics.counter("messages_rejected_total", "Messages dropped without resolving any prefix.")
+_messages_passed = metrics.counter("messages_passed_total", "Messages let through to prefix resolution.")
+_messages_without_command = metrics.counter(
+    "messages_without_command_total", "Prefixed messages naming no command, not timed as commands."
+)
+_command_duration = metrics.histogram(
+    "command_duration_seconds", "Time taken to dispatch and run a command, by command.", ("command",)
+)
+_command_errors = metrics.counter(
+    "command_errors_total", "Commands that raised, by command and error.", ("command", "error")
+)
+metrics.gauge("gateway_latency_seconds", "Heartbeat latency of the gateway.").set_function(
+    lambda: bot.heartbeat_latency
+)
 
 
 # Prefix getter
-async def get_prefix(app: lightbulb.BotApp, message: hikari.Message) -> list[str]:
-    async with async_config_session() as session:
-        stmt = select(ServerPrefix.prefix).where(ServerPrefix.guild_id == message.guild_id)
-        server_prefix = (await session.scalars(stmt)).all()
+async def get_prefix(app: "RemiBot", message: hikari.Message) -> list[str]:
+    if message.guild_id is None:
+        return Client.PREFIX
+
+    start = time.perf_counter()
+    if not await app.stage_succeeded("database", "falling back to the default prefixes"):
+        return Client.PREFIX
+
+    prefixes = list(await prefix_cache.get(message.guild_id)) or Client.PREFIX
+
+    _prefix_resolution.observe(time.perf_counter() - start)
+    return prefixes
+
+
+def _command_name(context: lightbulb.context.Context) -> str:
+    return context.command.qualname if context.command else "unknown"
+
+
+class _TracedRespond:
+    """Times `respond()` as a stage of the invocation's trace"""
+
+    __slots__ = ()
+
+    async def respond(self, *args, **kwargs) -> lightbulb.ResponseProxy:
+        with span("respond"):
+            # Only mixed into contexts, which do respond
+            return await super().respond(*args, **kwargs)  # pylint: disable=no-member
+
+
+class _PrefixContext(_TracedRespond, lightbulb.context.PrefixContext):
+    """Remembers when it started and finished being resolved, for the trace of its command to include"""
+
+    __slots__ = ("resolution",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        now = time.perf_counter()
+        self.resolution: tuple[float, float] = (now, now)
+
+
+class _SlashContext(_TracedRespond, lightbulb.context.SlashContext):
+    __slots__ = ()
+
+
+class RemiBot(lightbulb.BotApp):
+    """
+    `lightbulb.BotApp` with a fast-reject path: messages that can't start with any configured prefix
+    are dropped before any prefix resolution, session or parser work happens. Checks are compiled
+    into cost-ordered plans when a plugin is added, and their results memoized per invocation. Memoized
+    responses of a plugin's commands are invalidated by their events only while the plugin is added.
+
+    Startup work runs as a `StartupPipeline`, of which the gateway only waits for the plugins to be
+    added. Commands only wait for whichever other stages their checks require, messages are dropped
+    if the plugins couldn't be loaded, and the default prefixes are used without the database.
+
+    A `tracer.sample_rate` sample of commands is traced, once they're resolved so that messages which aren't
+    commands cost nothing. Prefix command traces are backdated to when their context started resolving
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix_index = PrefixIndex(Client.PREFIX)
+        self.startup = StartupPipeline()
+        self._failed_stages: set[str] = set()
+
+    async def handle_message_create_for_prefix_commands(self, event: hikari.MessageCreateEvent) -> None:
+        if not self.prefix_index.may_match(event.message.content or ""):
+            _messages_rejected.inc()
+            return
+
+        _messages_passed.inc()
+        if not await self.stage_succeeded("plugins", "ignoring prefix commands"):
+            return
+
+        await super().handle_message_create_for_prefix_commands(event)
+
+    async def stage_succeeded(self, name: str, consequence: str) -> bool:
+        """Wait for a startup stage, returning whether it succeeded, for what's waited on per message"""
+        try:
+            await self.startup.wait_for(name)
+        except StartupStageFailed:
+            # The stage logged why already, say once what it means instead of raising every time
+            if name not in self._failed_stages:
+                self._failed_stages.add(name)
+                logging.error(f"Startup stage {name!r} failed, {consequence}.")
+            return False
+
+        return True
+
+    async def get_prefix_context(
+        self, event: hikari.MessageCreateEvent, cls: type[lightbulb.context.PrefixContext] = _PrefixContext
+    ) -> Optional[lightbulb.context.PrefixContext]:
+        start = time.perf_counter()
+        if isinstance(context := await super().get_prefix_context(event, cls), _PrefixContext):
+            context.resolution = (start, time.perf_counter())
+
+        return context
+
+    async def get_slash_context(
+        self,
+        event: hikari.InteractionCreateEvent,
+        command: lightbulb.SlashCommand,
+        cls: type[lightbulb.context.SlashContext] = _SlashContext,
+    ) -> lightbulb.context.SlashContext:
+        return await super().get_slash_context(event, command, cls)
+
+    # Every check evaluated while dispatching one command, including everything the help command
+    # filters through, shares its result within the invocation
+    async def process_prefix_commands(self, context: lightbulb.context.PrefixContext) -> None:
+        if context.command is None:
+            _messages_without_command.inc()
+            await super().process_prefix_commands(context)  # Raises CommandNotFound
+            return
+
+        start = time.perf_counter()
+        try:
+            with check_memo_scope(), self._trace_prefix_command(context), span("invoke"):
+                await super().process_prefix_commands(context)
+        finally:
+            _command_duration.labels(_command_name(context)).observe(time.perf_counter() - start)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _trace_prefix_command(context: lightbulb.context.PrefixContext) -> Iterator[None]:
+        if not isinstance(context, _PrefixContext):
+            yield
+            return
+
+        received, resolved = context.resolution
+        with tracer.trace("prefix command", received, command=_command_name(context), guild_id=context.guild_id):
+            if (resolution := start_span("resolve context", received)) is not None:
+                resolution.finish(resolved)
+            yield
+
+    async def invoke_application_command(self, context: lightbulb.context.ApplicationContext) -> None:
+        start = time.perf_counter()
+        try:
+            with check_memo_scope(), tracer.trace("application command", command=_command_name(context)):
+                await super().invoke_application_command(context)
+        finally:
+            _command_duration.labels(_command_name(context)).observe(time.perf_counter() - start)
+
+    async def maybe_dispatch_error_event(self, event: lightbulb.CommandErrorEvent, priority_handlers) -> bool:
+        # Counted here rather than by a listener, which would keep lightbulb from raising unhandled errors
+        _command_errors.labels(_command_name(event.context), type(event.exception).__name__).inc()
+        return await super().maybe_dispatch_error_event(event, priority_handlers)
+
+    def _invalidate_help_index(self) -> None:
+        # Built again on the next help request, not on each of the plugins added at startup
+        if isinstance(self.help_command, HelpCommand):
+            self.help_command.invalidate_index()
+
+    def add_plugin(self, plugin: lightbulb.Plugin) -> None:
+        compile_checks(plugin)
+        super().add_plugin(plugin)
+        self._invalidate_help_index()
+
+        for memo in get_response_memos(plugin):
+            for event_type in memo.invalidate_on:
+                self.subscribe(event_type, memo.on_event)
+
+        if self.is_alive:
+            self.dispatch(PluginsChangedEvent(app=self, plugin=plugin))
+
+    def remove_plugin(self, plugin_or_name: lightbulb.Plugin | str) -> None:
+        plugin = self.get_plugin(plugin_or_name) if isinstance(plugin_or_name, str) else plugin_or_name
+        super().remove_plugin(plugin_or_name)
+        self._invalidate_help_index()
 
-    return server_prefix or Client.PREFIX
+        if plugin is None:
+            return
+
+        for memo in get_response_memos(plugin):
+            for event_type in memo.invalidate_on:
+                self.unsubscribe(event_type, memo.on_event)
+
+        if self.is_alive:
+            self.dispatch(PluginsChangedEvent(app=self, plugin=plugin))
 
 
 # Get our bot instance
-bot = lightbulb.BotApp(
+bot = RemiBot(
     token=Client.TOKEN,
     prefix=lightbulb.app.when_mentioned_or(get_prefix),
     banner=None,
@@ -34,28 +240,155 @@ bot = lightbulb.BotApp(
     owner_ids=Client.OWNER_IDS,
 )
 
+tracer.sample_rate = TracingConfig.SAMPLE_RATE
+metrics_server = MetricsServer(metrics, MetricsConfig.HOST, MetricsConfig.PORT) if MetricsConfig.PORT else None
+
+
+CORE_PLUGINS = (
+    "remi.command.core.self",
+    "remi.command.core.profiler",
+    "remi.command.core.plugin_manager",
+    "remi.command.core.about",
+    "remi.command.core.staff_role",
+    "remi.command.core.prefix",
+)
+
+# Sets the lazily loaded plugins up, so it's imported either way
+PLUGIN_MANAGER = "remi.command.core.plugin_manager"
+
+
+# Startup stages, all started on StartingEvent without holding back the gateway connection
+@bot.startup.stage("database")
+async def prepare_database(_) -> None:
+    async with async_config_engine.begin() as conn:
+        await conn.run_sync(apply_migrations)
+
+    await report_db_profile()
+
+
+@bot.startup.stage("prefix_index", after=("database",))
+async def load_prefix_index(app: RemiBot) -> None:
+    async with async_config_session() as session:
+        app.prefix_index.add(*(await session.scalars(select(ServerPrefix.prefix))).all())
+
+
+async def _load_extensions(app: RemiBot, *load_paths: str) -> None:
+    # One at a time on the loop, as imports take the import lock, yielding in between so other stages
+    # and the gateway can make progress. A broken plugin doesn't keep the others from loading
+    for load_path in load_paths:
+        try:
+            app.load_extensions(load_path)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception(f"Could not load plugin {load_path!r}.")
+        await asyncio.sleep(0)
+
+
+@bot.startup.stage("plugins")
+async def load_core_plugins(app: RemiBot) -> None:
+    if not PluginConfig.LAZY:
+        await _load_extensions(app, *CORE_PLUGINS)
+        return
+
+    preload = [i for i in CORE_PLUGINS if i == PLUGIN_MANAGER or i in PluginConfig.PRELOAD]
+    await _load_extensions(app, *preload)
+
+    # pylint: disable=import-outside-toplevel
+    from remi.command.core.plugin_manager.plg_lazy import add_lazy_plugins
+
+    eager = add_lazy_plugins(app, [i for i in CORE_PLUGINS if i not in preload])
+    await _load_extensions(app, *eager)
+
+
+@bot.startup.stage("hot_reload", after=("plugins",))
+async def start_hot_reload(app: RemiBot) -> None:
+    if Client.DEV_MODE:
+        hot_reloader.start(app)
+
+
+@bot.startup.stage("metrics")
+async def serve_metrics(_) -> None:
+    if metrics_server is None:
+        return
+
+    try:
+        await metrics_server.start()
+    except OSError as ex:
+        logging.warning(f"Could not serve metrics on {MetricsConfig.HOST}:{MetricsConfig.PORT}: {ex}")
+
+
+@bot.startup.stage("owners")
+async def load_owners(app: RemiBot) -> None:
+    await owner_cache.bot_owner_ids(app)
+
+
+@bot.startup.stage("assets")
+async def host_assets(app: RemiBot) -> None:
+    if not Client.ASSET_CHANNEL_ID:
+        return
+
+    try:
+        await assets.host(app, Client.ASSET_CHANNEL_ID)
+    except hikari.HikariError as ex:
+        logging.warning(f"Could not host assets in channel {Client.ASSET_CHANNEL_ID}, uploading on first use: {ex}")
+
 
-# Set up some listener for events. In the future we might do some fancy async or DB that needs
-# graceful construction and deconstruction, so it's better to have some scaffold in place beforehand
 @bot.listen(hikari.StartingEvent)
 async def on_starting(_) -> None:
-    async with async_config_engine.begin() as conn:
-        await conn.run_sync(ConfigBase.metadata.create_all)
+    bot.startup.start(bot)
+
+    # lightbulb syncs application commands on StartedEvent, which only comes once every StartingEvent
+    # listener returned, so hold the gateway back until every plugin has been added
+    try:
+        await bot.startup.wait_for("plugins")
+    except StartupStageFailed:
+        pass  # Logged by the stage, the bot still starts
 
 
 @bot.listen(hikari.StoppingEvent)
 async def on_stopping(_) -> None:
+    bot.startup.cancel()
+    hot_reloader.stop()
+    if metrics_server is not None:
+        await metrics_server.stop()
     await dispose_all_engines()
 
 
+@bot.listen(hikari.GuildLeaveEvent)
+async def on_guild_leave(event: hikari.GuildLeaveEvent) -> None:
+    prefix_cache.invalidate(event.guild_id)
+    staff_role_cache.invalidate(event.guild_id)
+
+
+@bot.listen(hikari.RoleDeleteEvent)
+async def on_role_delete(event: hikari.RoleDeleteEvent) -> None:
+    staff_role_cache.invalidate(event.guild_id)
+
+
+# Bundled icons go out as attachments until Discord hands back a URL for them, in our own messages
+@bot.listen(hikari.MessageCreateEvent)
+async def on_message_create(event: hikari.MessageCreateEvent) -> None:
+    if assets.pending and event.message.embeds and (me := bot.get_me()) and event.author_id == me.id:
+        assets.learn(embed_resource_urls(event.message), event.message_id)
+
+
+# Their URLs stop working once that message is deleted
+@bot.listen(hikari.MessageDeleteEvent)
+async def on_message_delete(event: hikari.MessageDeleteEvent) -> None:
+    assets.forget((event.message_id,))
+
+
+@bot.listen(hikari.GuildBulkMessageDeleteEvent)
+async def on_bulk_message_delete(event: hikari.GuildBulkMessageDeleteEvent) -> None:
+    assets.forget(event.message_ids)
+
+
 @bot.listen(hikari.StartedEvent)
 async def on_started(_) -> None:
-    pass
-
+    me = bot.get_me()
+    bot.prefix_index.add(f"<@{me.id}>", f"<@!{me.id}>")
 
-# Load these by default
-bot.load_extensions("remi.command.core.self")
-bot.load_extensions("remi.command.core.plugin_manager")
-bot.load_extensions("remi.command.core.about")
-bot.load_extensions("remi.command.core.staff_role")
-bot.load_extensions("remi.command.core.prefix")
+    # Without the database every guild uses the default prefixes, which are indexed already
+    database = await bot.stage_succeeded("database", "falling back to the default prefixes")
+    # Without the guilds' own prefixes otherwise, the index keeps letting every message through
+    if not database or await bot.stage_succeeded("prefix_index", "letting every message through to prefix resolution"):
+        bot.prefix_index.ready = True
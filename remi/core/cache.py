@@ -0,0 +1,125 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import lightbulb
+from sqlalchemy import select
+
+from remi.core.metrics import metrics
+from remi.db.engine import async_config_session
+from remi.db.schema.config import ServerPrefix, StaffRole
+from remi.util.cache import AsyncLoadingCache
+
+GUILD_CACHE_SIZE = 4096
+BOT_OWNER_TTL = 3600  # seconds
+BOT_OWNER_RETRY = 60  # seconds, before trying again after a failed refresh
+
+
+@dataclass(frozen=True)
+class StaffRoleSnapshot:
+    """Immutable view of a guild's staff role IDs, grouped by rank"""
+
+    moderator: frozenset[int] = frozenset()
+    administrator: frozenset[int] = frozenset()
+
+
+class OwnerCache:
+    """
+    Resolve owners without spending REST calls on every check: bot owners are resolved once and
+    refreshed every `BOT_OWNER_TTL` seconds, guild owners are read from hikari's guild cache, and REST
+    is only used when the guild isn't cached.
+
+    Checks arriving while bot owners are refreshed share that one refresh. Should it fail, the owners known
+    until then are kept for another `BOT_OWNER_RETRY` seconds
+    """
+
+    def __init__(self, ttl: float = BOT_OWNER_TTL, retry: float = BOT_OWNER_RETRY):
+        self.ttl = ttl
+        self.retry = retry
+        self.hits = 0
+        self.misses = 0
+
+        self._bot_owner_ids: frozenset[int] = frozenset()
+        self._bot_owner_expiry = 0.0
+        self._refreshing: Optional[asyncio.Future] = None
+
+    async def refresh_bot_owners(self, app: lightbulb.BotApp) -> None:
+        # Re-fetch the application, lightbulb keeps it forever and team membership may have changed
+        if not app.owner_ids:
+            app.application = await app.rest.fetch_application()
+
+        self._bot_owner_ids = frozenset(await app.fetch_owner_ids())
+        self._bot_owner_expiry = time.monotonic() + self.ttl
+
+    async def _refresh_or_keep_stale(self, app: lightbulb.BotApp) -> None:
+        try:
+            await self.refresh_bot_owners(app)
+        except Exception as ex:  # pylint: disable=broad-except
+            logging.warning(f"Could not refresh bot owners, keeping {len(self._bot_owner_ids)} known owner(s): {ex}")
+            self._bot_owner_expiry = time.monotonic() + self.retry
+
+    def _refreshed(self, _) -> None:
+        self._refreshing = None
+
+    async def bot_owner_ids(self, app: lightbulb.BotApp) -> frozenset[int]:
+        if time.monotonic() < self._bot_owner_expiry:
+            self.hits += 1
+            return self._bot_owner_ids
+
+        self.misses += 1
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh_or_keep_stale(app))
+            self._refreshing.add_done_callback(self._refreshed)
+
+        # A cancelled check mustn't cancel the refresh the others are waiting on
+        await asyncio.shield(self._refreshing)
+        return self._bot_owner_ids
+
+    async def guild_owner_id(self, app: lightbulb.BotApp, guild_id: int) -> int:
+        if guild := app.cache.get_guild(guild_id):
+            self.hits += 1
+            return guild.owner_id
+
+        self.misses += 1
+        return (await app.rest.fetch_guild(guild_id)).owner_id
+
+
+async def _load_guild_prefixes(guild_id: int) -> tuple[str, ...]:
+    async with async_config_session() as session:
+        stmt = select(ServerPrefix.prefix).where(ServerPrefix.guild_id == guild_id)
+        return tuple((await session.scalars(stmt)).all())
+
+
+async def _load_staff_roles(guild_id: int) -> StaffRoleSnapshot:
+    async with async_config_session() as session:
+        stmt = select(StaffRole.rank, StaffRole.role_id).where(StaffRole.guild_id == guild_id)
+        rows = (await session.execute(stmt)).all()
+
+    return StaffRoleSnapshot(
+        moderator=frozenset(role_id for rank, role_id in rows if rank == "Moderator"),
+        administrator=frozenset(role_id for rank, role_id in rows if rank == "Administrator"),
+    )
+
+
+owner_cache = OwnerCache()
+
+# Guilds without a custom prefix are cached as an empty tuple so they don't hit the DB either
+prefix_cache: AsyncLoadingCache[int, tuple[str, ...]] = AsyncLoadingCache(_load_guild_prefixes, GUILD_CACHE_SIZE)
+
+# Invalidated (not patched) on writes, the next check reloads the whole guild in one query
+staff_role_cache: AsyncLoadingCache[int, StaffRoleSnapshot] = AsyncLoadingCache(_load_staff_roles, GUILD_CACHE_SIZE)
+
+# Read when scraped, the caches keep counting on their own
+_cache_hits = metrics.counter("cache_hits_total", "Lookups answered from memory, by cache.", ("cache",))
+_cache_misses = metrics.counter("cache_misses_total", "Lookups that had to load, by cache.", ("cache",))
+_cache_size = metrics.gauge("cache_entries", "Entries currently cached, by cache.", ("cache",))
+
+for _name, _cache in (("prefix", prefix_cache), ("staff_role", staff_role_cache), ("owner", owner_cache)):
+    _cache_hits.labels(_name).set_function(lambda cache=_cache: cache.hits)
+    _cache_misses.labels(_name).set_function(lambda cache=_cache: cache.misses)
+
+_cache_size.labels("prefix").set_function(lambda: len(prefix_cache))
+_cache_size.labels("staff_role").set_function(lambda: len(staff_role_cache))
@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+import inspect
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+import lightbulb
+from lightbulb import checks, context
+
+from remi.core.metrics import metrics
+from remi.util.tracing import span
+
+LightbulbCheck = Union[checks.Check, checks._ExclusiveCheck]  # pylint: disable=protected-access
+
+_check_results = metrics.counter(
+    "check_evaluations_total", "Checks evaluated, by check and result (passed, failed, error).", ("check", "result")
+)
+_check_memo_hits = metrics.counter("check_memo_hits_total", "Check results reused within an invocation.")
+_check_names: dict[LightbulbCheck, str] = {}
+
+# Tasks of the checks evaluated in the current invocation, keyed on (check, id(context)). Contexts
+# use __slots__ without __weakref__, but they outlive the scope so their IDs can't be reused within it
+_check_memo: contextvars.ContextVar[Union[dict, None]] = contextvars.ContextVar("_check_memo", default=None)
+
+
+@contextmanager
+def check_memo_scope() -> Iterator[None]:
+    """Share check results between everything evaluated within, nested scopes reuse the outermost one"""
+    if _check_memo.get() is not None:
+        yield
+        return
+
+    token = _check_memo.set({})
+    try:
+        yield
+    finally:
+        _check_memo.reset(token)
+
+
+def _check_name(check: LightbulbCheck) -> str:
+    if (name := _check_names.get(check)) is None:
+        name = check.__name__  # A method of combined checks
+        name = _check_names[check] = name() if callable(name) else name
+
+    return name
+
+
+async def _run_check(check: LightbulbCheck, ctx: context.Context) -> bool:
+    try:
+        with span("check", check=_check_name(check)):
+            result = check(ctx)
+            if inspect.iscoroutine(result):
+                result = await result
+    except lightbulb.CheckFailure:
+        _check_results.labels(_check_name(check), "failed").inc()
+        raise
+    except Exception:
+        _check_results.labels(_check_name(check), "error").inc()
+        raise
+
+    _check_results.labels(_check_name(check), "passed" if result else "failed").inc()
+    return result
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    # Nobody may be left waiting on a failed check, e.g. if they were all cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def evaluate_check(check: LightbulbCheck, ctx: context.Context) -> bool:
+    """
+    Evaluate `check`, reusing its result, or re-raising its failure, if already evaluated in this scope.
+    Concurrent evaluations of the same check wait for the first one instead of running it again
+    """
+    if (memo := _check_memo.get()) is None:
+        return await _run_check(check, ctx)
+
+    key = (check, id(ctx))
+    if (task := memo.get(key)) is not None:
+        _check_memo_hits.inc()
+    else:
+        task = memo[key] = asyncio.ensure_future(_run_check(check, ctx))
+        task.add_done_callback(_retrieve)
+
+    # Cancelling one of the evaluations waiting on the check mustn't cancel it for the others
+    return await asyncio.shield(task)
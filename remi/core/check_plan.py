@@ -0,0 +1,181 @@
+# pylint: disable=protected-access
+import enum
+import inspect
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+import lightbulb
+from lightbulb import checks, commands, context, plugins
+
+from remi.core.check_memo import LightbulbCheck, evaluate_check
+
+
+class CheckCost(enum.IntEnum):
+    """Rough cost class of a check, cheaper checks are evaluated first"""
+
+    LOCAL = 0  # Pure attribute/permission tests on objects already at hand
+    CACHE = 1  # In-memory lookups that may occasionally fall through to I/O
+    DATABASE = 2
+    NETWORK = 3
+
+
+def check_cost(cost: CheckCost) -> Callable:
+    """Declare the cost class of a check function. Apply it below `@lightbulb.Check`"""
+
+    def decorate(func: Callable) -> Callable:
+        func.__check_cost__ = cost
+        return func
+
+    return decorate
+
+
+# lightbulb's own checks, all of them only touch the context and hikari's cache, except for
+# owner_only which fetches the owner IDs once if they weren't given to the bot
+_BUILTIN_COSTS = {
+    checks._owner_only: CheckCost.CACHE,
+    checks._guild_only: CheckCost.LOCAL,
+    checks._dm_only: CheckCost.LOCAL,
+    checks._bot_only: CheckCost.LOCAL,
+    checks._webhook_only: CheckCost.LOCAL,
+    checks._human_only: CheckCost.LOCAL,
+    checks._nsfw_channel_only: CheckCost.LOCAL,
+    checks._has_roles: CheckCost.LOCAL,
+    checks._has_role_permissions: CheckCost.LOCAL,
+    checks._has_channel_permissions: CheckCost.LOCAL,
+    checks._has_guild_permissions: CheckCost.LOCAL,
+    checks._bot_has_guild_permissions: CheckCost.LOCAL,
+    checks._bot_has_role_permissions: CheckCost.LOCAL,
+    checks._bot_has_channel_permissions: CheckCost.LOCAL,
+    checks._has_attachments: CheckCost.LOCAL,
+}
+
+
+def cost_of(check: LightbulbCheck) -> CheckCost:
+    """
+    Get a check's declared cost class. Undeclared coroutine checks are assumed to do I/O, undeclared
+    synchronous ones to be local
+    """
+    if isinstance(check, checks._ExclusiveCheck):
+        return max(cost_of(i) for i in check._checks)
+
+    callback = check.prefix_callback
+    while isinstance(callback, partial):
+        callback = callback.func
+
+    if (cost := getattr(callback, "__check_cost__", None)) is not None:
+        return cost
+
+    if (cost := _BUILTIN_COSTS.get(callback)) is not None:
+        return cost
+
+    return CheckCost.DATABASE if inspect.iscoroutinefunction(callback) else CheckCost.LOCAL
+
+
+@dataclass(frozen=True)
+class CheckPlan:
+    """Deduplicated checks of a command, ordered by cost. Evaluation stops at the first failure"""
+
+    command: str
+    steps: tuple[tuple[CheckCost, LightbulbCheck], ...]
+
+    @classmethod
+    def compile(cls, command: str, checks_: Iterable[LightbulbCheck]) -> "CheckPlan":
+        # dict.fromkeys() deduplicates while keeping declaration order, which sorted() then keeps
+        # within each cost class
+        steps = sorted(((cost_of(check), check) for check in dict.fromkeys(checks_)), key=lambda step: step[0])
+        return cls(command=command, steps=tuple(steps))
+
+    @property
+    def checks(self) -> tuple[LightbulbCheck, ...]:
+        return tuple(check for _, check in self.steps)
+
+    async def evaluate(self, ctx: context.Context) -> bool:
+        for _, check in self.steps:
+            if not await evaluate_check(check, ctx):
+                raise lightbulb.CheckFailure(f"Check {check.__name__} failed for command {self.command}")
+
+        return True
+
+
+class CompiledCheck(lightbulb.Check):
+    """
+    Stand-in for all of a command's checks, plugin-level and inherited ones included. Keeps the checks it
+    was compiled from, and whether the command inherited its parent's, so a plugin can be compiled again
+    when it's re-added
+    """
+
+    __slots__ = ("plan", "plugin_checks", "own_checks", "inherits")
+
+    def __init__(
+        self,
+        plan: CheckPlan,
+        plugin_checks: Sequence[LightbulbCheck],
+        own_checks: Sequence[LightbulbCheck],
+        inherits: bool = False,
+    ):
+        super().__init__(plan.evaluate)
+        self.plan = plan
+        self.plugin_checks = tuple(plugin_checks)
+        self.own_checks = tuple(own_checks)
+        self.inherits = inherits
+
+    def __repr__(self) -> str:
+        return f"CompiledCheck({self.plan.command})"
+
+    @property
+    def __name__(self) -> str:
+        return "compiled_checks"
+
+
+def _compiled(command: commands.CommandLike | commands.Command) -> Optional[CompiledCheck]:
+    match command.checks:
+        case [CompiledCheck() as compiled]:
+            return compiled
+
+    return None
+
+
+def _walk_command_likes(
+    command_likes: Iterable[commands.CommandLike], parent: Optional[commands.CommandLike] = None, prefix: str = ""
+) -> Iterator[tuple[str, commands.CommandLike, Optional[commands.CommandLike]]]:
+    for command_like in command_likes:
+        qualname = f"{prefix}{command_like.name}"
+        yield qualname, command_like, parent
+        yield from _walk_command_likes(command_like.subcommands, command_like, f"{qualname} ")
+
+
+def _declared_checks(command_like: commands.CommandLike) -> tuple[tuple[LightbulbCheck, ...], bool]:
+    """The command's own checks, and whether it inherits its parent's, as declared before any compilation"""
+    if compiled := _compiled(command_like):
+        return compiled.own_checks, compiled.inherits
+
+    return tuple(command_like.checks), command_like.inherit_checks
+
+
+def compile_checks(plugin: plugins.Plugin) -> None:
+    """
+    Replace the checks of the plugin and of all its (sub)commands with one `CompiledCheck` per
+    command. The plugin's own check list is emptied, as every plan already includes it, and commands
+    stop inheriting their parent's checks, or lightbulb would evaluate the parent's plan on top of theirs
+    """
+    walked = list(_walk_command_likes(plugin._raw_commands))
+
+    plugin_checks = plugin._checks[:]
+    if not plugin_checks:  # Compiled before, recover the plugin's checks from any of its plans
+        plugin_checks = next((list(c.plugin_checks) for _, i, _ in walked if (c := _compiled(i))), [])
+
+    sources = {id(command_like): _declared_checks(command_like) for _, command_like, _ in walked}
+
+    for qualname, command_like, parent in walked:
+        own_checks, inherits = sources[id(command_like)]
+        inherited = sources[id(parent)][0] if parent is not None and inherits else ()
+        plan = CheckPlan.compile(qualname, [*plugin_checks, *own_checks, *inherited])
+        command_like.checks[:] = [CompiledCheck(plan, plugin_checks, own_checks, inherits)]
+        command_like.inherit_checks = False
+
+    plugin._checks.clear()
+
+
+def get_check_plan(command: commands.Command) -> Optional[CheckPlan]:
+    return compiled.plan if (compiled := _compiled(command)) else None
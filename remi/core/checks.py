@@ -1,46 +1,55 @@
 import lightbulb
 from hikari.permissions import Permissions
 from lightbulb import checks, context
-from sqlalchemy import select
 
-from remi.db.engine import async_config_session
-from remi.db.schema.config import StaffRole
+from remi.core.cache import owner_cache, staff_role_cache
+from remi.core.check_plan import CheckCost, check_cost
+from remi.core.pipeline import requires_stages
 
+_ADMINISTRATOR_PERMISSIONS = checks.has_guild_permissions(Permissions.MANAGE_GUILD, Permissions.ADMINISTRATOR)
+_MODERATOR_PERMISSIONS = checks.has_guild_permissions(Permissions.KICK_MEMBERS, Permissions.BAN_MEMBERS)
 
-@lightbulb.Check
-async def is_moderator(ctx: context.Context) -> bool:
-    if await is_administrator(ctx):
-        return True
 
-    if checks.has_guild_permissions(Permissions.KICK_MEMBERS, Permissions.BAN_MEMBERS)(ctx):
-        return True
+def _passes(check: lightbulb.Check, ctx: context.Context) -> bool:
+    """Run a synchronous lightbulb check, turning its failure into `False` instead of raising"""
+    try:
+        return check(ctx)
+    except lightbulb.CheckFailure:
+        return False
 
-    async with async_config_session() as session:
-        stmt = select(StaffRole.role_id).where(StaffRole.guild_id == ctx.guild_id).where(StaffRole.rank == "Moderator")
 
-        query_result = await session.scalars(stmt)
+async def _is_owner(ctx: context.Context) -> bool:
+    author_id = ctx.member.id
 
-    return not set(ctx.member.role_ids).isdisjoint(query_result)
+    if author_id in await owner_cache.bot_owner_ids(ctx.bot):
+        return True
 
+    return author_id == await owner_cache.guild_owner_id(ctx.bot, ctx.guild_id)
 
-@lightbulb.Check
-async def is_administrator(ctx: context.Context) -> bool:
-    author_id = ctx.member.id
 
-    if author_id in await ctx.bot.fetch_owner_ids():
+# Both may load the guild's staff roles from the database, or fetch the owners over REST
+@lightbulb.Check
+@check_cost(CheckCost.NETWORK)
+async def is_moderator(ctx: context.Context) -> bool:
+    if _passes(_ADMINISTRATOR_PERMISSIONS, ctx) or _passes(_MODERATOR_PERMISSIONS, ctx) or await _is_owner(ctx):
         return True
 
-    if author_id == (await ctx.get_guild().fetch_owner()).id:
-        return True
+    staff_roles = await staff_role_cache.get(ctx.guild_id)
+    role_ids = ctx.member.role_ids
+
+    return not (staff_roles.administrator.isdisjoint(role_ids) and staff_roles.moderator.isdisjoint(role_ids))
 
-    if checks.has_guild_permissions(Permissions.MANAGE_GUILD, Permissions.ADMINISTRATOR)(ctx):
+
+@lightbulb.Check
+@check_cost(CheckCost.NETWORK)
+async def is_administrator(ctx: context.Context) -> bool:
+    if _passes(_ADMINISTRATOR_PERMISSIONS, ctx) or await _is_owner(ctx):
         return True
 
-    async with async_config_session() as session:
-        stmt = (
-            select(StaffRole.role_id).where(StaffRole.guild_id == ctx.guild_id).where(StaffRole.rank == "Administrator")
-        )
+    staff_roles = await staff_role_cache.get(ctx.guild_id)
+
+    return not staff_roles.administrator.isdisjoint(ctx.member.role_ids)
 
-        query_result = await session.scalars(stmt)
 
-    return not set(ctx.member.role_ids).isdisjoint(query_result)
+# For commands touching the config database, holds them back while the database is still being prepared
+database_ready = requires_stages("database")
@@ -4,15 +4,14 @@ import os
 import string
 import sys
 from dataclasses import dataclass
+from functools import cache
 from importlib import resources
 from pathlib import Path
 from platform import machine, python_version, release, system
-from typing import Final, Tuple
+from typing import Final, Optional, Tuple
 
 import hikari
 import lightbulb
-import loguru
-import sqlalchemy
 from lightbulb import commands
 
 
@@ -24,8 +23,50 @@ def parse_owner_ids():
         return ()
 
 
+def parse_asset_channel_id() -> Optional[int]:
+    if not (asset_channel_id := os.getenv("ASSET_CHANNEL_ID")):
+        return None
+
+    try:
+        return int(asset_channel_id)
+    except ValueError:
+        logging.warning("Could not parse environment variable ASSET_CHANNEL_ID, uploading assets on first use")
+        return None
+
+
+def parse_metrics_port() -> Optional[int]:
+    if not (metrics_port := os.getenv("METRICS_PORT")):
+        return None
+
+    try:
+        return int(metrics_port)
+    except ValueError:
+        logging.warning("Could not parse environment variable METRICS_PORT, not serving metrics")
+        return None
+
+
+def parse_trace_sample_rate() -> float:
+    try:
+        return min(max(float(os.getenv("TRACE_SAMPLE_RATE") or 0), 0.0), 1.0)
+    except ValueError:
+        logging.warning("Could not parse environment variable TRACE_SAMPLE_RATE, not tracing commands")
+        return 0.0
+
+
+def parse_slow_query_ms() -> Optional[float]:
+    if not (slow_query_ms := os.getenv("SLOW_QUERY_MS")):
+        return None
+
+    try:
+        return max(float(slow_query_ms), 0.0)
+    except ValueError:
+        logging.warning("Could not parse environment variable SLOW_QUERY_MS, not logging slow queries")
+        return None
+
+
 def get_data_path() -> Path:
-    # Check for CONFIG_PATH's existence, default to current directory
+    # Check for CONFIG_PATH's existence, default to current directory. Running remi asks for confirmation
+    # before it gets here when it's not an absolute path, importing never does
     if not (data_path_env_var := os.getenv("DATA_PATH")):
         data_path = Path(".")
         logging.warning("`CONFIG_PATH` not set. Defaulting to current directory.")
@@ -33,16 +74,7 @@ def get_data_path() -> Path:
         data_path = Path(data_path_env_var)
 
     # Convert CONFIG_PATH to absolute path
-    if not data_path.is_absolute():
-        data_path = data_path.absolute()
-        print(f"Do you want to use '{data_path}' to store bot's data? (y/N): ", end="")
-
-        match input().lower():
-            case "y":
-                logging.info(f"Using '{data_path}' as data folder.")
-                logging.info(f"To suppress this message, set `DATA_PATH` to '{data_path}'.")
-            case _:
-                sys.exit(1)
+    data_path = data_path.absolute()
 
     # Create CONFIG_PATH
     if not data_path.exists():
@@ -60,6 +92,14 @@ def is_dev_mode() -> bool:
     return bool(os.getenv("REMI_DEVMODE", default=""))
 
 
+def is_lazy_plugins() -> bool:
+    return bool(os.getenv("LAZY_PLUGINS", default=""))
+
+
+def parse_preload_plugins() -> Tuple[str, ...]:
+    return tuple(i.strip() for i in os.getenv("PRELOAD_PLUGINS", default="").split(",") if i.strip())
+
+
 @dataclass(frozen=True)
 class Global:
     COMMAND_IMPLEMENTS: Final = (commands.SlashCommand, commands.PrefixCommand)
@@ -75,10 +115,40 @@ class Client:
     OWNER_IDS: Final[Tuple[int]] = parse_owner_ids()
     DATA_PATH: Final[Path] = get_data_path()
     DEV_MODE: Final[bool] = is_dev_mode()
+    ASSET_CHANNEL_ID: Final[Optional[int]] = parse_asset_channel_id()
+
+
+@dataclass(frozen=True)
+class DatabaseConfig:
+    PROFILE: Final[str] = os.getenv("DB_PROFILE") or "throughput"
+    SLOW_QUERY_MS: Final[Optional[float]] = parse_slow_query_ms()
+
+
+@dataclass(frozen=True)
+class PluginConfig:
+    LAZY: Final[bool] = is_lazy_plugins()
+    PRELOAD: Final[Tuple[str, ...]] = parse_preload_plugins()
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    HOST: Final[str] = os.getenv("METRICS_HOST") or "127.0.0.1"
+    PORT: Final[Optional[int]] = parse_metrics_port()
+
+
+@dataclass(frozen=True)
+class TracingConfig:
+    SAMPLE_RATE: Final[float] = parse_trace_sample_rate()
+
 
+@cache
+def get_banner_text() -> str:
+    # Only the banner needs these, and only once the bot imported them anyway
+    # pylint: disable=import-outside-toplevel
+    import loguru
+    import sqlalchemy
 
-class Banner:
-    banner_text = string.Template(resources.read_text("remi.core", "banner.txt")).safe_substitute(
+    return string.Template(resources.files("remi.core").joinpath("banner.txt").read_text()).safe_substitute(
         hikari_version=hikari.__version__,
         lightbulb_version=lightbulb.__version__,
         loguru_version=loguru.__version__,
@@ -0,0 +1,10 @@
+import attr
+import lightbulb
+
+
+@attr.s(slots=True, weakref_slot=False)
+class PluginsChangedEvent(lightbulb.events.LightbulbEvent):
+    """Dispatched whenever a plugin is added to or removed from a running bot"""
+
+    plugin: lightbulb.Plugin = attr.ib()
+    """The plugin that was added or removed."""
@@ -3,3 +3,11 @@ from lightbulb import LightbulbError
 
 class ProtectedPlugin(LightbulbError):
     """Raise when user try to unload operation-critical plugins."""
+
+
+class StartupStageFailed(RuntimeError):
+    """Raise when a startup stage, or any stage it depends on, failed."""
+
+
+class HotReloadFailed(LightbulbError):
+    """Raise when reloading plugin modules failed, and the previous version was put back."""
@@ -1,13 +1,20 @@
 # pylint: disable=arguments-renamed
-from typing import Union
+import asyncio
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
 
 import hikari
 import lightbulb
 from lightbulb import commands, context, plugins
 from lightbulb.help_command import filter_commands
-from lightbulb.utils import ButtonNavigator, EmbedPaginator
+from lightbulb.utils import ButtonNavigator, StringPaginator
 
+from remi.core.check_memo import LightbulbCheck, evaluate_check
+from remi.core.check_plan import get_check_plan
+from remi.core.lazy_plugin import LazyPlugin
+from remi.core.metrics import metrics
 from remi.res import Resource
+from remi.util.cache import LRUCache
 from remi.util.embed import create_embed_from_dict
 
 LightbulbCommandGroup = Union[
@@ -18,35 +25,166 @@ LightbulbCommandGroup = Union[
 ]
 
 
+_help_requests = metrics.counter("help_requests_total", "Help requests, by what help was asked for.", ("kind",))
+_help_pages = metrics.counter("help_page_renders_total", "Help pages looked up, by cache result.", ("result",))
+_help_pages_hit, _help_pages_miss = _help_pages.labels("hit"), _help_pages.labels("miss")
+
+
+@dataclass(frozen=True)
+class _PluginHelp:
+    name: str
+    description: str
+    # Help line of each command, with the indices (into `HelpIndex.checks`) of the checks it needs
+    commands: tuple[tuple[str, frozenset[int]], ...]
+    # Indices of the checks any of its commands need
+    checks: frozenset[int]
+
+
+def _checks_of(command: commands.Command) -> Iterable[LightbulbCheck]:
+    if plan := get_check_plan(command):
+        return plan.checks
+
+    return [*getattr(command.plugin, "_checks", []), *command.checks]
+
+
+class HelpIndex:
+    """
+    Help lines of every plugin's commands, built when plugins are (un)loaded rather than on every
+    `[p]help`. Rendered pages are cached per permission bucket, i.e. the set of checks a caller
+    passes, as that alone decides which commands they get to see
+    """
+
+    MAX_CACHED_PAGES = 128
+
+    def __init__(self, plugins_: Iterable[plugins.Plugin]):
+        check_indices: dict[LightbulbCheck, int] = {}
+        self.plugins: dict[str, _PluginHelp] = {}
+
+        for plugin in plugins_:
+            # Slash and prefix implementations of the same command share a name
+            entries = {}
+            for cmd in plugin.all_commands:
+                if cmd.hidden or cmd.name in entries:
+                    continue
+
+                required = frozenset(check_indices.setdefault(check, len(check_indices)) for check in _checks_of(cmd))
+                entries[cmd.name] = (HelpCommand.command_help_line(cmd), required)
+
+            checks = frozenset().union(*(required for _, required in entries.values()))
+            self.plugins[plugin.name] = _PluginHelp(plugin.name, plugin.description, tuple(entries.values()), checks)
+
+        self.checks: tuple[LightbulbCheck, ...] = tuple(check_indices)
+        self._pages: LRUCache[tuple[frozenset[int], Optional[str]], tuple[str, ...]] = LRUCache(self.MAX_CACHED_PAGES)
+
+    def _plugins_shown(self, plugin_name: Optional[str]) -> Iterable[_PluginHelp]:
+        return [self.plugins[plugin_name]] if plugin_name else self.plugins.values()
+
+    async def get_bucket(self, ctx: context.Context, plugin_name: Optional[str] = None) -> frozenset[int]:
+        """
+        Evaluate each distinct check of the plugins shown, all of them by default, once and concurrently,
+        and get the indices of those passed
+        """
+        indices = sorted(frozenset().union(*(plugin.checks for plugin in self._plugins_shown(plugin_name))))
+        semaphore = asyncio.Semaphore(HelpCommand.MAX_CONCURRENT_CHECKS)
+
+        async def passes(check: LightbulbCheck) -> bool:
+            async with semaphore:
+                try:
+                    return bool(await evaluate_check(check, ctx))
+                except Exception:  # pylint: disable=broad-except
+                    # Same as lightbulb, any error raised by a check means the command is unavailable
+                    return False
+
+        results = await asyncio.gather(*(passes(self.checks[index]) for index in indices))
+
+        return frozenset(index for index, passed in zip(indices, results) if passed)
+
+    def _render(self, bucket: frozenset[int], plugin_name: Optional[str]) -> tuple[str, ...]:
+        paginator = StringPaginator(max_lines=HelpCommand.EMBED_PAG_MAX_LINE, max_chars=HelpCommand.EMBED_PAG_MAX_CHAR)
+        for plugin in self._plugins_shown(plugin_name):
+            paginator.add_line(f"__**{plugin.name}** - *{plugin.description}*__")
+
+            lines = [line for line, required in plugin.commands if required <= bucket]
+            [paginator.add_line(line) for line in lines or ["None"]]  # "None" if author has no access to any command
+
+            paginator.add_line("")
+
+        return tuple(paginator.build_pages())
+
+    async def get_pages(self, ctx: context.Context, plugin: Optional[plugins.Plugin] = None) -> tuple[str, ...]:
+        plugin_name = plugin.name if plugin else None
+        key = (await self.get_bucket(ctx, plugin_name), plugin_name)
+
+        if (pages := self._pages.get(key)) is None:
+            _help_pages_miss.inc()
+            pages = self._render(*key)
+            self._pages.set(key, pages)
+        else:
+            _help_pages_hit.inc()
+
+        return pages
+
+
 class HelpCommand(lightbulb.BaseHelpCommand):
     EMBED_PAG_MAX_LINE = 30
     EMBED_PAG_MAX_CHAR = 1024
     EMBED_COLOR = 0x7CB7FF
+    MAX_CONCURRENT_CHECKS = 8
 
-    @staticmethod
-    async def _gather_command_helps(plugin: plugins.Plugin, ctx: context.Context) -> list[str]:
-        """Generate help for `[p]help` and `[p]help plugin`"""
-        # Get all unique commands and generate their help
-        unique_commands = set()
+    def __init__(self, app: lightbulb.BotApp):
+        super().__init__(app)
+        self._index: Optional[HelpIndex] = None
 
-        for cmd in await filter_commands(plugin.all_commands, ctx):
-            match cmd:
-                case lightbulb.PrefixCommandGroup() | lightbulb.SlashCommandGroup():
-                    help_line = f"**`{cmd.name}`** - (Group) {cmd.description}"
-                case _:
-                    help_line = f"**`{cmd.name}`** - {cmd.description}"
+    @property
+    def index(self) -> HelpIndex:
+        """The help index, built on first use after plugins were (un)loaded"""
+        if self._index is None:
+            self._index = HelpIndex(self.bot.plugins.values())
+
+        return self._index
+
+    def invalidate_index(self) -> None:
+        """Drop the help index along with all cached pages. Called whenever a plugin is (un)loaded"""
+        self._index = None
+
+    def lazy_plugin_of(self, obj: str) -> Optional[LazyPlugin]:
+        """The plugin not imported yet that help for `obj`, a plugin or command invocation, is about"""
+        plugin = self.app.get_plugin(obj)
+        if plugin is None and (words := obj.split()) and (command := self.app.get_prefix_command(words[0])):
+            plugin = command.plugin
+
+        return plugin if isinstance(plugin, LazyPlugin) else None
+
+    @staticmethod
+    async def may_activate(ctx: context.Context, plugin: LazyPlugin) -> bool:
+        """Only those who could invoke one of the stubs get to import the plugin by asking for help"""
+        for command in plugin.all_commands:
+            try:
+                if await command.evaluate_checks(ctx):
+                    return True
+            except lightbulb.CheckFailure:
+                continue
 
-            unique_commands.add(help_line)
+        return False
 
-        # Prepare the help lines for EmbedPaginator.add_line()
-        help_lines = list(unique_commands)
-        help_lines.insert(0, f"__**{plugin.name}** - *{plugin.description}*__")
-        help_lines.append("")
+    async def send_help(self, ctx: context.Context, obj: Optional[str]) -> None:
+        # Help for a plugin that isn't imported yet, or one of its commands, is the real plugin's
+        if (
+            obj is not None
+            and (plugin := self.lazy_plugin_of(obj)) is not None
+            and await self.may_activate(ctx, plugin)
+        ):
+            await plugin.activate(self.app)
 
-        if not unique_commands:  # Author has no access to all commands of plugin
-            help_lines.insert(1, "None")
+        await super().send_help(ctx, obj)
 
-        return help_lines
+    @staticmethod
+    def command_help_line(cmd: commands.Command) -> str:
+        match cmd:
+            case lightbulb.PrefixCommandGroup() | lightbulb.SlashCommandGroup():
+                return f"**`{cmd.name}`** - (Group) {cmd.description}"
+            case _:
+                return f"**`{cmd.name}`** - {cmd.description}"
 
     def _build_bot_help_embed(self, page_index: int, page_content: str) -> hikari.Embed:
         embed_dict = {
@@ -64,20 +202,10 @@ class HelpCommand(lightbulb.BaseHelpCommand):
 
         Doubles as `[p]help plugin` when `plugin` is supplied
         """
-        # Prepare the embed
-        help_embed = EmbedPaginator(max_lines=self.EMBED_PAG_MAX_LINE, max_chars=self.EMBED_PAG_MAX_CHAR)
-        help_embed.set_embed_factory(self._build_bot_help_embed)
-
-        # Build the embed
-        if not plugin:  # No plugin specified
-            plugins_ = self.bot.plugins.values()
-        else:
-            plugins_ = [plugin]
-
-        for plg in plugins_:
-            [help_embed.add_line(line) for line in await self._gather_command_helps(plg, ctx)]
+        _help_requests.labels("plugin" if plugin else "bot").inc()
+        pages = await self.index.get_pages(ctx, plugin)
 
-        navigator = ButtonNavigator(help_embed.build_pages())
+        navigator = ButtonNavigator([self._build_bot_help_embed(i, page) for i, page in enumerate(pages, start=1)])
         await navigator.run(ctx)
 
     async def send_plugin_help(self, ctx: context.base.Context, plugin: plugins.Plugin) -> None:
@@ -88,6 +216,8 @@ class HelpCommand(lightbulb.BaseHelpCommand):
         if not await filter_commands([command], ctx):
             return
 
+        _help_requests.labels("command").inc()
+
         help_embed = create_embed_from_dict(
             {
                 "title": f"Help for `{command.qualname}`",
@@ -117,25 +247,46 @@ class HelpCommand(lightbulb.BaseHelpCommand):
 
         await ctx.respond(embed=help_embed)
 
+    @classmethod
+    async def _filter_commands(cls, cmds: Iterable[commands.Command], ctx: context.Context) -> list[commands.Command]:
+        """Concurrent counterpart of `lightbulb.help_command.filter_commands()`, keeping the commands' order"""
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENT_CHECKS)
+
+        async def available(cmd: commands.Command) -> bool:
+            async with semaphore:
+                return bool(await filter_commands([cmd], ctx))
+
+        cmds = list(dict.fromkeys(cmds))  # Aliases map to the same command object
+        results = await asyncio.gather(*(available(cmd) for cmd in cmds))
+
+        return [cmd for cmd, is_available in zip(cmds, results) if is_available]
+
     # noinspection PyTypeChecker
     @staticmethod
-    async def _gather_group_help(group: LightbulbCommandGroup, ctx: context.Context, level=0):
-        """Recursively gather a group's command"""
-        lines = []
-        for cmd in await filter_commands(group.subcommands.values(), ctx):
+    async def _gather_group_help(group: LightbulbCommandGroup, ctx: context.Context, level=0) -> list[str]:
+        """Recursively gather a group's command, evaluating sibling subgroups concurrently"""
+        indent = "  " * level
+
+        async def help_lines(cmd: commands.Command) -> list[str]:
             match cmd:
-                case commands.PrefixSubCommand() | commands.SlashSubCommand():
-                    lines.append(f"{'  ' * level}\N{BULLET} `{cmd.name}` - {cmd.description}")
-                case commands.PrefixCommandGroup() | commands.SlashSubGroup():
-                    await HelpCommand._gather_group_help(cmd, ctx, level=level + 1)
+                case commands.PrefixSubGroup() | commands.SlashSubGroup():
+                    lines = [f"{indent}\N{BULLET} `{cmd.name}` - (Group) {cmd.description}"]
+                    return lines + await HelpCommand._gather_group_help(cmd, ctx, level=level + 1)
+                case _:
+                    return [f"{indent}\N{BULLET} `{cmd.name}` - {cmd.description}"]
+
+        subcommands = await HelpCommand._filter_commands(group.subcommands.values(), ctx)
+        nested_lines = await asyncio.gather(*(help_lines(cmd) for cmd in subcommands))
 
-        return lines
+        return [line for lines in nested_lines for line in lines]
 
     async def send_group_help(self, ctx: context.Context, group: LightbulbCommandGroup) -> None:
         # Do not send help if author does not have sufficient permissions
         if not await filter_commands([group], ctx):
             return
 
+        _help_requests.labels("group").inc()
+
         help_embed = create_embed_from_dict(
             {
                 "title": f"Help for command group `{group.name}`",
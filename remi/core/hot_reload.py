@@ -0,0 +1,223 @@
+# pylint: disable=logging-fstring-interpolation
+import ast
+import asyncio
+import importlib
+import importlib.util
+import logging
+import sys
+import time
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+from types import ModuleType
+from typing import Iterable, Optional
+
+import lightbulb
+
+from remi.core.exceptions import HotReloadFailed
+
+HOT_RELOAD_INTERVAL = 1.0  # seconds
+
+
+def _source_of(module: ModuleType) -> Optional[Path]:
+    if (file := getattr(module, "__file__", None)) and file.endswith(".py"):
+        return Path(file)
+
+    return None
+
+
+def _mtime(source: Path) -> Optional[int]:
+    try:
+        return source.stat().st_mtime_ns
+    except OSError:  # Being replaced by an editor, caught on the next poll
+        return None
+
+
+def _imports_of(name: str, module: ModuleType, source: Path) -> set[str]:
+    """Every module name imported by `module`'s source, including imported names that may be submodules"""
+    package = name if hasattr(module, "__path__") else name.rpartition(".")[0]
+    imported = set()
+
+    for node in ast.walk(ast.parse(source.read_text(encoding="utf-8"))):
+        match node:
+            case ast.Import(names=names):
+                imported.update(alias.name for alias in names)
+
+            case ast.ImportFrom(module=base, names=names, level=level):
+                try:
+                    base = importlib.util.resolve_name(f"{'.' * level}{base or ''}", package) if level else base
+                except ImportError:
+                    continue
+
+                imported.add(base)
+                imported.update(f"{base}.{alias.name}" for alias in names)
+
+    return imported
+
+
+class HotReloader:
+    """
+    Development helper polling the sources of the plugin modules. A change reloads the changed modules
+    and everything importing them, dependencies first, then swaps in the affected extensions' new
+    plugins. If anything fails along the way, the modules and plugins are put back as they were
+    """
+
+    def __init__(self, package: str = "remi.command", interval: float = HOT_RELOAD_INTERVAL):
+        self.package = package
+        self.interval = interval
+
+        self._mtimes: dict[str, int] = {}
+        self._imports_cache: dict[str, tuple[Optional[int], set[str]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def modules(self) -> dict[str, Path]:
+        """Source files of the currently imported plugin modules"""
+        prefix = f"{self.package}."
+        return {
+            name: source
+            for name, module in list(sys.modules.items())
+            if (name == self.package or name.startswith(prefix)) and (source := _source_of(module))
+        }
+
+    def _imports(self, name: str, source: Path) -> set[str]:
+        # Sources are only parsed again once they changed. One that doesn't parse keeps its last known
+        # imports, the reload itself is what reports the error
+        mtime = _mtime(source)
+        if (cached := self._imports_cache.get(name)) is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            imports = _imports_of(name, sys.modules[name], source)
+        except (OSError, SyntaxError):
+            return cached[1] if cached else set()
+
+        self._imports_cache[name] = (mtime, imports)
+        return imports
+
+    def dependency_graph(self, modules: dict[str, Path]) -> dict[str, set[str]]:
+        """Map each plugin module to the plugin modules it imports"""
+        return {name: (self._imports(name, source) & modules.keys()) - {name} for name, source in modules.items()}
+
+    def reload_order(self, changed: Iterable[str], graph: dict[str, set[str]]) -> list[str]:
+        """The changed modules and their (transitive) importers, each one after the modules it imports"""
+        importers: dict[str, set[str]] = {name: set() for name in graph}
+        for name, dependencies in graph.items():
+            for dependency in dependencies:
+                importers[dependency].add(name)
+
+        affected, pending = set(), [name for name in changed if name in graph]
+        while pending:
+            if (name := pending.pop()) not in affected:
+                affected.add(name)
+                pending.extend(importers[name])
+
+        try:
+            return list(TopologicalSorter({name: graph[name] & affected for name in affected}).static_order())
+        except CycleError:
+            logging.warning(f"Import cycle between {', '.join(sorted(affected))}, reloading in name order.")
+            return sorted(affected)
+
+    @staticmethod
+    def _extension_of(app: lightbulb.BotApp, name: str) -> Optional[str]:
+        return next((i for i in app.extensions if name == i or name.startswith(f"{i}.")), None)
+
+    def reload(self, app: lightbulb.BotApp, changed: Iterable[str]) -> list[str]:
+        """
+        Reload `changed` and their importers, then re-add the plugins of every extension involved.
+        Raises `HotReloadFailed` if any of it fails, after restoring the previous modules and plugins
+        """
+        start = time.perf_counter()
+        modules = self.modules()
+        order = self.reload_order(changed, self.dependency_graph(modules))
+        extensions = list(dict.fromkeys(ext for name in order if (ext := self._extension_of(app, name))))
+
+        old_plugins = {ext: app.get_plugin(sys.modules[ext].__plugin_name__) for ext in extensions}
+        snapshots: dict[str, dict] = {}
+
+        try:
+            for name in order:
+                snapshots[name] = dict(sys.modules[name].__dict__)
+                importlib.reload(sys.modules[name])
+
+            for ext in extensions:
+                if old_plugins[ext] is not None:
+                    app.remove_plugin(old_plugins[ext].name)
+                sys.modules[ext].load(app)
+
+        except Exception as ex:
+            self._restore(app, snapshots, old_plugins)
+            logging.exception(f"Hot reload of {', '.join(order)} failed, the previous version is still loaded.")
+            raise HotReloadFailed(f"Could not reload {', '.join(extensions) or ', '.join(order)}") from ex
+
+        finally:
+            # Whatever happened, the files on disk are what we tried, don't retry them until they change again
+            self._mtimes.update((name, mtime) for name, source in modules.items() if (mtime := _mtime(source)))
+
+        logging.info(
+            f"Hot reloaded {len(order)} module(s) and {len(extensions)} plugin(s) in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms: {', '.join(order)}"
+        )
+        return order
+
+    @staticmethod
+    def _restore(
+        app: lightbulb.BotApp, snapshots: dict[str, dict], old_plugins: dict[str, Optional[lightbulb.Plugin]]
+    ) -> None:
+        for name, snapshot in snapshots.items():
+            module = sys.modules[name]
+            module.__dict__.clear()
+            module.__dict__.update(snapshot)
+
+        for old in filter(None, old_plugins.values()):
+            if (current := app.get_plugin(old.name)) is not old:
+                if current is not None:
+                    app.remove_plugin(current)
+                # lightbulb creates a plugin's commands whenever it's added, drop those of the first time
+                if isinstance(old, lightbulb.Plugin):
+                    old.all_commands.clear()
+                app.add_plugin(old)
+
+    def forget(self, names: Iterable[str]) -> None:
+        """Drop modules from `sys.modules` and from what's known about them, to be imported afresh next time"""
+        for name in names:
+            sys.modules.pop(name, None)
+            self._mtimes.pop(name, None)
+            self._imports_cache.pop(name, None)
+
+    def changed_modules(self) -> list[str]:
+        changed = []
+        for name, source in self.modules().items():
+            if (mtime := _mtime(source)) is not None and self._mtimes.setdefault(name, mtime) != mtime:
+                changed.append(name)
+
+        return changed
+
+    def snapshot(self) -> None:
+        """Record the current state of the sources to detect changes, and to reload from, against"""
+        modules = self.modules()
+        self._mtimes = {name: mtime for name, source in modules.items() if (mtime := _mtime(source)) is not None}
+        self.dependency_graph(modules)
+
+    async def _watch(self, app: lightbulb.BotApp) -> None:
+        self.snapshot()
+
+        while True:
+            await asyncio.sleep(self.interval)
+
+            if changed := self.changed_modules():
+                try:
+                    self.reload(app, changed)
+                except HotReloadFailed:
+                    pass  # Already logged, the next save gets another try
+
+    def start(self, app: lightbulb.BotApp) -> None:
+        if self._task is None or self._task.done():
+            logging.info(f"Watching {self.package} for changes, reloading them as they happen.")
+            self._task = asyncio.create_task(self._watch(app))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+hot_reloader = HotReloader()
@@ -0,0 +1,98 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import logging
+import time
+from typing import Iterable, Sequence
+
+import hikari
+import lightbulb
+from lightbulb import commands, context
+
+from remi.util.task import spawn
+
+
+def _stub_command(
+    name: str, description: str, group: bool, checks: Sequence[lightbulb.Check] = ()
+) -> lightbulb.CommandLike:
+    # A callback of its own, `implements()` marks the function itself with the command types
+    async def run_stub(ctx: context.PrefixContext) -> None:
+        # Swap the real plugin in, then dispatch the message again so it reaches the real command, checks and all
+        await ctx.command.plugin.activate(ctx.app)
+
+        if (real_context := await ctx.app.get_prefix_context(ctx.event)) is not None:
+            await ctx.app.process_prefix_commands(real_context)
+
+    implements = commands.PrefixCommandGroup if group else commands.PrefixCommand
+
+    return lightbulb.add_checks(*checks)(
+        lightbulb.option(
+            "arguments",
+            "Arguments of the command.",
+            required=False,
+            modifier=commands.OptionModifier.CONSUME_REST,
+        )(lightbulb.command(name, description)(lightbulb.implements(implements)(run_stub)))
+    )
+
+
+class LazyPlugin(lightbulb.Plugin):
+    """
+    Stand-in for a plugin whose module isn't imported yet, with a prefix command stub for each of its
+    top-level commands. The first time one is invoked, or help for any of them is asked for, the
+    real plugin is imported and loaded in its place.
+
+    The stubs carry the checks of the plugin and of their command, so they are listed, and activate
+    the plugin, for the same invokers as the real commands. They can't tell Discord about the real
+    commands' options, so slash commands only become available once their plugin was activated
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        load_path: str,
+        commands_: Iterable[tuple[str, str, bool, Sequence[lightbulb.Check]]],
+        checks: Sequence[lightbulb.Check] = (),
+    ):
+        super().__init__(name, description)
+        self.load_path = load_path
+        self._commands = tuple(commands_)
+        # Compiled into the stubs' check plans once added, which leaves none on the plugin to copy
+        self._plugin_checks = tuple(checks)
+        self._lock = asyncio.Lock()
+
+        self.add_checks(*checks)
+        for command in self._commands:
+            self.command(_stub_command(*command))
+
+    def _copy(self) -> "LazyPlugin":
+        return LazyPlugin(self.name, self.description, self.load_path, self._commands, self._plugin_checks)
+
+    async def activate(self, app: lightbulb.BotApp) -> None:
+        """Import and load the real plugin, unless another invocation already did"""
+        async with self._lock:
+            if app.get_plugin(self.name) is not self:
+                return
+
+            start = time.perf_counter()
+
+            app.remove_plugin(self)
+            try:
+                app.load_extensions(self.load_path)
+            except Exception:
+                # lightbulb creates a plugin's commands whenever it's added, so a copy goes back in instead
+                app.add_plugin(self._copy())
+                raise
+
+            logging.info(f"Activated plugin {self.name!r} in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+            # Discord only learns about its slash commands now, without holding back the invocation
+            real = app.get_plugin(self.name)
+            if app.is_alive and real and any(isinstance(i, commands.ApplicationCommand) for i in real.all_commands):
+                spawn(_sync_application_commands(app, self.name), name=f"sync {self.name} slash commands")
+
+
+async def _sync_application_commands(app: lightbulb.BotApp, plugin_name: str) -> None:
+    try:
+        await app.sync_application_commands()
+    except hikari.HikariError as ex:
+        logging.warning(f"Could not sync the slash commands of plugin {plugin_name!r}: {ex}")
@@ -0,0 +1,264 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import logging
+import math
+from bisect import bisect_left
+from typing import Callable, Iterator, Optional
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from a cached lookup to a slow REST call or query
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EVENT_LOOP_LAG_INTERVAL = 1.0  # seconds
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+
+    escaped = (i.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for i in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class _Value:
+    """A counter's or gauge's value for one set of labels, read from `function` instead if one is set"""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function else self.value
+
+
+class _HistogramValue:
+    """Observation counts per bucket, not cumulative until exposed, for one set of labels"""
+
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """
+    A named family of values, one per combination of label values. Hot paths should keep the child
+    returned by `labels()` around where they can, updating one is a single attribute write
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+
+        if not labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        if (child := self._children.get(values)) is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+
+            child = self._children[values] = self._new_child()
+
+        return child
+
+    def samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._default.value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.function = function
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def samples(self) -> Iterator[str]:
+        names = (*self.labelnames, "le")
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, (*values, _format_value(upper_bound)))} {cumulative}"
+
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class MetricsRegistry:
+    """
+    Every metric of the bot by name. Getting a metric that already exists returns it as is, so modules
+    that are reloaded keep counting where they left off
+    """
+
+    def __init__(self, namespace: str = "remi"):
+        self.namespace = namespace
+        self._metrics: dict[str, Metric] = {}
+
+    def _get_or_create(self, cls: type[Metric], name: str, *args, **kwargs):
+        name = f"{self.namespace}_{name}"
+        if (metric := self._metrics.get(name)) is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name!r} is already registered as a {metric.type_name}")
+
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(f"{self.namespace}_{name}")
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+_event_loop_lag = metrics.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+async def monitor_event_loop(interval: float = EVENT_LOOP_LAG_INTERVAL) -> None:
+    """Sleep `interval` over and over, observing how much later than asked for the loop got back to us"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        _event_loop_lag.observe(max(loop.time() - start - interval, 0.0))
+
+
+class MetricsServer:
+    """Serves a registry at `/metrics` for Prometheus to scrape, along with the event loop lag monitor"""
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int):
+        self.registry = registry
+        self.host = host
+        self.port = port
+
+        self._runner = None
+        self._monitor: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        # Only needed with metrics exposed, aiohttp's server is a heavy import otherwise skipped
+        from aiohttp import web  # pylint: disable=import-outside-toplevel
+
+        async def handle_metrics(_) -> web.Response:
+            return web.Response(text=self.registry.render(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+        self._monitor = asyncio.create_task(monitor_event_loop())
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
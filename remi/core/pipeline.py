@@ -0,0 +1,119 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Awaitable, Callable, Optional
+
+import lightbulb
+from lightbulb import context
+
+from remi.core.check_plan import CheckCost, check_cost
+from remi.core.exceptions import StartupStageFailed
+
+StageCallback = Callable[[lightbulb.BotApp], Awaitable[None]]
+
+
+@dataclass
+class Stage:
+    name: str
+    callback: StageCallback
+    after: tuple[str, ...]
+    duration: Optional[float] = None
+
+
+class StartupPipeline:
+    """
+    Startup work split into named stages, each started as soon as the stages it runs `after` are done.
+    Nothing waits for the pipeline as a whole: whatever needs a stage waits for that stage only
+    """
+
+    def __init__(self):
+        self.stages: dict[str, Stage] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._started_at = 0.0
+
+    def stage(self, name: str, *, after: tuple[str, ...] = ()) -> Callable[[StageCallback], StageCallback]:
+        def decorate(callback: StageCallback) -> StageCallback:
+            self.stages[name] = Stage(name, callback, after)
+            return callback
+
+        return decorate
+
+    def start(self, app: lightbulb.BotApp) -> None:
+        """Schedule every stage. Raises `graphlib.CycleError` or `KeyError` on bad dependencies"""
+        if unknown := {dep for stage in self.stages.values() for dep in stage.after} - self.stages.keys():
+            raise KeyError(f"Unknown startup stage(s): {', '.join(sorted(unknown))}")
+
+        self._started_at = time.perf_counter()
+
+        # Dependencies first, so each stage's task can be handed the tasks it waits for
+        graph = {name: stage.after for name, stage in self.stages.items()}
+        for name in TopologicalSorter(graph).static_order():
+            stage = self.stages[name]
+            task = asyncio.create_task(self._run(app, stage, [self._tasks[i] for i in stage.after]), name=name)
+            # Failures are logged by _run(), don't let asyncio complain about them never being retrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._tasks[name] = task
+
+    async def _run(self, app: lightbulb.BotApp, stage: Stage, dependencies: list[asyncio.Task]) -> None:
+        if dependencies:
+            await asyncio.wait(dependencies)
+
+        if failed := [i.get_name() for i in dependencies if i.cancelled() or i.exception() is not None]:
+            logging.warning(f"Startup stage {stage.name!r} skipped, {', '.join(failed)} failed.")
+            raise StartupStageFailed(f"Startup stage {stage.name!r} depends on failed stage(s)")
+
+        start = time.perf_counter()
+        try:
+            await stage.callback(app)
+        except Exception:
+            logging.exception(
+                f"Startup stage {stage.name!r} failed after {(time.perf_counter() - start) * 1000:.1f} ms."
+            )
+            raise
+
+        stage.duration = time.perf_counter() - start
+        logging.info(
+            f"Startup stage {stage.name!r} done in {stage.duration * 1000:.1f} ms, "
+            f"started {(start - self._started_at) * 1000:.1f} ms into startup."
+        )
+
+    def is_done(self, *names: str) -> bool:
+        """Whether all of `names` completed successfully"""
+        return all(
+            (task := self._tasks.get(name)) and task.done() and not task.cancelled() and task.exception() is None
+            for name in names
+        )
+
+    async def wait_for(self, *names: str) -> None:
+        """Wait until all of `names` are done, raising `StartupStageFailed` if any of them failed"""
+        for name in names:
+            if (task := self._tasks.get(name)) is None:
+                raise StartupStageFailed(f"Startup stage {name!r} was never started")
+
+            try:
+                await asyncio.shield(task)
+            except Exception as ex:
+                raise StartupStageFailed(f"Startup stage {name!r} failed") from ex
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+
+def requires_stages(*names: str) -> lightbulb.Check:
+    """A check holding the command back until the given startup stages are done, failing if they failed"""
+
+    # A lookup once the stages are done, until then it waits for them
+    @check_cost(CheckCost.CACHE)
+    async def _requires_stages(ctx: context.Context) -> bool:
+        try:
+            await ctx.bot.startup.wait_for(*names)
+        except StartupStageFailed as ex:
+            raise lightbulb.CheckFailure(f"This command is unavailable: {ex}") from ex
+
+        return True
+
+    return lightbulb.Check(_requires_stages)
@@ -0,0 +1,152 @@
+import enum
+import time
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import hikari
+import lightbulb
+from lightbulb import commands, context
+
+from remi.util.cache import AsyncLoadingCache
+from remi.util.embed import restamp
+
+# What a memoized command responds with: an embed, or the keyword arguments for `ctx.respond()`
+Response = Union[hikari.Embed, dict[str, Any]]
+Builder = Callable[[context.Context], Awaitable[Response]]
+# Anything the response depends on that no event announces, e.g. what's on disk
+Version = Callable[[context.Context], Hashable]
+
+# Responses kept per command, across scope keys and versions
+_MAXSIZE = 1024
+
+
+class MemoScope(enum.Enum):
+    """Who gets to share a memoized response"""
+
+    GLOBAL = enum.auto()
+    GUILD = enum.auto()
+    BUCKET = enum.auto()  # Invokers passing the same checks of the help index
+
+
+class ResponseMemo:
+    """The memoized responses of a single command, cleared whenever any of `invalidate_on` is dispatched"""
+
+    def __init__(
+        self,
+        builder: Builder,
+        scope: MemoScope,
+        ttl: Optional[float],
+        invalidate_on: Sequence[type[hikari.Event]],
+        version: Optional[Version],
+    ):
+        self.builder = builder
+        self.scope = scope
+        self.ttl = ttl
+        self.invalidate_on = tuple(invalidate_on)
+        self.version = version
+
+        self._cache: AsyncLoadingCache[Hashable, tuple[float, Response]] = AsyncLoadingCache(maxsize=_MAXSIZE)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    async def key_of(self, ctx: context.Context) -> Hashable:
+        match self.scope:
+            case MemoScope.GLOBAL:
+                key = None
+            case MemoScope.GUILD:
+                key = ctx.guild_id
+            case MemoScope.BUCKET:
+                key = await ctx.bot.help_command.index.get_bucket(ctx)
+
+        return key if self.version is None else (key, self.version(ctx))
+
+    async def _build(self, ctx: context.Context) -> tuple[float, Response]:
+        response = await self.builder(ctx)
+        return time.monotonic() + self.ttl if self.ttl is not None else float("inf"), response
+
+    async def get(self, ctx: context.Context) -> Response:
+        key = await self.key_of(ctx)
+        requested_at = time.monotonic()
+
+        expiry, response = await self._cache.get_or_load(key, self._build, ctx)
+        if expiry < requested_at:
+            self._cache.invalidate(key)
+            expiry, response = await self._cache.get_or_load(key, self._build, ctx)
+
+        return response
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    async def on_event(self, _: hikari.Event) -> None:
+        self.invalidate()
+
+
+def _restamp(response: Response) -> Response:
+    if isinstance(response, hikari.Embed):
+        return restamp(response)
+
+    if isinstance(embed := response.get("embed"), hikari.Embed):
+        return {**response, "embed": restamp(embed)}
+
+    return response
+
+
+def memoize_response(
+    scope: MemoScope = MemoScope.GLOBAL,
+    ttl: Optional[float] = None,
+    invalidate_on: Sequence[type[hikari.Event]] = (),
+    version: Optional[Version] = None,
+) -> Callable[[Builder], Callable[[context.Context], Awaitable[None]]]:
+    """
+    Turn a function building a command's response into a callback that builds it once per `scope` and
+    `version`, and responds with it afterwards, for up to `ttl` seconds or until one of the `invalidate_on`
+    events. Memoized embeds are timestamped anew on every response. Apply it below `@lightbulb.implements`.
+    Its events are only listened to while the plugin is added to a `RemiBot`
+    """
+
+    def decorate(builder: Builder) -> Callable[[context.Context], Awaitable[None]]:
+        memo = ResponseMemo(builder, scope, ttl, invalidate_on, version)
+
+        @wraps(builder)
+        async def callback(ctx: context.Context) -> None:
+            response = _restamp(await memo.get(ctx))
+            if isinstance(response, hikari.Embed):
+                await ctx.respond(embed=response)
+            else:
+                await ctx.respond(**response)
+
+        callback.__response_memo__ = memo
+        return callback
+
+    return decorate
+
+
+def _walk_command_likes(command_likes: Sequence[commands.CommandLike]) -> Iterator[commands.CommandLike]:
+    for command_like in command_likes:
+        yield command_like
+        yield from _walk_command_likes(command_like.subcommands)
+
+
+def get_response_memos(plugin: lightbulb.Plugin) -> list[ResponseMemo]:
+    # pylint: disable=protected-access
+    return [
+        memo
+        for command_like in _walk_command_likes(plugin._raw_commands)
+        if (memo := getattr(command_like.callback, "__response_memo__", None)) is not None
+    ]
@@ -1,19 +1,173 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+# pylint: disable=logging-fstring-interpolation
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from remi.core.constant import Client, DatabaseConfig
+from remi.core.metrics import metrics
+from remi.db.query_stats import QueryStats, explain_query_plan
+from remi.util.tracing import start_span
+
+_query_duration = metrics.histogram(
+    "db_query_duration_seconds", "Time taken by SQL statements, by kind (SELECT, INSERT...).", ("statement",)
+)
+_query_errors = metrics.counter("db_query_errors_total", "SQL statements that failed.")
+
+
+@dataclass(frozen=True)
+class DBProfile:
+    # PRAGMAs applied to every new connection
+    pragmas: dict[str, str | int] = field(default_factory=dict)
+    # Each aiosqlite connection owns a thread, and SQLite only allows one writer at a time anyway
+    pool_size: int = 4
+    max_overflow: int = 4
+
+
+DB_PROFILES = {
+    "throughput": DBProfile(
+        pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",  # Can only lose the last transactions on power loss, never corrupt
+            "cache_size": -65536,  # Negative means KiB, i.e. 64 MiB
+            "mmap_size": 268435456,  # 256 MiB
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,  # ms
+        },
+    ),
+    "durable": DBProfile(
+        pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "cache_size": -16384,
+            "mmap_size": 0,
+            "temp_store": "DEFAULT",
+            "busy_timeout": 10000,
+        },
+        pool_size=2,
+        max_overflow=2,
+    ),
+}
+
+
+def get_db_profile() -> tuple[str, DBProfile]:
+    if (profile := DB_PROFILES.get(DatabaseConfig.PROFILE)) is None:
+        logging.warning(f"Unknown database profile {DatabaseConfig.PROFILE!r}, using 'throughput'.")
+        return "throughput", DB_PROFILES["throughput"]
 
-from remi.core.constant import Client
+    return DatabaseConfig.PROFILE, profile
 
 
 async def dispose_all_engines():
     await async_config_engine.dispose()
 
 
+async def report_db_profile() -> None:
+    """Log the PRAGMAs actually in effect, SQLite silently ignores the ones it doesn't support"""
+    async with async_config_engine.connect() as conn:
+        active = {pragma: (await conn.execute(text(f"PRAGMA {pragma}"))).scalar() for pragma in db_profile.pragmas}
+
+    logging.info(f"Using database profile {db_profile_name!r}: {active}")
+
+
+db_profile_name, db_profile = get_db_profile()
+
 async_engine_scheme = f"sqlite+aiosqlite:///{Client.DATA_PATH}"
 
-async_config_engine = create_async_engine(f"{async_engine_scheme}/config.sqlite", future=True)
+async_config_engine = create_async_engine(
+    f"{async_engine_scheme}/config.sqlite",
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,  # aiosqlite defaults to NullPool, reconnecting on every session
+    pool_size=db_profile.pool_size,
+    max_overflow=db_profile.max_overflow,
+)
+config_query_stats = QueryStats(
+    DatabaseConfig.SLOW_QUERY_MS / 1000 if DatabaseConfig.SLOW_QUERY_MS is not None else None
+)
 async_config_session = sessionmaker(
     async_config_engine,
     expire_on_commit=False,
     class_=AsyncSession,
     autoflush=True,
 )
+
+
+@event.listens_for(async_config_engine.sync_engine, "connect")
+def _apply_db_profile(dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma, value in db_profile.pragmas.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+def _statement_kind(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper()
+
+
+def _start_query_timer(conn, _cursor, statement: str, _parameters, _context, _executemany) -> None:
+    kind = _statement_kind(statement)
+    conn.info.setdefault("query_start", []).append((kind, time.perf_counter(), start_span("query", statement=kind)))
+
+
+def _row_count(cursor) -> int:
+    """
+    Rows changed, or returned for statements returning rows. The driver only counts changed rows, leaving
+    `rowcount` at -1 otherwise. SQLAlchemy's aiosqlite adapter (`AsyncAdapt_aiosqlite_cursor`) has fetched
+    the returned rows into its private `_rows` list by the time the statement executed, so those are counted
+    there instead. Any other cursor, or an adapter without `_rows`, counts as having returned none
+    """
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+
+    return len(getattr(cursor, "_rows", ()))
+
+
+def _observe_query(query_stats: QueryStats, conn, cursor, statement: str, parameters) -> None:
+    kind, start, span = conn.info["query_start"].pop()
+    duration = time.perf_counter() - start
+    _query_duration.labels(kind).observe(duration)
+
+    rows = _row_count(cursor)
+    stats = query_stats.observe(statement, duration, rows)
+    if query_stats.is_slow(duration):
+        if stats.plan is None:
+            try:
+                stats.plan = explain_query_plan(conn.connection, statement, parameters) or ""
+            except Exception as error:  # pylint: disable=broad-except
+                logging.debug(f"Could not explain {stats.statement!r}: {error}")
+                stats.plan = ""
+
+        query_stats.log_slow(stats, duration, rows)
+
+    if span is not None:
+        span.finish()
+
+
+def _count_query_error(exception_context) -> None:
+    _query_errors.inc()
+
+    # after_cursor_execute won't be called for this statement
+    if (conn := exception_context.connection) is not None and (starts := conn.info.get("query_start")):
+        if (span := starts.pop()[2]) is not None:
+            span.attributes["error"] = type(exception_context.original_exception).__name__
+            span.finish()
+
+
+def instrument_engine(engine: AsyncEngine, query_stats: QueryStats) -> None:
+    """Time `engine`'s statements into the query metrics, `query_stats` and the current trace"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _start_query_timer)
+    event.listen(engine.sync_engine, "handle_error", _count_query_error)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement: str, parameters, _context, _executemany) -> None:
+        _observe_query(query_stats, conn, cursor, statement, parameters)
+
+
+instrument_engine(async_config_engine, config_query_stats)
+metrics.gauge("db_connections_checked_out", "Pooled database connections currently in use.").set_function(
+    async_config_engine.sync_engine.pool.checkedout
+)
@@ -0,0 +1 @@
+from .migrate import Migration, apply_migrations, get_migrations, get_schema_version
@@ -0,0 +1,82 @@
+# pylint: disable=logging-fstring-interpolation
+"""
+Minimal schema migrations for the config database.
+
+Migrations live in `remi.db.migration.versions` as modules named `v<version>_<slug>.py`, each
+with a module docstring describing it and an `upgrade(conn)` function taking a synchronous
+`sqlalchemy.engine.Connection`. They are applied in version order at startup, and the applied
+versions recorded in the `schema_migration` table.
+"""
+
+import importlib
+import logging
+import pkgutil
+from dataclasses import dataclass
+from functools import cache
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from remi.db.migration import versions
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+@cache
+def get_migrations() -> tuple[Migration, ...]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        if not module_info.name.startswith("v"):
+            continue
+
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        version = int(module_info.name[1:].split("_", maxsplit=1)[0])
+        migrations.append(Migration(version, (module.__doc__ or "").strip(), module.upgrade))
+
+    migrations.sort(key=lambda migration: migration.version)
+    if [migration.version for migration in migrations] != list(range(1, len(migrations) + 1)):
+        raise RuntimeError("Migration versions must be contiguous and start from 1")
+
+    return tuple(migrations)
+
+
+def get_schema_version(conn: Connection) -> int:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migration ("
+            "version INTEGER PRIMARY KEY, description VARCHAR, applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+    return conn.execute(text("SELECT MAX(version) FROM schema_migration")).scalar() or 0
+
+
+def apply_migrations(conn: Connection) -> list[int]:
+    """
+    Bring the schema up to date, inside the caller's transaction. pysqlite only actually begins it at the
+    first statement modifying rows, DDL before that is committed as it runs. A migration starting with DDL
+    must therefore be safe to run again after failing, as `IF NOT EXISTS` makes the initial one
+    """
+    current_version = get_schema_version(conn)
+
+    applied = []
+    for migration in get_migrations():
+        if migration.version <= current_version:
+            continue
+
+        logging.info(f"Applying schema migration {migration.version}: {migration.description}")
+        migration.upgrade(conn)
+
+        conn.execute(
+            text("INSERT INTO schema_migration (version, description) VALUES (:version, :description)"),
+            {"version": migration.version, "description": migration.description},
+        )
+        applied.append(migration.version)
+
+    logging.info(f"Config database schema at version {max(applied, default=current_version)}")
+    return applied
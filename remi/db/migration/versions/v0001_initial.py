@@ -0,0 +1,18 @@
+"""Initial schema, as created by ConfigBase.metadata.create_all() before migrations existed"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS server_prefix ("
+            "id INTEGER NOT NULL, guild_id INTEGER, prefix VARCHAR, PRIMARY KEY (id))"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS staff_role ("
+            "id INTEGER NOT NULL, guild_id INTEGER, rank VARCHAR, role_id INTEGER, PRIMARY KEY (id))"
+        )
+    )
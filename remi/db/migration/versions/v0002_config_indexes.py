@@ -0,0 +1,19 @@
+"""Deduplicate config rows, then index and enforce uniqueness of server_prefix and staff_role"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    # setprefix only ever updated the first row, so keep the oldest one
+    conn.execute(
+        text("DELETE FROM server_prefix WHERE id NOT IN (SELECT MIN(id) FROM server_prefix GROUP BY guild_id)")
+    )
+    conn.execute(text("CREATE UNIQUE INDEX uq_server_prefix_guild_id ON server_prefix (guild_id)"))
+
+    # The (guild_id, rank, role_id) index also serves lookups on guild_id and on (guild_id, rank)
+    conn.execute(
+        text("DELETE FROM staff_role WHERE id NOT IN (SELECT MIN(id) FROM staff_role GROUP BY guild_id, rank, role_id)")
+    )
+    conn.execute(
+        text("CREATE UNIQUE INDEX uq_staff_role_guild_id_rank_role_id ON staff_role (guild_id, rank, role_id)")
+    )
@@ -0,0 +1,109 @@
+# pylint: disable=logging-fstring-interpolation
+import logging
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Any, Optional
+
+QUERY_SAMPLE_SIZE = 1024  # Most recent durations kept per statement, for percentiles
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_REPEATED_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_EXPLAINABLE = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH"))
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """
+    The shape of a statement: literals become parameters, and so do `IN` lists and `VALUES` rows of any
+    length, so statements that only differ by their values are counted together
+    """
+    statement = _LITERAL.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _REPEATED_ROWS.sub(r"\1, ...", _PARAMETER_LIST.sub("(?...)", statement))
+
+
+def explain_query_plan(dbapi_connection, statement: str, parameters: Any) -> Optional[str]:
+    """SQLite's plan for a statement as an indented tree, None if it can't be explained"""
+    if statement.lstrip().split(None, 1)[0].upper() not in _EXPLAINABLE:
+        return None
+
+    if isinstance(parameters, list):  # executemany(), every set of parameters is planned the same
+        parameters = parameters[0] if parameters else ()
+
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    depths = {0: -1}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depths[node_id] = depths.get(parent_id, -1) + 1
+        lines.append(f"{'  ' * depths[node_id]}{detail}")
+
+    return "\n".join(lines)
+
+
+class StatementStats:
+    """How often and how long one normalized statement ran, and how many rows it returned or changed"""
+
+    __slots__ = ("statement", "count", "total", "rows", "durations", "plan")
+
+    def __init__(self, statement: str, sample_size: int = QUERY_SAMPLE_SIZE):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.durations: deque[float] = deque(maxlen=sample_size)
+        self.plan: Optional[str] = None
+
+    def observe(self, duration: float, rows: int) -> None:
+        self.count += 1
+        self.total += duration
+        self.rows += max(rows, 0)
+        self.durations.append(duration)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.durations:
+            return 0.0
+
+        durations = sorted(self.durations)
+        return durations[min(int(fraction * len(durations)), len(durations) - 1)]
+
+
+class QueryStats:
+    """
+    Statistics per normalized statement of an engine. Statements slower than `slow_threshold` (seconds) are
+    logged along with their query plan, which is only explained once per statement
+    """
+
+    def __init__(self, slow_threshold: Optional[float] = None, sample_size: int = QUERY_SAMPLE_SIZE):
+        self.slow_threshold = slow_threshold
+        self.sample_size = sample_size
+        self.by_statement: dict[str, StatementStats] = {}
+
+    def observe(self, statement: str, duration: float, rows: int) -> StatementStats:
+        normalized = normalize_statement(statement)
+        if (stats := self.by_statement.get(normalized)) is None:
+            stats = self.by_statement[normalized] = StatementStats(normalized, self.sample_size)
+
+        stats.observe(duration, rows)
+        return stats
+
+    def is_slow(self, duration: float) -> bool:
+        return self.slow_threshold is not None and duration >= self.slow_threshold
+
+    def log_slow(self, stats: StatementStats, duration: float, rows: int) -> None:
+        plan = f"\n{stats.plan}" if stats.plan else ""
+        logging.warning(f"Slow query ({duration * 1000:.1f}ms, {rows} row(s)): {stats.statement}{plan}")
+
+    def slowest(self, count: int) -> list[StatementStats]:
+        """The statements the database spent the most time on overall"""
+        return sorted(self.by_statement.values(), key=lambda stats: stats.total, reverse=True)[:count]
+
+    def reset(self) -> None:
+        self.by_statement.clear()
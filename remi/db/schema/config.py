@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from sqlalchemy.orm import declarative_base
 
+# Only describes the schema for the ORM, the schema itself is managed by `remi.db.migration`
 ConfigBase = declarative_base()
 
 
 class ServerPrefix(ConfigBase):
     __tablename__ = "server_prefix"
+    __table_args__ = (Index("uq_server_prefix_guild_id", "guild_id", unique=True),)
+
     id = Column(Integer, primary_key=True)
     guild_id = Column(Integer)
     prefix = Column(String)
@@ -16,6 +19,7 @@ class ServerPrefix(ConfigBase):
 
 class StaffRole(ConfigBase):
     __tablename__ = "staff_role"
+    __table_args__ = (Index("uq_staff_role_guild_id_rank_role_id", "guild_id", "rank", "role_id", unique=True),)
 
     id = Column(Integer, primary_key=True)
     guild_id = Column(Integer)
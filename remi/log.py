@@ -0,0 +1,211 @@
+# pylint: disable=logging-fstring-interpolation
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+from typing import Optional
+
+from loguru import logger
+
+# Records waiting for the logging thread, beyond that they're dropped rather than blocking the caller
+LOG_QUEUE_SIZE = 10_000
+
+# Module of the caller at each code location records came from, keyed on (pathname, lineno)
+_caller_modules: dict[tuple[str, int], str] = {}
+
+
+def _caller_module(record: logging.LogRecord) -> str:
+    """
+    Find the module the record was logged from. `logging` already located the caller's file, so the frame to
+    look for is the innermost one running that file, which is only walked to once per code location
+    """
+    key = (record.pathname, record.lineno)
+    if (module := _caller_modules.get(key)) is None:
+        frame = sys._getframe(1)  # pylint: disable=protected-access
+        while frame is not None and frame.f_code.co_filename != record.pathname:
+            frame = frame.f_back
+
+        module = _caller_modules[key] = frame.f_globals.get("__name__", record.module) if frame else record.module
+
+    return module
+
+
+class RecordSampler(logging.Filter):
+    """
+    Keep only 1 in N records below WARNING of the given loggers, and of their children. Dropped records are
+    counted per logger, along with those the queue had no room for
+    """
+
+    def __init__(self, rates: Optional[dict[str, int]] = None):
+        super().__init__()
+        self.rates = rates or {}
+        self.dropped: Counter[str] = Counter()
+
+        self._seen: Counter[str] = Counter()
+        self._rate_of: dict[str, int] = {}
+
+    def rate_of(self, name: str) -> int:
+        if (rate := self._rate_of.get(name)) is None:
+            parts = name.split(".")
+            parents = (".".join(parts[:i]) for i in range(len(parts), 0, -1))
+            rate = self._rate_of[name] = next((self.rates[i] for i in parents if i in self.rates), 1)
+
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or (rate := self.rate_of(record.name)) <= 1:
+            return True
+
+        self._seen[record.name] += 1
+        if (self._seen[record.name] - 1) % rate == 0:
+            return True
+
+        self.dropped[record.name] += 1
+        return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, queue_: queue.Queue, sampler: RecordSampler):
+        super().__init__(queue_)
+        self.sampler = sampler
+        self.addFilter(sampler)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only what has to happen on the caller's thread: the message, before its arguments can change, and the
+        # caller's module. The exception is passed on as is, for loguru to format
+        record.msg, record.args = record.getMessage(), None
+        record.caller_module = _caller_module(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.sampler.dropped[record.name] += 1
+
+
+# Logging interceptor for directing logging to loguru.logger
+class InterceptHandler(logging.Handler):
+    """
+    Hand stdlib records to loguru. Rather than having loguru find the caller by walking up the stack, which
+    differs between Python versions and is meaningless on the logging thread, the record's own location is used
+    """
+
+    @staticmethod
+    def _locate(record: logging.LogRecord, loguru_record: dict) -> None:
+        loguru_record.update(
+            name=getattr(record, "caller_module", None) or record.name,
+            function=record.funcName,
+            line=record.lineno,
+            module=record.module,
+            time=loguru_record["time"] - timedelta(seconds=time.time() - record.created),
+        )
+
+    def emit(self, record):
+        # Get corresponding Loguru level if it exists
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        logger.patch(partial(self._locate, record)).opt(exception=record.exc_info).log(level, record.getMessage())
+
+
+class LogPipeline:
+    """
+    Stdlib logging off the caller's thread: records are sampled and queued where they're logged, formatted and
+    written by loguru's sinks on a thread of their own
+    """
+
+    def __init__(self, sampling: Optional[dict[str, int]] = None, maxsize: int = LOG_QUEUE_SIZE):
+        self.sampler = RecordSampler(sampling)
+        self.handler = _QueueHandler(queue.Queue(maxsize), self.sampler)
+        self._listener = logging.handlers.QueueListener(self.handler.queue, InterceptHandler())
+        self._running = False
+
+    @property
+    def dropped(self) -> Counter[str]:
+        return self.sampler.dropped
+
+    def start(self) -> None:
+        self._listener.start()
+        self._running = True
+
+    def stop(self) -> None:
+        """Write out every queued record, then stop the logging thread"""
+        if not self._running:
+            return
+
+        self._listener.stop()
+        self._running = False
+        # The listener is stopped by now, so this one goes straight to loguru
+        if total := sum(self.dropped.values()):
+            details = ", ".join(f"{name}: {count}" for name, count in self.dropped.most_common())
+            logger.info(f"Dropped {total} log record(s) ({details}).")
+
+
+def parse_log_sampling(values: tuple[str, ...]) -> dict[str, int]:
+    """Parse `LOGGER=N` pairs, keeping 1 in N records of `LOGGER`"""
+    sampling = {}
+    for value in values:
+        name, _, rate = value.partition("=")
+        try:
+            sampling[name.strip()] = max(int(rate), 1)
+        except ValueError:
+            logging.warning(f"Could not parse log sampling rate {value!r}, expected LOGGER=N")
+
+    return sampling
+
+
+def setup_logging(verbose: int, file: bool, log_sql: bool, sampling: Optional[dict[str, int]] = None) -> LogPipeline:
+    """Set up loguru's sinks and route stdlib logging to them through a started `LogPipeline`, which is returned"""
+    # Mapping for logging level
+    match verbose:
+        case 0:
+            logging_level = 20  # INFO
+            loguru_level_padding = 8
+        case 1:
+            logging_level = 10  # DEBUG
+            loguru_level_padding = 8
+        case 2:
+            logging_level = 5  # TRACE_HIKARI
+            loguru_level_padding = 12
+        case _:
+            logging_level = 0  # NOTSET
+            loguru_level_padding = 12
+
+    # Remove the default handler and replace it with our customizable one
+    logger.remove()
+
+    log_format = (
+        "<g>{time:YYYY-MM-DD HH:mm:ss.SSS}</> | "
+        f"<lvl>{{level: <{loguru_level_padding}}}</> | "
+        "<c>{name}</>:<c>{function}</>:<c>{line}</> - <lvl>{message}</>"
+    )
+
+    # Loguru handlers
+    logger.add(sys.stderr, format=log_format, level=logging_level)
+
+    if file:
+        logger.add("remi.log", rotation="00:00", format=log_format, level=logging_level)
+
+    # Custom levels for loguru
+    logger.level(name="TRACE_HIKARI", no=5, color="<m><b>")
+
+    # Start logging, flushing whatever is still queued on exit
+    log_pipeline = LogPipeline(sampling)
+    log_pipeline.start()
+    atexit.register(log_pipeline.stop)
+
+    logging.basicConfig(handlers=[log_pipeline.handler], level=logging_level)
+
+    # Set up certain logging handler of interest as needed
+    if log_sql:
+        logging.getLogger("sqlalchemy").setLevel(logging_level)
+
+    return log_pipeline
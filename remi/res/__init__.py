@@ -1 +1,2 @@
-from .resource import Resource
+from .asset import Asset, AssetCache
+from .resource import Resource, assets
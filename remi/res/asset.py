@@ -0,0 +1,165 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from importlib import resources
+from pathlib import PurePosixPath
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import hikari
+
+from remi.util.task import spawn
+
+# Re-upload this long before Discord's signed attachment URLs actually expire
+URL_EXPIRY_MARGIN = 3600  # seconds
+
+
+class Asset:
+    """
+    A bundled file, read and hashed once. Until Discord hosts it somewhere we know of, it's an
+    attachment to be uploaded; afterwards it's the CDN URL, until that URL expires or the message
+    hosting it is deleted
+    """
+
+    __slots__ = ("name", "digest", "file", "url", "expires_at", "message_id")
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.digest = hashlib.sha256(data).hexdigest()
+
+        # The digest in the filename tells hosted copies of different versions of the same file apart
+        path = PurePosixPath(name)
+        self.file = hikari.Bytes(data, f"{path.stem}-{self.digest[:16]}{path.suffix}")
+
+        self.url: Optional[str] = None
+        self.expires_at = math.inf
+        self.message_id: Optional[int] = None  # The message it was uploaded along with, if known
+
+    def __repr__(self) -> str:
+        return f"Asset({self.name}, url={self.url!r})"
+
+    @property
+    def filename(self) -> str:
+        return self.file.filename
+
+    @property
+    def is_hosted(self) -> bool:
+        return self.url is not None and time.time() < self.expires_at
+
+    @property
+    def resource(self) -> hikari.Resourceish:
+        """What to put in an embed: the CDN URL if there's a usable one, the file to upload otherwise"""
+        return self.url if self.is_hosted else self.file
+
+
+def _url_expiry(url: str) -> float:
+    # Signed attachment URLs carry their expiry as a hex UNIX timestamp in `ex`
+    try:
+        return int(parse_qs(urlsplit(url).query)["ex"][0], 16) - URL_EXPIRY_MARGIN
+    except (KeyError, ValueError):
+        return math.inf
+
+
+class AssetCache:
+    """
+    Bundled assets keyed on their filename. Each one is uploaded along with the first message that
+    uses it, or all at once to an asset channel if one is configured, and the URL Discord returns is
+    reused by everything after. Listeners are told whenever an asset switches between the two
+    """
+
+    def __init__(self, package: str):
+        self.package = package
+
+        self._assets: dict[str, Asset] = {}
+        self._listeners: list[Callable[[Asset], None]] = []
+        self._host: Optional[tuple[hikari.RESTAware, int]] = None
+
+    def __iter__(self) -> Iterator[Asset]:
+        return iter(self._assets.values())
+
+    def load(self, name: str) -> Asset:
+        if (asset := self._assets.get(name)) is None:
+            asset = self._assets[name] = Asset(name, resources.files(self.package).joinpath(name).read_bytes())
+
+        return asset
+
+    def add_listener(self, callback: Callable[[Asset], None]) -> None:
+        self._listeners.append(callback)
+
+    @property
+    def pending(self) -> bool:
+        """Whether any asset still has to be uploaded"""
+        return not all(asset.is_hosted for asset in self)
+
+    def _set_url(self, asset: Asset, url: Optional[str], message_id: Optional[int] = None) -> None:
+        asset.url = url
+        asset.expires_at = _url_expiry(url) if url else math.inf
+        asset.message_id = message_id
+
+        if url and asset.expires_at != math.inf:
+            try:
+                delay = max(asset.expires_at - time.time(), 0)
+                asyncio.get_running_loop().call_later(delay, self._expire, asset, url)
+            except RuntimeError:  # No loop to schedule on, `is_hosted` still catches the expiry
+                pass
+
+        for callback in self._listeners:
+            callback(asset)
+
+    def _expire(self, asset: Asset, url: str) -> None:
+        if asset.url != url:  # Replaced since
+            return
+
+        logging.debug(f"Hosted copy of asset {asset.name!r} expired.")
+        self._set_url(asset, None)
+        self._rehost()
+
+    def _rehost(self) -> None:
+        if self._host:
+            spawn(self.host(*self._host), name="host assets")
+
+    def learn(self, urls: Iterable[str], message_id: Optional[int] = None) -> None:
+        """
+        Pick up the URLs of any of our assets among `urls`, e.g. the thumbnails of a sent embed, along
+        with the ID of the message they were uploaded with
+        """
+        by_filename = {asset.filename: asset for asset in self}
+
+        for url in urls:
+            filename = PurePosixPath(urlsplit(url).path).name
+            if (asset := by_filename.get(filename)) and not asset.is_hosted:
+                logging.debug(f"Asset {asset.name!r} is hosted at {url}.")
+                self._set_url(asset, url, message_id)
+
+    def forget(self, message_ids: Iterable[int]) -> None:
+        """Drop the URLs of assets uploaded with any of `message_ids`, deleting a message deletes its attachments"""
+        message_ids = set(message_ids)
+        if not (gone := [asset for asset in self if asset.url and asset.message_id in message_ids]):
+            return
+
+        for asset in gone:
+            logging.info(f"Message hosting asset {asset.name!r} was deleted, it will be uploaded again.")
+            self._set_url(asset, None)
+        self._rehost()
+
+    async def host(self, app: hikari.RESTAware, channel_id: int) -> None:
+        """Upload every asset that isn't hosted yet to `channel_id`, in a single message"""
+        self._host = (app, channel_id)
+
+        if not (to_upload := [asset for asset in self if not asset.is_hosted]):
+            return
+
+        message = await app.rest.create_message(channel_id, attachments=[asset.file for asset in to_upload])
+        self.learn((attachment.url for attachment in message.attachments), message.id)
+
+        logging.info(f"Hosted {len(to_upload)} asset(s) in channel {channel_id}.")
+
+
+def embed_resource_urls(message: hikari.Message) -> Iterator[str]:
+    for embed in message.embeds:
+        for resource in (embed.thumbnail, embed.image):
+            if resource is not None and resource.url:
+                yield resource.url
@@ -1,8 +1,10 @@
-from importlib import resources
+from remi.res.asset import AssetCache
+
+assets = AssetCache("remi.res.png")
 
 
 class Resource:
-    SUCCESS_ICON = resources.path("remi.res.png", "success.png")
-    FAILURE_ICON = resources.path("remi.res.png", "failure.png")
-    HELP_ICON = resources.path("remi.res.png", "help.png")
-    WARNING_ICON = resources.path("remi.res.png", "warning.png")
+    SUCCESS_ICON = assets.load("success.png")
+    FAILURE_ICON = assets.load("failure.png")
+    HELP_ICON = assets.load("help.png")
+    WARNING_ICON = assets.load("warning.png")
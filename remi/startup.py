@@ -0,0 +1,108 @@
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+from typing import Iterator, Optional, Sequence
+
+# Kept free of third-party imports, this is installed before anything heavy gets imported
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_time: float = 0.0
+    cumulative: float = 0.0
+
+
+class _TimedLoader:
+    """Wraps a loader for the duration of one `exec_module()`, then puts the original back"""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        module.__loader__ = module.__spec__.loader = self._loader
+
+        with self._profiler.timing(module.__name__):
+            self._loader.exec_module(module)
+
+
+class ImportProfiler(MetaPathFinder):
+    """
+    Time every module executed while installed, the same way `python -X importtime` does: the self time
+    of a module excludes the modules it imported, its cumulative time includes them
+    """
+
+    def __init__(self):
+        self.timings: dict[str, ImportTiming] = {}
+        self._children: list[float] = []
+
+    def __enter__(self) -> "ImportProfiler":
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *_) -> None:
+        sys.meta_path.remove(self)
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]], target: Optional[ModuleType] = None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            if (spec := finder.find_spec(fullname, path, target)) is not None:
+                break
+        else:
+            return None
+
+        if hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+
+        return spec
+
+    @contextmanager
+    def timing(self, module: str) -> Iterator[None]:
+        parent, self._children = self._children, []
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cumulative = time.perf_counter() - start
+            children, self._children = self._children, parent
+
+            self.timings[module] = ImportTiming(module, cumulative - sum(children), cumulative)
+            parent.append(cumulative)
+
+    @property
+    def total(self) -> float:
+        """Time spent importing, counting each top-level import once"""
+        return sum(self._children)
+
+    def top(self, count: int) -> list[ImportTiming]:
+        return sorted(self.timings.values(), key=lambda timing: timing.self_time, reverse=True)[:count]
+
+
+def print_startup_report(profiler: ImportProfiler, time_to_started: float, count: int = 25) -> None:
+    # pylint: disable=import-outside-toplevel
+    from rich import print as rprint
+    from rich.table import Table
+
+    table = Table(title=f"Slowest {count} of {len(profiler.timings)} imported modules", title_justify="left")
+    table.add_column("Module")
+    table.add_column("Self (ms)", justify="right")
+    table.add_column("Cumulative (ms)", justify="right")
+
+    for timing in profiler.top(count):
+        table.add_row(timing.module, f"{timing.self_time * 1000:.1f}", f"{timing.cumulative * 1000:.1f}")
+
+    rprint(table)
+    rprint(f"Imports: {profiler.total * 1000:.0f} ms, time to StartedEvent: {time_to_started:.2f} s")
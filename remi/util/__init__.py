@@ -1 +1,19 @@
-from .embed import create_embed_from_dict, create_failure_embed, create_success_embed
+import importlib
+
+# Re-exports are resolved on first access, so e.g. remi.util.cache can be imported without hikari
+_LAZY_EXPORTS = {
+    "create_embed_from_dict": ".embed",
+    "create_failure_embed": ".embed",
+    "create_success_embed": ".embed",
+}
+
+
+def __getattr__(name: str):
+    if (module := _LAZY_EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(module, __name__), name)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_EXPORTS])
@@ -0,0 +1,110 @@
+import asyncio
+from collections import OrderedDict
+from functools import partial
+from typing import Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[K, V]):
+    """A bounded mapping that evicts its least recently used entry once `maxsize` is exceeded"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K, default=None):
+        """Get `key`'s value and mark it as recently used, or `default` if absent"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class AsyncLoadingCache(Generic[K, V]):
+    """
+    An `LRUCache` that fills its misses through an async `loader`. Concurrent misses for the same key
+    share a single load, and whatever the loader returns is cached as-is, so "nothing found" results
+    (e.g. an empty tuple) are cached too. Without a `loader`, misses are only filled through `get_or_load()`
+    """
+
+    def __init__(self, loader: Optional[Callable[[K], Awaitable[V]]] = None, maxsize: int = 1024):
+        self._loader = loader
+        self._cache: LRUCache[K, V] = LRUCache(maxsize)
+        self._pending: dict[K, asyncio.Future] = {}
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def get(self, key: K) -> V:
+        return await self.get_or_load(key, self._loader, key)
+
+    async def get_or_load(self, key: K, load: Callable[..., Awaitable[V]], *args) -> V:
+        """Get `key`'s value, filling a miss with `load(*args)`, for loads that need more than the key"""
+        if (value := self._cache.get(key, _MISSING)) is not _MISSING:
+            return value
+
+        if (pending := self._pending.get(key)) is None:
+            pending = self._pending[key] = asyncio.ensure_future(load(*args))
+            pending.add_done_callback(partial(self._store, key))
+
+        return await asyncio.shield(pending)
+
+    def _store(self, key: K, future: asyncio.Future) -> None:
+        # The key was overwritten or invalidated while loading, so what we loaded may be stale
+        if self._pending.get(key) is not future:
+            return
+
+        del self._pending[key]
+        if not future.cancelled() and future.exception() is None:
+            self._cache.set(key, future.result())
+
+    def set(self, key: K, value: V) -> None:
+        """Write-through update, superseding any load currently in flight for `key`"""
+        self._pending.pop(key, None)
+        self._cache.set(key, value)
+
+    def invalidate(self, key: K) -> None:
+        self._pending.pop(key, None)
+        self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._cache.clear()
@@ -1,17 +1,26 @@
+import copy
 import datetime
-import logging
-from typing import Optional
+from typing import Optional, Sequence, Union
 
 import hikari
 from tzlocal import get_localzone
 
-from remi.res.resource import Resource
+from remi.res import Asset, Resource, assets
+from remi.util.tracing import span
 from remi.util.typing import EmbedDict, EmbedField
 
+# Resolved once, the bot's timezone doesn't change while it's running
+LOCAL_TIMEZONE = get_localzone()
+
+# Discord's limits, in characters where they're lengths
+EMBED_FIELDS_LIMIT = 25
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_TOTAL_LIMIT = 6000
+
 
 def _add_local_timezone(timestamp: datetime.datetime) -> datetime.datetime:
     """Get the local timezone to be added a datetime object"""
-    return timestamp.replace(tzinfo=get_localzone())
+    return timestamp.replace(tzinfo=LOCAL_TIMEZONE)
 
 
 def create_embed_from_dict(data: EmbedDict) -> hikari.Embed:
@@ -19,77 +28,169 @@ def create_embed_from_dict(data: EmbedDict) -> hikari.Embed:
     Create an embed without using post-init .set() methods. Creating an embed using this will
     manually tack in a local timezone with a small warning, instead of a giant wall of text
     from `hikari`
-    :param EmbedDict data: The data needed to construct the embed
+    :param EmbedDict data: The data needed to construct the embed, left untouched
     :return: A `hikari.Embed` object
     """
-    # Isolate fields that need their own initialization methods
-    author = data.pop("author", None)
-    footer = data.pop("footer", None)
-    fields = data.pop("fields", None)
-    thumbnail = data.pop("thumbnail", None)
-    image = data.pop("image", None)
-
-    # Final sanity check for timezone
-    timestamp = data.pop("timestamp", None)
-    if not timestamp:
-        timestamp = datetime.datetime.now()
-        logging.debug("Timestamp for embed not found. Adding timestamp.")
+    with span("embed"):
+        return _create_embed_from_dict(data)
+
 
+def _create_embed_from_dict(data: EmbedDict) -> hikari.Embed:
+    # Fields that need their own initialization methods are picked out, the rest goes to the constructor
+    kwargs = {key: value for key, value in data.items() if key not in _EMBED_SETTERS}
+
+    timestamp = kwargs.get("timestamp") or datetime.datetime.now(LOCAL_TIMEZONE)
     if not timestamp.tzinfo:
         timestamp = _add_local_timezone(timestamp)
-        logging.debug("No timezone data found in timestamp. Applying local timezone.")
+    kwargs["timestamp"] = timestamp
 
     # Create the embed
-    embed = hikari.Embed(**data, timestamp=timestamp)
+    embed = hikari.Embed(**kwargs)
 
-    if author:
+    if author := data.get("author"):
         embed.set_author(**author)
-    if footer:
+    if footer := data.get("footer"):
         embed.set_footer(**footer)
-    if thumbnail:
-        embed.set_thumbnail(thumbnail)
-    if image:
-        embed.set_image(image)
-    if fields:
+    if thumbnail := data.get("thumbnail"):
+        embed.set_thumbnail(_resolve(thumbnail))
+    if image := data.get("image"):
+        embed.set_image(_resolve(image))
+    if fields := data.get("fields"):
         [embed.add_field(**field) for field in fields]
 
     return embed
 
 
-def _generic_embed_handler(
-    title: Optional[str], description: Optional[str], fields: Optional[list[EmbedField]], operation: str
-):
-    match operation:
-        case "FAILURE":
-            default_title = "Something went wrong!"
-            thumbnail = Resource.FAILURE_ICON
-            color = 0xED254E
-
-        case "WARNING":
-            default_title = "Warning!"
-            thumbnail = Resource.WARNING_ICON
-            color = 0xF9DC5C
-
-        case "SUCCESS":
-            default_title = "Success!"
-            thumbnail = Resource.SUCCESS_ICON
-            color = 0x71F79F
-
-        case "INFO":
-            default_title = "Info"
-            thumbnail = Resource.HELP_ICON
-            color = 0x7CB7FF
-
-    # noinspection PyUnboundLocalVariable
-    # As this is intended to be used only internally we don't care if default_title can be unbound
-    template_embed_dict = EmbedDict(
-        title=title or default_title,
-        description=description,
-        thumbnail=thumbnail,
-        fields=fields,
-        color=color,
-    )
-    return create_embed_from_dict(template_embed_dict)
+def restamp(embed: hikari.Embed) -> hikari.Embed:
+    """Shallow copy of an embed that was built earlier, timestamped now if it had a timestamp"""
+    embed = copy.copy(embed)
+    if embed.timestamp is not None:
+        embed.timestamp = datetime.datetime.now(LOCAL_TIMEZONE)
+
+    return embed
+
+
+_EMBED_SETTERS = frozenset({"author", "footer", "fields", "thumbnail", "image"})
+
+
+def _resolve(resource: Union[hikari.Resourceish, Asset]) -> hikari.Resourceish:
+    return resource.resource if isinstance(resource, Asset) else resource
+
+
+def join_lines(lines: Sequence[str], limit: int) -> str:
+    """
+    Join as many whole lines as fit in `limit` characters, saying how many more there were instead of
+    cutting one in half. Only a first line too long on its own is cut
+    """
+    if len(text := "\n".join(lines)) <= limit:
+        return text
+
+    more = f"... {len(lines)} more"
+    kept, size = [], 0
+    for line in lines:
+        if (size := size + len(line) + 1) + len(more) > limit:
+            break
+        kept.append(line)
+
+    if not kept:
+        return f"{lines[0][: limit - 3]}..."
+
+    return "\n".join([*kept, f"... {len(lines) - len(kept)} more"])
+
+
+def fit_fields(fields: Sequence[EmbedField], budget: int = EMBED_TOTAL_LIMIT) -> list[EmbedField]:
+    """The leading fields whose names and values fit in `budget` characters, as many as an embed holds"""
+    fitted = []
+    for field in fields[:EMBED_FIELDS_LIMIT]:
+        if (budget := budget - len(field["name"]) - len(field["value"])) < 0:
+            break
+        fitted.append(field)
+
+    return fitted
+
+
+class EmbedTemplate:
+    """
+    An embed kind compiled once into a prototype holding its color and thumbnail. Creating an embed
+    only copies the prototype and fills in the title, description, fields and timestamp. A thumbnail
+    asset is recompiled in whenever it gets (or loses) a hosted URL
+    """
+
+    __slots__ = ("name", "default_title", "asset", "_prototype")
+
+    def __init__(
+        self,
+        name: str,
+        default_title: str,
+        color: int,
+        thumbnail: Union[hikari.Resourceish, Asset, None] = None,
+    ) -> None:
+        self.name = name
+        self.default_title = default_title
+        self.asset = thumbnail if isinstance(thumbnail, Asset) else None
+        self._prototype = hikari.Embed(color=color).set_thumbnail(_resolve(thumbnail))
+
+    def recompile(self) -> None:
+        if self.asset is not None:
+            self._prototype = copy.copy(self._prototype).set_thumbnail(self.asset.resource)
+
+    def __repr__(self) -> str:
+        return f"EmbedTemplate({self.name})"
+
+    @property
+    def color(self) -> Optional[hikari.Color]:
+        return self._prototype.color
+
+    @property
+    def thumbnail(self) -> Optional[hikari.EmbedImage]:
+        return self._prototype.thumbnail
+
+    def create(
+        self,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        fields: Optional[list[EmbedField]] = None,
+    ) -> hikari.Embed:
+        with span("embed", template=self.name):
+            # Shallow copy, the prototype's color and thumbnail are shared but never mutated, and it has no fields
+            embed = copy.copy(self._prototype)
+            embed.title = title or self.default_title
+            embed.description = description
+            embed.timestamp = datetime.datetime.now(LOCAL_TIMEZONE)
+            if fields:
+                [embed.add_field(**field) for field in fields]
+
+        return embed
+
+
+_embed_templates: dict[str, EmbedTemplate] = {}
+
+
+def register_embed_template(
+    name: str, default_title: str, color: int, thumbnail: Union[hikari.Resourceish, Asset, None] = None
+) -> EmbedTemplate:
+    """Compile and register an embed kind, replacing any other of the same name"""
+    template = _embed_templates[name] = EmbedTemplate(name, default_title, color, thumbnail)
+    return template
+
+
+def get_embed_template(name: str) -> EmbedTemplate:
+    return _embed_templates[name]
+
+
+def _on_asset_changed(asset: Asset) -> None:
+    for template in _embed_templates.values():
+        if template.asset is asset:
+            template.recompile()
+
+
+assets.add_listener(_on_asset_changed)
+
+
+_FAILURE = register_embed_template("FAILURE", "Something went wrong!", 0xED254E, Resource.FAILURE_ICON)
+_WARNING = register_embed_template("WARNING", "Warning!", 0xF9DC5C, Resource.WARNING_ICON)
+_SUCCESS = register_embed_template("SUCCESS", "Success!", 0x71F79F, Resource.SUCCESS_ICON)
+_INFO = register_embed_template("INFO", "Info", 0x7CB7FF, Resource.HELP_ICON)
 
 
 def create_failure_embed(
@@ -98,7 +199,7 @@ def create_failure_embed(
     fields: Optional[list[EmbedField]] = None,
 ) -> hikari.Embed:
     """Generate a minimal failure embed"""
-    return _generic_embed_handler(title=title, description=description, fields=fields, operation="FAILURE")
+    return _FAILURE.create(title=title, description=description, fields=fields)
 
 
 def create_success_embed(
@@ -107,7 +208,7 @@ def create_success_embed(
     fields: Optional[list[EmbedField]] = None,
 ) -> hikari.Embed:
     """Generate a minimal success embed"""
-    return _generic_embed_handler(title=title, description=description, fields=fields, operation="SUCCESS")
+    return _SUCCESS.create(title=title, description=description, fields=fields)
 
 
 def create_warning_embed(
@@ -116,7 +217,7 @@ def create_warning_embed(
     fields: Optional[list[EmbedField]] = None,
 ) -> hikari.Embed:
     """Generate a minimal warning embed"""
-    return _generic_embed_handler(title=title, description=description, fields=fields, operation="WARNING")
+    return _WARNING.create(title=title, description=description, fields=fields)
 
 
 def create_info_embed(
@@ -124,5 +225,5 @@ def create_info_embed(
     description: Optional[str] = None,
     fields: Optional[list[EmbedField]] = None,
 ) -> hikari.Embed:
-    """Generate a minimal warning embed"""
-    return _generic_embed_handler(title=title, description=description, fields=fields, operation="INFO")
+    """Generate a minimal info embed"""
+    return _INFO.create(title=title, description=description, fields=fields)
@@ -0,0 +1,60 @@
+from collections import Counter
+from typing import Iterable
+
+
+class PrefixIndex:
+    """
+    Multiset of every prefix currently in use, compiled down to the set of possible first characters
+    and a tuple for `str.startswith()`, so a message that can't be a command is rejected in O(1) for
+    most chat messages, and one C-level scan otherwise.
+
+    Until `ready` is set, every message is let through, as the index may still be incomplete.
+    """
+
+    def __init__(self, *prefixes: str):
+        self.ready = False
+        self.passed = 0
+        self.rejected = 0
+
+        self._counts: Counter[str] = Counter()
+        self._first_chars: frozenset[str] = frozenset()
+        self._prefixes: tuple[str, ...] = ()
+
+        self.add(*prefixes)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, prefix: str) -> bool:
+        return prefix in self._counts
+
+    def _compile(self) -> None:
+        self._first_chars = frozenset(prefix[0] for prefix in self._counts)
+        self._prefixes = tuple(self._counts)
+
+    def add(self, *prefixes: str) -> None:
+        self._counts.update(prefix for prefix in prefixes if prefix)
+        self._compile()
+
+    def discard(self, *prefixes: str) -> None:
+        """Drop one reference to each prefix, as multiple guilds can share the same one"""
+        for prefix in prefixes:
+            if self._counts[prefix] > 1:
+                self._counts[prefix] -= 1
+            else:
+                self._counts.pop(prefix, None)
+
+        self._compile()
+
+    def replace(self, old: Iterable[str], new: Iterable[str]) -> None:
+        self.discard(*old)
+        self.add(*new)
+
+    def may_match(self, content: str) -> bool:
+        """Check whether `content` starts with any indexed prefix, counting the outcome"""
+        if not self.ready or (content[:1] in self._first_chars and content.startswith(self._prefixes)):
+            self.passed += 1
+            return True
+
+        self.rejected += 1
+        return False
@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Optional
+
+SAMPLE_INTERVAL = 0.01  # seconds, 100 samples per second
+MAX_STACK_DEPTH = 128  # Outermost frames beyond that are left out
+
+
+def _frame_label(code: CodeType) -> str:
+    # co_qualname only exists from Python 3.11 on
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class Profile:
+    """Stacks seen by a sampling profiler, outermost frame first, with how many samples each was seen in"""
+
+    def __init__(self, stacks: Counter[tuple[CodeType, ...]], duration: float, interval: float):
+        self.stacks = stacks
+        self.duration = duration
+        self.interval = interval
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> str:
+        """One `outer;...;inner count` line per stack, as flamegraph.pl, speedscope or inferno take it"""
+        lines = (f"{';'.join(map(_frame_label, stack))} {count}" for stack, count in self.stacks.most_common())
+        return "".join(line + "\n" for line in lines)
+
+    def top(self, count: int) -> list[tuple[str, int, int]]:
+        """
+        The functions samples were most often taken in, with the samples they were running in themselves and those
+        they were anywhere on the stack in
+        """
+        own: Counter[CodeType] = Counter()
+        total: Counter[CodeType] = Counter()
+        for stack, samples in self.stacks.items():
+            own[stack[-1]] += samples
+            for code in set(stack):  # Recursive functions only count once per sample
+                total[code] += samples
+
+        return [(_frame_label(code), samples, total[code]) for code, samples in own.most_common(count)]
+
+    def format_top(self, count: int) -> str:
+        samples = max(self.samples, 1)
+        rows = [f"{'Own':>7} {'Total':>7}  Function"]
+        rows.extend(f"{own / samples:>7.1%} {total / samples:>7.1%}  {label}" for label, own, total in self.top(count))
+        return "\n".join(rows) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread, the event loop's, from a thread of its own. The profiled thread is never
+    instrumented, each sample only holds the GIL for as long as it takes to walk its stack
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, max_depth: int = MAX_STACK_DEPTH):
+        self.interval = interval
+        self.max_depth = max_depth
+
+        self._stacks: Counter[tuple[CodeType, ...]] = Counter()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started_at if self.running else 0.0
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """Start sampling `thread_id`, the calling thread by default"""
+        if self.running:
+            raise RuntimeError("The profiler is already running")
+
+        self._stacks = Counter()
+        self._stopping.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._sample, args=(thread_id or threading.get_ident(),), name="remi-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        if not self.running:
+            raise RuntimeError("The profiler isn't running")
+
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        return Profile(self._stacks, time.perf_counter() - self._started_at, self.interval)
+
+    def _sample(self, thread_id: int) -> None:
+        stacks = self._stacks
+        while not self._stopping.wait(self.interval):
+            if (frame := sys._current_frames().get(thread_id)) is None:  # pylint: disable=protected-access
+                break
+
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+
+            del frame  # Don't keep the profiled thread's frames alive until the next sample
+            stacks[tuple(reversed(stack))] += 1
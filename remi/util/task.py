@@ -0,0 +1,21 @@
+# pylint: disable=logging-fstring-interpolation
+import asyncio
+import logging
+from typing import Coroutine
+
+# The event loop only keeps weak references to tasks, so one nobody awaits could be collected mid-way
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _forget(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and (error := task.exception()) is not None:
+        logging.error(f"Background task {task.get_name()!r} failed", exc_info=error)
+
+
+def spawn(coro: Coroutine, *, name: str) -> asyncio.Task:
+    """Run `coro` in the background, keeping it alive until it's done and logging it if it fails"""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_forget)
+    return task
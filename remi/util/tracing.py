@@ -0,0 +1,188 @@
+import contextvars
+import datetime
+import itertools
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Iterable, Iterator, Optional
+
+TRACE_CAPACITY = 256  # Most recent traces kept
+
+
+class Span:
+    """A timed stage of a traced invocation, along with the stages it went through"""
+
+    __slots__ = ("name", "start", "end", "attributes", "children")
+
+    def __init__(self, name: str, attributes: dict[str, Any], start: Optional[float] = None):
+        self.name = name
+        self.start = time.perf_counter() if start is None else start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.children: list[Span] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def finish(self, end: Optional[float] = None) -> None:
+        self.end = time.perf_counter() if end is None else end
+
+    def walk(self, depth: int = 0) -> Iterator[tuple[int, "Span"]]:
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+class Trace:
+    __slots__ = ("trace_id", "root", "started_at")
+
+    def __init__(self, trace_id: int, root: Span):
+        self.trace_id = trace_id
+        self.root = root
+        self.started_at = time.time()
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def to_dict(self) -> dict[str, Any]:
+        def span_dict(span_: Span) -> dict[str, Any]:
+            return {
+                "name": span_.name,
+                "offset_ms": round((span_.start - self.root.start) * 1000, 3),
+                "duration_ms": round(span_.duration * 1000, 3),
+                "attributes": span_.attributes,
+                "children": [span_dict(child) for child in span_.children],
+            }
+
+        return {
+            "trace_id": self.trace_id,
+            "started_at": datetime.datetime.fromtimestamp(self.started_at, datetime.timezone.utc).isoformat(),
+            **span_dict(self.root),
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("_current_span", default=None)
+
+
+class _SpanScope:
+    __slots__ = ("span", "tracer", "trace", "_token")
+
+    def __init__(self, span_: Span, tracer_: Optional["Tracer"] = None, trace: Optional[Trace] = None):
+        self.span = span_
+        self.tracer = tracer_
+        self.trace = trace
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, *_) -> None:
+        self.span.finish()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+
+        _current_span.reset(self._token)
+        if self.trace is not None:
+            self.tracer.traces.append(self.trace)
+
+
+class _NoSpan:
+    """What untraced invocations get, entering and leaving it does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def start_span(name: str, start: Optional[float] = None, **attributes: Any) -> Optional[Span]:
+    """
+    Start a span of the current trace, if any, without making it the current one. For stages whose start
+    and end are seen by separate callbacks, which `finish()` it, or that were timed before the trace started
+    """
+    if (parent := _current_span.get()) is None:
+        return None
+
+    child = Span(name, attributes, start)
+    parent.children.append(child)
+    return child
+
+
+def span(name: str, start: Optional[float] = None, **attributes: Any) -> _SpanScope | _NoSpan:
+    """Time a stage of the current trace, if the invocation is traced at all"""
+    if (child := start_span(name, start, **attributes)) is None:
+        return _NO_SPAN
+
+    return _SpanScope(child)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Annotate the current span, if any"""
+    if (current := _current_span.get()) is not None:
+        current.attributes[key] = value
+
+
+class Tracer:
+    """
+    Traces a `sample_rate` fraction of invocations, keeping the most recent ones in memory. Starting a
+    trace within one already in progress times a span of it instead
+    """
+
+    def __init__(self, sample_rate: float = 0.0, capacity: int = TRACE_CAPACITY):
+        self.sample_rate = sample_rate
+        self.traces: deque[Trace] = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+
+    def trace(self, name: str, start: Optional[float] = None, **attributes: Any) -> _SpanScope | _NoSpan:
+        """Trace an invocation, if it's sampled. `start` backdates it, to when work on it actually started"""
+        if _current_span.get() is not None:
+            return span(name, start, **attributes)
+
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return _NO_SPAN
+
+        root = Span(name, attributes, start)
+        return _SpanScope(root, self, Trace(next(self._ids), root))
+
+    def slowest(self, count: int) -> list[Trace]:
+        return sorted(self.traces, key=lambda trace: trace.duration, reverse=True)[:count]
+
+
+def to_json_lines(traces: Iterable[Trace]) -> str:
+    """One JSON object per trace, spans nested"""
+    return "".join(json.dumps(trace.to_dict(), default=str) + "\n" for trace in traces)
+
+
+def to_chrome_trace(traces: Iterable[Trace]) -> str:
+    """Chrome's trace event format, for chrome://tracing or Perfetto. Each trace gets a row of its own"""
+    events = []
+    for trace in traces:
+        origin = trace.started_at * 1_000_000 - trace.root.start * 1_000_000  # perf_counter to UNIX time, in us
+        for _, span_ in trace.root.walk():
+            events.append(
+                {
+                    "name": span_.name,
+                    "cat": "remi",
+                    "ph": "X",
+                    "ts": round(origin + span_.start * 1_000_000, 3),
+                    "dur": round(span_.duration * 1_000_000, 3),
+                    "pid": 1,
+                    "tid": trace.trace_id,
+                    "args": span_.attributes,
+                }
+            )
+
+    return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str)
+
+
+tracer = Tracer()
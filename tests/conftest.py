@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# The config database is created in DATA_PATH, the current directory by default
+os.environ.setdefault("DATA_PATH", tempfile.mkdtemp(prefix="remi-test-"))
+
+# remi.core.bot creates the bot on import, which needs a token to be set, not a valid one
+os.environ.setdefault("TOKEN", "token")
@@ -0,0 +1,58 @@
+import time
+
+import hikari
+
+from remi.res.asset import URL_EXPIRY_MARGIN, AssetCache
+from remi.util.embed import EmbedTemplate
+
+CDN = "https://cdn.discordapp.com/attachments/1/2/"
+
+
+def test_asset_uploads_until_hosted():
+    cache = AssetCache("remi.res.png")
+    asset = cache.load("success.png")
+
+    assert cache.load("success.png") is asset
+    assert asset.filename == f"success-{asset.digest[:16]}.png"
+    assert isinstance(asset.resource, hikari.Bytes)
+    assert cache.pending
+
+    cache.learn([f"{CDN}help.png", f"{CDN}{asset.filename}"])
+
+    assert asset.resource == f"{CDN}{asset.filename}"
+    assert not cache.pending
+
+
+def test_asset_url_expiry():
+    cache = AssetCache("remi.res.png")
+    asset = cache.load("success.png")
+
+    cache.learn([f"{CDN}{asset.filename}?ex={int(time.time()) + URL_EXPIRY_MARGIN - 1:x}&is=0&hm=0"])
+
+    assert asset.url is not None
+    assert isinstance(asset.resource, hikari.Bytes)
+
+
+def test_template_follows_asset():
+    cache = AssetCache("remi.res.png")
+    asset = cache.load("success.png")
+    template = EmbedTemplate("TEST", "Default", 0x123456, asset)
+
+    assert template.thumbnail.filename == asset.filename
+
+    cache.add_listener(lambda _: template.recompile())
+    cache.learn([f"{CDN}{asset.filename}"])
+
+    assert template.create().thumbnail.url == f"{CDN}{asset.filename}"
+
+
+def test_asset_forgotten_with_its_message():
+    cache = AssetCache("remi.res.png")
+    success, failure = cache.load("success.png"), cache.load("failure.png")
+
+    cache.learn([f"{CDN}{success.filename}"], message_id=1)
+    cache.learn([f"{CDN}{failure.filename}"], message_id=2)
+    cache.forget([1, 3])
+
+    assert isinstance(success.resource, hikari.Bytes) and success.message_id is None
+    assert failure.resource == f"{CDN}{failure.filename}"
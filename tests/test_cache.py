@@ -0,0 +1,50 @@
+import asyncio
+
+from remi.util.cache import AsyncLoadingCache, LRUCache
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 0)
+
+
+def test_loading_cache_negative_and_coalesced():
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return ()
+
+    async def run():
+        cache = AsyncLoadingCache(loader, maxsize=8)
+        assert await asyncio.gather(cache.get(1), cache.get(1)) == [(), ()]
+        assert await cache.get(1) == ()
+        return cache
+
+    cache = asyncio.run(run())
+    assert calls == [1]
+    assert cache.hits == 1
+
+
+def test_loading_cache_write_through_supersedes_load():
+    async def loader(key):
+        await asyncio.sleep(0)
+        return ("stale",)
+
+    async def run():
+        cache = AsyncLoadingCache(loader)
+        pending = asyncio.ensure_future(cache.get(1))
+        await asyncio.sleep(0)
+        cache.set(1, ("fresh",))
+        await pending
+        return await cache.get(1)
+
+    assert asyncio.run(run()) == ("fresh",)
@@ -0,0 +1,103 @@
+import asyncio
+
+import lightbulb
+import pytest
+
+from remi.core.check_memo import check_memo_scope, evaluate_check
+
+
+def counting_check(result):
+    calls = []
+
+    async def check(ctx):
+        calls.append(ctx)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return check, calls
+
+
+def test_results_shared_within_scope():
+    check, calls = counting_check(True)
+    ctx = object()
+
+    async def run():
+        with check_memo_scope():
+            assert await evaluate_check(check, ctx)
+            with check_memo_scope():  # Nested scopes reuse the outer one
+                assert await evaluate_check(check, ctx)
+
+        assert await evaluate_check(check, ctx)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_failures_shared_within_scope():
+    check, calls = counting_check(lightbulb.CheckFailure("nope"))
+    ctx = object()
+
+    async def run():
+        with check_memo_scope():
+            for _ in range(3):
+                with pytest.raises(lightbulb.CheckFailure):
+                    await evaluate_check(check, ctx)
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_contexts_do_not_share_results():
+    check, calls = counting_check(True)
+    contexts = object(), object()
+
+    async def run():
+        with check_memo_scope():
+            for ctx in contexts:
+                await evaluate_check(check, ctx)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_concurrent_evaluations_share_one_run():
+    calls = []
+    ctx = object()
+
+    async def check(_):
+        calls.append(None)
+        await asyncio.sleep(0)
+        return True
+
+    async def run():
+        with check_memo_scope():
+            return await asyncio.gather(*(evaluate_check(check, ctx) for _ in range(5)))
+
+    assert asyncio.run(run()) == [True] * 5
+    assert len(calls) == 1
+
+
+def test_cancelled_evaluation_does_not_fail_the_others():
+    ctx = object()
+    release = asyncio.Event()
+
+    async def check(_):
+        await release.wait()
+        return True
+
+    async def run():
+        with check_memo_scope():
+            first = asyncio.ensure_future(evaluate_check(check, ctx))
+            second = asyncio.ensure_future(evaluate_check(check, ctx))
+            await asyncio.sleep(0)
+
+            first.cancel()
+            await asyncio.sleep(0)
+            release.set()
+
+            assert await second
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+import hikari
+import lightbulb
+
+from remi.core.check_plan import (
+    CheckCost,
+    CheckPlan,
+    check_cost,
+    compile_checks,
+    cost_of,
+)
+
+
+@lightbulb.Check
+async def undeclared_async_check(_):
+    return True
+
+
+@lightbulb.Check
+@check_cost(CheckCost.NETWORK)
+async def network_check(_):
+    return True
+
+
+@lightbulb.Check
+@check_cost(CheckCost.LOCAL)
+async def declared_local_check(_):
+    return True
+
+
+def test_cost_classes():
+    assert cost_of(lightbulb.checks.guild_only) is CheckCost.LOCAL
+    assert cost_of(lightbulb.checks.has_guild_permissions(hikari.Permissions.ADMINISTRATOR)) is CheckCost.LOCAL
+    assert cost_of(undeclared_async_check) is CheckCost.DATABASE
+    assert cost_of(declared_local_check) is CheckCost.LOCAL
+    assert cost_of(lightbulb.checks.guild_only | network_check) is CheckCost.NETWORK
+
+
+def test_plan_is_cost_ordered_and_deduplicated():
+    plan = CheckPlan.compile(
+        "cmd", [network_check, undeclared_async_check, lightbulb.checks.guild_only, network_check, declared_local_check]
+    )
+
+    assert plan.checks == (lightbulb.checks.guild_only, declared_local_check, undeclared_async_check, network_check)
+
+
+def test_compile_plugin_checks():
+    plugin = lightbulb.Plugin("Test")
+    plugin.add_checks(network_check)
+
+    @plugin.command
+    @lightbulb.add_checks(lightbulb.checks.guild_only)
+    @lightbulb.command(name="group", description="A group.")
+    @lightbulb.implements(lightbulb.PrefixCommandGroup)
+    async def group(_):
+        pass
+
+    @group.child
+    @lightbulb.command(name="sub", description="A subcommand.", inherit_checks=True)
+    @lightbulb.implements(lightbulb.PrefixSubCommand)
+    async def sub(_):
+        pass
+
+    for _ in range(2):  # Compiling again, e.g. when re-adding the plugin, gives the same plans
+        compile_checks(plugin)
+
+        assert not plugin._checks  # pylint: disable=protected-access
+        assert group.checks[0].plan.checks == (lightbulb.checks.guild_only, network_check)
+        assert sub.checks[0].plan.checks == (lightbulb.checks.guild_only, network_check)
+        assert sub.checks[0].plan.command == "group sub"
+
+        # The parent's plan is already part of the subcommand's, lightbulb mustn't evaluate it again
+        assert sub.checks[0].inherits and not sub.inherit_checks
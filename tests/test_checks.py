@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+import hikari
+import pytest
+
+import remi.core.checks
+from remi.core.cache import OwnerCache, StaffRoleSnapshot, staff_role_cache
+from remi.core.checks import is_administrator, is_moderator
+
+GUILD_ID = 1
+OWNER_ID = 2
+
+
+class FakeApp:
+    """Just what `OwnerCache` needs of a bot, counting REST calls and failing them on demand"""
+
+    def __init__(self, owner_ids=(OWNER_ID,)):
+        self.owner_ids = owner_ids
+        self.fetches = 0
+        self.error = None
+        self.cache = SimpleNamespace(get_guild=lambda _: SimpleNamespace(owner_id=OWNER_ID))
+
+    async def fetch_owner_ids(self):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return self.owner_ids
+
+
+def member_ctx(app, *role_ids, member_id=3):
+    return SimpleNamespace(bot=app, guild_id=GUILD_ID, member=SimpleNamespace(id=member_id, role_ids=list(role_ids)))
+
+
+@pytest.fixture
+def staff_roles(monkeypatch):
+    # Members without the moderator or administrator permissions, so the snapshot decides
+    monkeypatch.setattr(remi.core.checks, "_passes", lambda check, ctx: False)
+    monkeypatch.setattr(remi.core.checks, "owner_cache", OwnerCache())
+    staff_role_cache.set(GUILD_ID, StaffRoleSnapshot(moderator=frozenset((10,)), administrator=frozenset((20,))))
+    yield
+    staff_role_cache.invalidate(GUILD_ID)
+
+
+@pytest.mark.usefixtures("staff_roles")
+def test_staff_roles_are_checked_against_the_snapshot():
+    app = FakeApp()
+
+    async def check(check_, *role_ids, member_id=3):
+        return await check_.prefix_callback(member_ctx(app, *role_ids, member_id=member_id))
+
+    async def run():
+        return [
+            await check(is_moderator, 10),
+            await check(is_moderator, 20, 99),
+            await check(is_moderator, 99),
+            await check(is_administrator, 10),
+            await check(is_administrator, 20),
+            await check(is_administrator, member_id=OWNER_ID),
+        ]
+
+    assert asyncio.run(run()) == [True, True, False, False, True, True]
+    assert app.fetches == 1  # Bot owners were only resolved once
+
+
+def test_concurrent_checks_share_one_owner_refresh():
+    app, cache = FakeApp(), OwnerCache()
+
+    async def run():
+        return await asyncio.gather(*(cache.bot_owner_ids(app) for _ in range(5)))
+
+    assert asyncio.run(run()) == [frozenset((OWNER_ID,))] * 5
+    assert app.fetches == 1 and cache.misses == 5
+
+
+def test_failed_owner_refresh_keeps_the_stale_owners():
+    app, cache = FakeApp(), OwnerCache(ttl=0, retry=60)
+
+    async def run():
+        assert await cache.bot_owner_ids(app) == {OWNER_ID}
+
+        app.error = hikari.HTTPError("Unreachable")
+        assert await asyncio.gather(cache.bot_owner_ids(app), cache.bot_owner_ids(app)) == [{OWNER_ID}] * 2
+        assert await cache.bot_owner_ids(app) == {OWNER_ID}  # Not retried before `retry` seconds
+
+    asyncio.run(run())
+    assert app.fetches == 2
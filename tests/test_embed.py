@@ -5,7 +5,15 @@ from random import choices, randint, uniform
 import hikari
 import pytest
 
-from remi.util.embed import EmbedDict, _add_local_timezone, create_embed_from_dict
+from remi.util.embed import (
+    EmbedDict,
+    _add_local_timezone,
+    create_embed_from_dict,
+    fit_fields,
+    get_embed_template,
+    join_lines,
+    register_embed_template,
+)
 
 START_OF_TIME = -62135536000.0  # datetime.datetime(1,1,2,0,0,0)
 END_OF_TIME = 253402189199.0  # datetime.datetime(9999,12,30,23,59,59)
@@ -95,3 +103,42 @@ def test_with_tz():
 def test_without_tz():
     # This test is going to throw warnings about timezone. Let's not have it spill onto the terminal
     embed_test(include_timezone=False)
+
+
+def test_embed_from_dict_keeps_input():
+    data = EmbedDict(title="Title", footer={"text": "Footer"}, fields=[{"name": "a", "value": "b"}])
+    snapshot = dict(data.items())
+
+    embed = create_embed_from_dict(data)
+
+    assert data == snapshot
+    assert embed.timestamp.tzinfo is not None
+
+
+def test_template_copies_prototype():
+    template = register_embed_template("TEST", "Default", 0x123456, IMAGE)
+
+    first = template.create(description="first", fields=[{"name": "a", "value": "b"}])
+    second = template.create(title="Second")
+
+    assert first.title == "Default" and second.title == "Second"
+    assert first.color == second.color == hikari.Color(0x123456)
+    assert first.thumbnail == second.thumbnail == template.thumbnail
+    assert len(first.fields) == 1 and not second.fields
+    assert get_embed_template("TEST") is template
+
+
+def test_lines_are_joined_whole_within_the_limit():
+    lines = [f"line {i}" for i in range(10)]
+
+    assert join_lines(lines, 100) == "\n".join(lines)
+    assert join_lines(lines, 30) == "line 0\nline 1\n... 8 more"
+    assert join_lines(["x" * 50], 10) == "xxxxxxx..."
+
+
+def test_fields_fit_the_embed():
+    fields = [{"name": f"{i}", "value": "x" * 999} for i in range(30)]
+
+    assert len(fit_fields(fields)) == 6
+    assert len(fit_fields(fields[:3], 3000)) == 3 and not fit_fields(fields, 100)
+    assert len(fit_fields([{"name": "a", "value": "b"}] * 30)) == 25
@@ -0,0 +1,58 @@
+import asyncio
+
+import lightbulb
+
+from remi.core.bot import RemiBot
+from remi.core.help_command import HelpCommand
+
+
+def _plugin(name, evaluated):
+    plugin = lightbulb.Plugin(name, description=f"{name} commands.")
+
+    @lightbulb.Check
+    async def check(_):
+        evaluated.append(name)
+        return True
+
+    @plugin.command
+    @lightbulb.add_checks(check)
+    @lightbulb.command(name=name.lower(), description=f"A {name} command.")
+    @lightbulb.implements(lightbulb.PrefixCommand)
+    async def command(_):
+        pass
+
+    return plugin
+
+
+def test_plugins_can_be_added_without_a_help_command():
+    app = RemiBot(token="token", prefix="!", banner=None, help_class=None)
+    app.add_plugin(_plugin("First", []))
+
+    assert app.help_command is None and app.get_prefix_command("first") is not None
+
+
+def test_index_is_built_once_and_only_evaluates_shown_plugins():
+    evaluated = []
+    app = RemiBot(token="token", prefix="!", banner=None, help_class=HelpCommand)
+    plugins = [_plugin(name, evaluated) for name in ("First", "Second")]
+    for plugin in plugins:
+        app.add_plugin(plugin)
+
+    index = app.help_command.index
+    assert index is app.help_command.index and set(index.plugins) == {"First", "Second"}
+
+    # lightbulb only runs checks for its own contexts, which the checks here don't otherwise use
+    def ctx():
+        return lightbulb.context.PrefixContext.__new__(lightbulb.context.PrefixContext)
+
+    async def run():
+        first_pages = await index.get_pages(ctx(), plugins[0])
+        assert evaluated == ["First"] and "first" in first_pages[0] and "second" not in first_pages[0]
+
+        await index.get_pages(ctx())
+        assert sorted(evaluated) == ["First", "First", "Second"]
+
+    asyncio.run(run())
+
+    app.remove_plugin(plugins[1])
+    assert set(app.help_command.index.plugins) == {"First"}
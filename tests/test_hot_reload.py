@@ -0,0 +1,106 @@
+import importlib
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from remi.core.exceptions import HotReloadFailed
+from remi.core.hot_reload import HotReloader
+
+
+class _App:
+    def __init__(self):
+        self.extensions = ["hot_plugins.plugin"]
+        self.plugins = {}
+
+    def get_plugin(self, name):
+        return self.plugins.get(name)
+
+    def add_plugin(self, plugin):
+        self.plugins[plugin.name] = plugin
+
+    def remove_plugin(self, plugin_or_name):
+        self.plugins.pop(getattr(plugin_or_name, "name", plugin_or_name))
+
+
+def _write(path, source):
+    path.write_text(source)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # Coarse filesystem clocks
+
+
+@pytest.fixture(name="plugin_package")
+def fixture_plugin_package(tmp_path, monkeypatch):
+    package = tmp_path / "hot_plugins"
+    (package / "plugin").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "unrelated.py").write_text("")
+    (package / "helpers.py").write_text("VERSION = 1\n")
+    (package / "plugin" / "__init__.py").write_text(
+        "from types import SimpleNamespace\n"
+        "from .impl import describe\n\n"
+        "__plugin_name__ = 'Hot'\n"
+        "plugin = SimpleNamespace(name=__plugin_name__, description=describe())\n\n"
+        "def load(bot):\n    bot.add_plugin(plugin)\n"
+    )
+    (package / "plugin" / "impl.py").write_text(
+        "from hot_plugins import helpers\n\ndef describe():\n    return f'v{helpers.VERSION}'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    for name in ("hot_plugins.plugin", "hot_plugins.unrelated"):
+        importlib.import_module(name)
+
+    yield package
+
+    for name in [i for i in sys.modules if i.startswith("hot_plugins")]:
+        del sys.modules[name]
+
+
+def test_reload_follows_importers(plugin_package):
+    app = _App()
+    sys.modules["hot_plugins.plugin"].load(app)
+    reloader = HotReloader("hot_plugins")
+    reloader.snapshot()
+
+    _write(plugin_package / "helpers.py", "VERSION = 2\n")
+
+    assert reloader.changed_modules() == ["hot_plugins.helpers"]
+    assert reloader.reload(app, ["hot_plugins.helpers"]) == [
+        "hot_plugins.helpers",
+        "hot_plugins.plugin.impl",
+        "hot_plugins.plugin",
+    ]
+    assert app.get_plugin("Hot").description == "v2"
+    assert not reloader.changed_modules()
+
+
+def test_failed_reload_keeps_previous_version(plugin_package):
+    app = _App()
+    sys.modules["hot_plugins.plugin"].load(app)
+    old_plugin = app.get_plugin("Hot")
+    reloader = HotReloader("hot_plugins")
+    reloader.snapshot()
+
+    _write(plugin_package / "helpers.py", "VERSION = 2\n")
+    _write(plugin_package / "plugin" / "impl.py", "def describe(:\n")
+
+    with pytest.raises(HotReloadFailed):
+        reloader.reload(app, ["hot_plugins.helpers"])
+
+    assert sys.modules["hot_plugins.helpers"].VERSION == 1
+    assert sys.modules["hot_plugins.plugin"].describe() == "v1"
+    assert app.get_plugin("Hot") is old_plugin
+
+
+def test_forgotten_modules_are_imported_afresh(plugin_package):
+    reloader = HotReloader("hot_plugins")
+    reloader.snapshot()
+
+    _write(plugin_package / "plugin" / "impl.py", "def describe():\n    return 'v3'\n")
+    reloader.forget(["hot_plugins.plugin", "hot_plugins.plugin.impl"])
+
+    assert "hot_plugins.plugin.impl" not in sys.modules
+    assert importlib.import_module("hot_plugins.plugin").plugin.description == "v3"
+    assert not reloader.changed_modules()
@@ -0,0 +1,157 @@
+import asyncio
+import sys
+
+import lightbulb
+import pytest
+from lightbulb import commands
+
+from remi.command.core.plugin_manager import plg_lazy
+from remi.command.core.plugin_manager.plg_scan import PluginRegistry
+from remi.core.bot import RemiBot
+from remi.core.help_command import HelpCommand
+from remi.core.lazy_plugin import LazyPlugin
+
+_PLUGIN = """
+import lightbulb
+
+greeter = lightbulb.Plugin("Greeter", description="Say hello.")
+
+
+@greeter.command
+@lightbulb.command(name="hello", description="Say hello.")
+@lightbulb.implements(lightbulb.PrefixCommand, lightbulb.SlashCommand)
+async def hello(ctx):
+    await ctx.respond("Hello!")
+
+
+def load(bot):
+    bot.add_plugin(greeter)
+
+
+def unload(bot):
+    bot.remove_plugin(greeter)
+"""
+
+_CHECKS = """
+import lightbulb
+
+evaluated = []
+
+
+@lightbulb.Check
+def plugin_check(_):
+    evaluated.append("plugin")
+    return True
+
+
+@lightbulb.Check
+def command_check(_):
+    evaluated.append("command")
+    return False
+"""
+
+_GUARDED_PLUGIN = """
+import lightbulb
+
+from lazy_plugins import checks
+from lazy_plugins.checks import command_check
+
+guarded = lightbulb.Plugin("{name}", description="Guarded commands.")
+guarded.add_checks(checks.plugin_check)
+
+
+@guarded.command
+@lightbulb.add_checks({command_check})
+@lightbulb.command(name="{name}", description="A guarded command.")
+@lightbulb.implements(lightbulb.PrefixCommand)
+async def guarded_command(ctx):
+    pass
+
+
+__plugin_name__ = guarded.name
+__plugin_description__ = guarded.description
+
+
+def load(bot):
+    bot.add_plugin(guarded)
+
+
+def unload(bot):
+    bot.remove_plugin(guarded)
+"""
+
+
+@pytest.fixture(name="app")
+def app_fixture(tmp_path, monkeypatch):
+    (tmp_path / "lazy_plugins").mkdir()
+    (tmp_path / "lazy_plugins" / "__init__.py").write_text("")
+    (tmp_path / "lazy_plugins" / "greeter.py").write_text(_PLUGIN)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    yield RemiBot(token="token", prefix="!", banner=None, help_class=HelpCommand)
+
+    for name in [i for i in sys.modules if i.startswith("lazy_plugins")]:
+        del sys.modules[name]
+
+
+def test_stub_is_swapped_for_the_real_plugin(app):
+    stub = LazyPlugin("Greeter", "Say hello.", "lazy_plugins.greeter", [("hello", "Say hello.", False)])
+    app.add_plugin(stub)
+
+    assert isinstance(app.get_prefix_command("hello"), commands.PrefixCommand)
+    assert "lazy_plugins.greeter" not in sys.modules
+    assert app.help_command.lazy_plugin_of("hello some arguments") is stub
+    assert app.help_command.lazy_plugin_of("Greeter") is stub
+
+    async def activate_concurrently():
+        await asyncio.gather(stub.activate(app), stub.activate(app))
+
+    asyncio.run(activate_concurrently())
+
+    real = app.get_plugin("Greeter")
+    assert real is not stub and "lazy_plugins.greeter" in app.extensions
+    assert app.get_prefix_command("hello").plugin is real
+    assert app.get_slash_command("hello") is not None
+    assert app.help_command.lazy_plugin_of("hello") is None
+
+
+def test_failed_activation_keeps_the_stub(app, tmp_path):
+    (tmp_path / "lazy_plugins" / "greeter.py").write_text("def load(bot):\n    raise RuntimeError('Broken')\n")
+    evaluated = []
+    plugin_check = lightbulb.Check(lambda _: evaluated.append("plugin"))
+    stub = LazyPlugin("Greeter", "Say hello.", "lazy_plugins.greeter", [("hello", "Say hello.", True)], [plugin_check])
+    app.add_plugin(stub)
+
+    with pytest.raises(RuntimeError, match="Broken"):
+        asyncio.run(stub.activate(app))
+
+    assert isinstance(app.get_plugin("Greeter"), LazyPlugin) and app.get_plugin("Greeter") is not stub
+    assert isinstance(app.get_prefix_command("hello"), commands.PrefixCommandGroup)
+
+    # The plugin's checks were compiled away from the stub, the copy put back still has them
+    ctx = lightbulb.context.PrefixContext.__new__(lightbulb.context.PrefixContext)
+    with pytest.raises(lightbulb.CheckFailure):
+        asyncio.run(app.get_prefix_command("hello").evaluate_checks(ctx))
+    assert evaluated == ["plugin"]
+
+
+def test_stubs_carry_the_checks_read_from_the_source(app, tmp_path, monkeypatch):
+    package = tmp_path / "lazy_plugins"
+    (package / "checks.py").write_text(_CHECKS)
+    for name, check in (("guarded", "command_check"), ("local", "lightbulb.Check(lambda _: True)")):
+        (package / name).mkdir()
+        (package / name / "__init__.py").write_text(
+            _GUARDED_PLUGIN.replace("{command_check}", check, 1).replace("{name}", name)
+        )
+    monkeypatch.setattr(plg_lazy, "plugin_registry", PluginRegistry({"Test": "lazy_plugins"}))
+
+    # A check defined in the plugin itself can't be read without importing it
+    assert plg_lazy.add_lazy_plugins(app, ["lazy_plugins.guarded", "lazy_plugins.local"]) == ["lazy_plugins.local"]
+    assert isinstance(app.get_plugin("guarded"), LazyPlugin) and "lazy_plugins.guarded" not in sys.modules
+
+    ctx = lightbulb.context.PrefixContext.__new__(lightbulb.context.PrefixContext)
+    with pytest.raises(lightbulb.CheckFailure):
+        asyncio.run(app.get_prefix_command("guarded").evaluate_checks(ctx))
+
+    assert sorted(sys.modules["lazy_plugins.checks"].evaluated) == ["command", "plugin"]
+    assert not asyncio.run(HelpCommand.may_activate(ctx, app.get_plugin("guarded")))
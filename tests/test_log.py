@@ -0,0 +1,46 @@
+import logging
+
+from loguru import logger
+
+from remi.log import LogPipeline, RecordSampler
+
+
+def _record(name, level=logging.DEBUG):
+    return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+
+def test_sampler_keeps_one_in_n_per_logger():
+    sampler = RecordSampler({"hikari.gateway": 3})
+
+    kept = [sampler.filter(_record("hikari.gateway.shard")) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampler.filter(_record("hikari.gateway", logging.WARNING))
+    assert all(sampler.filter(_record("hikari.rest")) for _ in range(3))
+    assert sampler.dropped == {"hikari.gateway.shard": 4}
+
+
+def test_pipeline_logs_from_the_caller_on_its_own_thread():
+    messages = []
+    sink = logger.add(lambda message: messages.append(message.record), format="{message}")
+
+    pipeline = LogPipeline({"remi.test": 2}, maxsize=2)
+    test_logger = logging.getLogger("remi.test")
+    test_logger.addHandler(pipeline.handler)
+    test_logger.setLevel(logging.DEBUG)
+
+    try:
+        # Not started yet, only as many as the queue holds make it
+        for i in range(6):
+            test_logger.info("Record %d", i)
+        pipeline.start()
+        pipeline.stop()
+    finally:
+        test_logger.removeHandler(pipeline.handler)
+        logger.remove(sink)
+
+    assert [i["message"] for i in messages] == ["Record 0", "Record 2", "Dropped 4 log record(s) (remi.test: 4)."]
+    assert pipeline.dropped == {"remi.test": 4}
+
+    record = messages[0]
+    assert (record["name"], record["function"]) == (__name__, "test_pipeline_logs_from_the_caller_on_its_own_thread")
+    assert record["thread"].name != "MainThread"
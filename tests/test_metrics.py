@@ -0,0 +1,88 @@
+import asyncio
+import math
+import socket
+from types import SimpleNamespace
+
+import aiohttp
+import lightbulb
+import pytest
+
+from remi.core.bot import RemiBot
+from remi.core.metrics import MetricsRegistry, MetricsServer, metrics
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry("test")
+
+    commands = registry.counter("commands_total", "Commands.", ("command",))
+    commands.labels("about").inc()
+    commands.labels("about").inc()
+    commands.labels('say "hi"').inc(3)
+    assert registry.counter("commands_total", "Commands.", ("command",)) is commands
+
+    registry.gauge("latency_seconds", "Latency.").set_function(lambda: math.nan)
+
+    durations = registry.histogram("duration_seconds", "Durations.", buckets=(0.1, 1.0))
+    for i in (0.05, 0.1, 0.5, 5.0):
+        durations.observe(i)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_commands_total Commands.",
+        "# TYPE test_commands_total counter",
+        'test_commands_total{command="about"} 2.0',
+        'test_commands_total{command="say \\"hi\\""} 3.0',
+        "# HELP test_latency_seconds Latency.",
+        "# TYPE test_latency_seconds gauge",
+        "test_latency_seconds NaN",
+        "# HELP test_duration_seconds Durations.",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{le="0.1"} 2',
+        'test_duration_seconds_bucket{le="1.0"} 3',
+        'test_duration_seconds_bucket{le="+Inf"} 4',
+        "test_duration_seconds_sum 5.65",
+        "test_duration_seconds_count 4",
+    ]
+
+    with pytest.raises(ValueError):
+        registry.gauge("commands_total", "Not a gauge.")
+    with pytest.raises(ValueError):
+        commands.labels("about", "extra")
+
+
+def test_server_exposes_registry():
+    registry = MetricsRegistry("test")
+    registry.counter("requests_total", "Requests.").inc()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def scrape() -> tuple[str, str]:
+        server = MetricsServer(registry, "127.0.0.1", port)
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    return response.headers["Content-Type"], await response.text()
+        finally:
+            await server.stop()
+
+    content_type, text = asyncio.run(scrape())
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "test_requests_total 1.0" in text.splitlines()
+
+
+def test_messages_naming_no_command_are_not_timed():
+    app = RemiBot(token="token", prefix="!", banner=None, help_class=None)
+    context = SimpleNamespace(command=None, invoked_with="nope")
+
+    def sample(name):
+        return next((line for line in metrics.render().splitlines() if line.startswith(name)), None)
+
+    before = float(sample("remi_messages_without_command_total ").split()[-1])
+    with pytest.raises(lightbulb.CommandNotFound):
+        asyncio.run(app.process_prefix_commands(context))
+
+    assert float(sample("remi_messages_without_command_total ").split()[-1]) == before + 1
+    assert sample('remi_command_duration_seconds_count{command="unknown"}') is None
@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine, text
+
+from remi.db.migration import apply_migrations, get_migrations, get_schema_version
+from remi.db.schema.config import ConfigBase
+
+
+def test_migrates_legacy_database():
+    engine = create_engine("sqlite://")
+
+    with engine.begin() as conn:
+        # Database created before migrations existed, with duplicated rows
+        get_migrations()[0].upgrade(conn)
+        conn.execute(text("INSERT INTO server_prefix (guild_id, prefix) VALUES (1, '!'), (1, '?'), (2, '$')"))
+        conn.execute(
+            text("INSERT INTO staff_role (guild_id, rank, role_id) VALUES (1, 'Moderator', 5), (1, 'Moderator', 5)")
+        )
+
+        assert apply_migrations(conn) == [migration.version for migration in get_migrations()]
+        assert not apply_migrations(conn)
+        assert get_schema_version(conn) == len(get_migrations())
+
+        assert conn.execute(text("SELECT guild_id, prefix FROM server_prefix ORDER BY guild_id")).all() == [
+            (1, "!"),
+            (2, "$"),
+        ]
+        assert conn.execute(text("SELECT COUNT(*) FROM staff_role")).scalar() == 1
+
+        plan = conn.execute(text("EXPLAIN QUERY PLAN SELECT role_id FROM staff_role WHERE guild_id = 1 AND rank = 'x'"))
+        assert "uq_staff_role_guild_id_rank_role_id" in " ".join(row[-1] for row in plan)
+
+
+def test_orm_schema_matches_migrations():
+    migrated, declared = create_engine("sqlite://"), create_engine("sqlite://")
+
+    with migrated.begin() as conn:
+        apply_migrations(conn)
+    ConfigBase.metadata.create_all(declared)
+
+    def indexes(engine):
+        with engine.connect() as conn:
+            return {
+                table: {row[1] for row in conn.execute(text(f"PRAGMA index_list({table})"))}
+                for table in ("server_prefix", "staff_role")
+            }
+
+    assert indexes(migrated) == indexes(declared)
@@ -0,0 +1,151 @@
+import asyncio
+import graphlib
+import logging
+from types import SimpleNamespace
+
+import lightbulb
+import pytest
+
+from remi.core.bot import RemiBot, _load_extensions, get_prefix
+from remi.core.constant import Client
+from remi.core.exceptions import StartupStageFailed
+from remi.core.pipeline import StartupPipeline, requires_stages
+
+
+def test_stages_follow_dependencies():
+    pipeline = StartupPipeline()
+    events = []
+
+    async def record(name, delay):
+        events.append(f"{name} start")
+        await asyncio.sleep(delay)
+        events.append(f"{name} end")
+
+    @pipeline.stage("slow")
+    async def _slow(_):
+        await record("slow", 0.02)
+
+    @pipeline.stage("fast")
+    async def _fast(_):
+        await record("fast", 0.01)
+
+    @pipeline.stage("last", after=("slow", "fast"))
+    async def _last(_):
+        await record("last", 0)
+
+    async def run():
+        pipeline.start(None)
+        assert not pipeline.is_done("last")
+        await pipeline.wait_for("last")
+        return pipeline.is_done("slow", "fast", "last")
+
+    assert asyncio.run(run())
+    assert events[:2] == ["slow start", "fast start"]  # Independent stages overlap
+    assert events[2:] == ["fast end", "slow end", "last start", "last end"]
+    assert all(stage.duration is not None for stage in pipeline.stages.values())
+
+
+def test_failure_propagates():
+    pipeline = StartupPipeline()
+    ran = []
+
+    @pipeline.stage("broken")
+    async def _broken(_):
+        raise ValueError("broken")
+
+    @pipeline.stage("dependent", after=("broken",))
+    async def _dependent(_):
+        ran.append("dependent")
+
+    @pipeline.stage("independent")
+    async def _independent(_):
+        ran.append("independent")
+
+    check = requires_stages("dependent")
+    ctx = SimpleNamespace(bot=SimpleNamespace(startup=pipeline))
+
+    async def run():
+        pipeline.start(None)
+        await pipeline.wait_for("independent")
+
+        with pytest.raises(StartupStageFailed):
+            await pipeline.wait_for("dependent")
+        with pytest.raises(lightbulb.CheckFailure):
+            await check.prefix_callback(ctx)
+
+    asyncio.run(run())
+    assert ran == ["independent"]
+
+
+def test_bad_dependencies():
+    async def noop(_):
+        pass
+
+    pipeline = StartupPipeline()
+    pipeline.stage("a", after=("b",))(noop)
+    pipeline.stage("b", after=("a",))(noop)
+
+    with pytest.raises(graphlib.CycleError):
+        pipeline.start(None)
+
+    pipeline = StartupPipeline()
+    pipeline.stage("a", after=("missing",))(noop)
+
+    with pytest.raises(KeyError):
+        pipeline.start(None)
+
+
+def test_messages_are_dropped_once_plugins_failed(caplog):
+    app = RemiBot(token="token", prefix="!", banner=None, help_class=None)
+    event = SimpleNamespace(message=SimpleNamespace(content="!ping"), guild_id=None)
+
+    @app.startup.stage("plugins")
+    async def _plugins(_):
+        raise ImportError("broken")
+
+    async def run():
+        app.startup.start(app)
+        for _ in range(2):
+            await app.handle_message_create_for_prefix_commands(event)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(run())
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages.count("Startup stage 'plugins' failed, ignoring prefix commands.") == 1
+
+
+def test_default_prefixes_once_database_failed(caplog):
+    app = RemiBot(token="token", prefix="!", banner=None, help_class=None)
+    message = SimpleNamespace(guild_id=1)
+
+    @app.startup.stage("database")
+    async def _database(_):
+        raise OSError("broken")
+
+    async def run():
+        app.startup.start(app)
+        return [await get_prefix(app, message) for _ in range(2)]
+
+    with caplog.at_level(logging.ERROR):
+        assert asyncio.run(run()) == [Client.PREFIX, Client.PREFIX]
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages.count("Startup stage 'database' failed, falling back to the default prefixes.") == 1
+
+
+def test_broken_plugin_does_not_stop_the_others(caplog):
+    loaded = []
+
+    def load_extensions(load_path):
+        if load_path == "broken":
+            raise ImportError("broken")
+        loaded.append(load_path)
+
+    app = SimpleNamespace(load_extensions=load_extensions)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(_load_extensions(app, "first", "broken", "last"))
+
+    assert loaded == ["first", "last"]
+    assert [record.getMessage() for record in caplog.records] == ["Could not load plugin 'broken'."]
@@ -0,0 +1,111 @@
+import os
+import sys
+import textwrap
+
+from remi.command.core.plugin_manager.plg_scan import (
+    CommandInfo,
+    PluginInfo,
+    PluginRegistry,
+)
+
+_INIT = """
+from .{module} import {plugin}
+
+__plugin_name__ = {name}
+__plugin_description__ = {description}
+
+
+def load(bot):
+    pass
+
+
+def unload(bot):
+    pass
+"""
+
+
+def _write_plugin(directory, module="impl", plugin="plugin", name="plugin.name", description="plugin.description"):
+    directory.mkdir(exist_ok=True)
+    (directory / "__init__.py").write_text(
+        _INIT.format(module=module, plugin=plugin, name=name, description=description)
+    )
+    (directory / f"{module}.py").write_text(
+        textwrap.dedent(
+            f"""
+            import lightbulb
+
+            {plugin} = lightbulb.Plugin("{directory.name.title()}", description="About {directory.name}")
+            raise RuntimeError("Plugins must not be imported while scanning")
+            """
+        )
+    )
+
+
+def test_registry_reads_plugins_statically(tmp_path, monkeypatch):
+    package = tmp_path / "scanned_plugins"
+    package.mkdir()
+    (package / "__init__.py").write_text("raise RuntimeError('The package must not be imported either')\n")
+    _write_plugin(package / "first")
+    _write_plugin(package / "second", name='"Literal"', description='"Literal description"')
+    (package / "not_a_plugin").mkdir()
+    (package / "not_a_plugin" / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = PluginRegistry({"Test": "scanned_plugins", "Missing": "scanned_plugins_missing"})
+
+    assert registry.refresh()
+    assert not registry.refresh()
+    assert registry.by_category == {
+        "Test": {
+            "First": PluginInfo("scanned_plugins.first", "About first"),
+            "Literal": PluginInfo("scanned_plugins.second", "Literal description"),
+        },
+        "Missing": {},
+    }
+    assert not any(name.startswith("scanned_plugins") for name in sys.modules)
+
+    # Changed files are read again, removed plugins are dropped
+    init = package / "first" / "__init__.py"
+    init.write_text(init.read_text().replace("plugin.description", '"Changed"'))
+    os.utime(init, ns=(0, 0))
+    (package / "second" / "__init__.py").unlink()
+
+    assert registry.refresh()
+    assert registry.by_name == {"First": PluginInfo("scanned_plugins.first", "Changed")}
+    assert registry.get("Literal") is None
+
+
+def test_core_plugins_are_found():
+    registry = PluginRegistry({"Core": "remi.command.core"})
+    registry.refresh()
+
+    assert set(registry.by_name) == {
+        "About",
+        "Plugin Manager",
+        "Prefix Manager",
+        "Profiler",
+        "Self",
+        "Staff Role",
+    }
+
+
+def test_commands_are_read_statically():
+    registry = PluginRegistry({"Core": "remi.command.core"})
+    registry.refresh()
+
+    owner_only = ("lightbulb.checks.owner_only",)
+    assert registry.get("Self").commands == (
+        CommandInfo("ping", "Ping Remi. Dirty way to ensure she's online."),
+        CommandInfo("shutdown", "Shutdown Remi.", checks=owner_only),
+        CommandInfo("traces", "Show the slowest recently traced commands.", checks=owner_only),
+        CommandInfo("queries", "Show the statements the database spends the most time on.", checks=owner_only),
+    )
+    assert registry.get("Profiler").commands == (
+        CommandInfo("profile", "Sample what Remi's event loop spends its time on.", True),
+    )
+    assert registry.get("Staff Role").commands == (CommandInfo("staff", "Manage this server's staff roles.", True),)
+    assert registry.get("Staff Role").checks == (
+        "lightbulb.checks.guild_only",
+        "remi.core.checks.database_ready",
+        "remi.core.checks.is_administrator",
+    )
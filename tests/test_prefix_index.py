@@ -0,0 +1,34 @@
+from remi.util.prefix_index import PrefixIndex
+
+
+def test_passes_everything_until_ready():
+    index = PrefixIndex("op!")
+    assert index.may_match("hello there")
+
+    index.ready = True
+    assert not index.may_match("hello there")
+    assert (index.passed, index.rejected) == (1, 1)
+
+
+def test_matches_indexed_prefixes():
+    index = PrefixIndex("op!", "", "<@123>")
+    index.ready = True
+
+    assert index.may_match("op!ping")
+    assert index.may_match("<@123> ping")
+    assert not index.may_match("o hi")
+    assert not index.may_match("")
+
+
+def test_shared_prefixes_are_refcounted():
+    index = PrefixIndex("op!")
+    index.ready = True
+    index.add("?", "?")
+
+    index.discard("?")
+    assert index.may_match("?ping")
+
+    index.replace(["?"], ["!"])
+    assert not index.may_match("?ping")
+    assert index.may_match("!ping")
+    assert len(index) == 2
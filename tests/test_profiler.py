@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from remi.command.core.profiler.profiler import ProfilingSession
+from remi.util.profiler import SamplingProfiler
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _outer(seconds: float) -> None:
+    _busy(seconds)
+
+
+def test_samples_the_calling_thread():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    with pytest.raises(RuntimeError, match="already running"):
+        profiler.start()
+
+    _outer(0.2)
+    profile = profiler.stop()
+    assert not profiler.running
+
+    assert profile.samples > 10 and profile.duration >= 0.2
+    outer, busy = (f"{i.__name__} (test_profiler.py:{i.__code__.co_firstlineno})" for i in (_outer, _busy))
+    busy_stacks = [line for line in profile.collapsed().splitlines() if f"{outer};{busy}" in line]
+    assert busy_stacks and all(line.rsplit(" ", 1)[1].isdigit() for line in busy_stacks)
+
+    (label, own, total), *_ = profile.top(3)
+    assert label == busy and profile.samples / 2 < own <= total
+
+    table = profile.format_top(3).splitlines()
+    assert table[0].split() == ["Own", "Total", "Function"] and table[1].endswith(label)
+
+    with pytest.raises(RuntimeError, match="isn't running"):
+        profiler.stop()
+
+
+def test_stack_depth_is_capped():
+    def recurse(depth: int) -> None:
+        if depth:
+            recurse(depth - 1)
+        else:
+            _busy(0.05)
+
+    profiler = SamplingProfiler(interval=0.001, max_depth=10)
+    profiler.start()
+    recurse(50)
+    profile = profiler.stop()
+
+    assert all(len(stack) <= 10 for stack in profile.stacks)
+    assert profile.top(1)[0][0].startswith("_busy")
+
+
+def test_session_stops_once():
+    session = ProfilingSession()
+
+    async def run():
+        session.start(60, 1)
+        _busy(0.05)
+        profile, again = await asyncio.gather(session.stop(), session.stop())
+        assert profile.samples > 0 and again is None and not session.profiler.running
+
+        session.start(60, 1)
+        session.cancel()
+        assert not session.profiler.running and await session.stop() is None
+
+    asyncio.run(run())
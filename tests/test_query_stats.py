@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import sqlite3
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from remi.db.engine import instrument_engine
+from remi.db.query_stats import QueryStats, explain_query_plan, normalize_statement
+
+
+def test_statements_are_normalized():
+    assert (
+        normalize_statement("SELECT *\n FROM t WHERE a = 1 AND b = 'x''y'") == "SELECT * FROM t WHERE a = ? AND b = ?"
+    )
+    assert normalize_statement("SELECT * FROM t2 WHERE id IN (?, ?, ?)") == "SELECT * FROM t2 WHERE id IN (?...)"
+    assert normalize_statement("SELECT * FROM t2 WHERE id IN (?,?)") == "SELECT * FROM t2 WHERE id IN (?...)"
+    assert normalize_statement("INSERT INTO t VALUES (1, 'x'), (2, 'y')") == "INSERT INTO t VALUES (?...), ..."
+
+
+def test_stats_are_aggregated_per_statement():
+    stats = QueryStats(slow_threshold=0.1)
+    for i in range(1, 101):
+        stats.observe(f"SELECT * FROM t WHERE id = {i}", i / 100, 1)
+    stats.observe("DELETE FROM t", 0.5, 100)
+
+    assert not stats.is_slow(0.05) and stats.is_slow(0.1) and not QueryStats().is_slow(10)
+
+    select, delete = sorted(stats.by_statement.values(), key=lambda i: i.statement, reverse=True)
+    assert (select.statement, select.count, select.rows) == ("SELECT * FROM t WHERE id = ?", 100, 100)
+    assert (select.percentile(0.5), select.percentile(0.99)) == (0.51, 1.0)
+    assert stats.slowest(1) == [select] and stats.slowest(5) == [select, delete]
+
+
+def test_query_plan_is_explained():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+
+    assert "SCAN t" in explain_query_plan(conn, "SELECT * FROM t WHERE name = ?", ("x",))
+    assert "SEARCH t USING INTEGER PRIMARY KEY" in explain_query_plan(conn, "SELECT * FROM t WHERE id = ?", [(1,)])
+    assert explain_query_plan(conn, "PRAGMA journal_mode", ()) is None
+
+
+def test_slow_queries_are_logged_with_their_plan(tmp_path, caplog):
+    stats = QueryStats(slow_threshold=0.0)
+
+    async def run_queries():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.sqlite")
+        instrument_engine(engine, stats)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)"))
+                await conn.execute(text("INSERT INTO t (name) VALUES ('a'), ('b')"))
+                return (await conn.execute(text("SELECT id FROM t WHERE name != :name"), {"name": "c"})).all()
+        finally:
+            await engine.dispose()
+
+    with caplog.at_level(logging.WARNING):
+        assert len(asyncio.run(run_queries())) == 2
+
+    select = stats.by_statement["SELECT id FROM t WHERE name != ?"]
+    assert select.count == 1 and select.rows == 2 and "SCAN t" in select.plan
+    assert stats.by_statement["INSERT INTO t (name) VALUES (?), ..."].rows == 2
+    assert any("Slow query" in record.message and "SCAN t" in record.message for record in caplog.records)
@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import hikari
+
+from remi.core.response_memo import MemoScope, memoize_response
+
+
+class _Context:
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.responses = []
+
+    async def respond(self, *args, **kwargs):
+        self.responses.append((args, kwargs))
+
+
+def test_memoized_per_guild():
+    built = []
+
+    async def build(ctx):
+        built.append(ctx.guild_id)
+        return {"content": f"guild {ctx.guild_id}"}
+
+    callback = memoize_response(MemoScope.GUILD)(build)
+
+    async def run():
+        contexts = [_Context(1), _Context(1), _Context(2)]
+        for ctx in contexts:
+            await callback(ctx)
+        return contexts
+
+    contexts = asyncio.run(run())
+
+    assert built == [1, 2]
+    assert [ctx.responses for ctx in contexts] == [
+        [((), {"content": "guild 1"})],
+        [((), {"content": "guild 1"})],
+        [((), {"content": "guild 2"})],
+    ]
+
+
+def test_memo_ttl_invalidation_and_version():
+    built = []
+    versions = iter([1, 1, 2])
+
+    def builder(name):
+        async def build(_):
+            built.append(name)
+            return hikari.Embed(title=name)
+
+        return build
+
+    expired = memoize_response(ttl=0, invalidate_on=(hikari.OwnUserUpdateEvent,))(builder("expired"))
+    invalidated = memoize_response(invalidate_on=(hikari.OwnUserUpdateEvent,))(builder("invalidated"))
+    versioned = memoize_response(version=lambda _: next(versions))(builder("versioned"))
+
+    memo = invalidated.__response_memo__
+
+    async def run():
+        ctx = _Context(None)
+        for callback in (expired, expired, invalidated, invalidated):
+            await callback(ctx)
+        await memo.on_event(SimpleNamespace())
+        await invalidated(ctx)
+        for _ in range(3):
+            await versioned(ctx)
+        return ctx
+
+    ctx = asyncio.run(run())
+
+    assert built == ["expired", "expired", "invalidated", "invalidated", "versioned", "versioned"]
+    assert memo.invalidate_on == (hikari.OwnUserUpdateEvent,)
+    assert ctx.responses[-1][1]["embed"].title == "versioned"
+
+
+def test_built_response_is_restamped_and_concurrent_misses_share_a_build():
+    builds = []
+
+    async def build(_):
+        builds.append(None)
+        await asyncio.sleep(0.01)
+        return {"content": "data", "embed": hikari.Embed(title="data", timestamp=datetime.datetime.now().astimezone())}
+
+    callback = memoize_response()(build)
+
+    async def run():
+        contexts = [_Context(None) for _ in range(3)]
+        await asyncio.gather(*(callback(ctx) for ctx in contexts))
+        await asyncio.sleep(0.01)
+        await callback(contexts[0])
+        return contexts
+
+    first, *_ = asyncio.run(run())
+
+    assert len(builds) == 1
+    (_, earlier), (_, later) = first.responses
+    assert earlier["content"] == later["content"] and earlier["embed"].title == later["embed"].title
+    assert earlier["embed"] is not later["embed"] and earlier["embed"].timestamp < later["embed"].timestamp
@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from remi.command.core.staff_role import staff_role
+from remi.core.cache import StaffRoleSnapshot, staff_role_cache
+from remi.db.migration import apply_migrations
+
+GUILD_ID = 1
+
+
+def role(role_id):
+    return SimpleNamespace(id=role_id, mention=f"<@&{role_id}>")
+
+
+class FakeContext:
+    def __init__(self, bot=None, **options):
+        self.bot = bot
+        self.guild_id = GUILD_ID
+        self.options = SimpleNamespace(**options)
+        self.embeds = []
+
+    def get_guild(self):
+        return SimpleNamespace(name="Guild")
+
+    async def respond(self, embed):
+        self.embeds.append(embed)
+
+
+@pytest.fixture(name="run_with_db")
+def run_with_db_fixture(tmp_path, monkeypatch):
+    """Run a coroutine function against a migrated database of its own, passing it a query helper"""
+
+    def run(test):
+        async def with_engine():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/config.sqlite")
+            async with engine.begin() as conn:
+                await conn.run_sync(apply_migrations)
+            monkeypatch.setattr(staff_role, "async_config_session", sessionmaker(engine, class_=AsyncSession))
+
+            async def query(statement):
+                async with engine.connect() as conn:
+                    return (await conn.execute(text(statement))).all()
+
+            try:
+                await test(query)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(with_engine())
+
+    yield run
+    staff_role_cache.invalidate(GUILD_ID)
+
+
+def test_roles_are_set_and_removed_in_bulk(run_with_db):
+    async def test(query):
+        async def edit(rank, *role_ids, remove=False):
+            ctx = FakeContext(rank=rank, roles=[role(role_id) for role_id in role_ids])
+            await staff_role.staff_edit_handler(ctx, remove=remove)
+            return ctx.embeds[0].description.splitlines()
+
+        assert await edit("mod", 10, 11) == [
+            "\N{WHITE HEAVY CHECK MARK} <@&10> added as `Moderator`",
+            "\N{WHITE HEAVY CHECK MARK} <@&11> added as `Moderator`",
+        ]
+        assert await edit("Mod", 11, 12) == [
+            "\N{WARNING SIGN} <@&11> is already `Moderator`",
+            "\N{WHITE HEAVY CHECK MARK} <@&12> added as `Moderator`",
+        ]
+        assert await edit("admin", 10) == ["\N{WHITE HEAVY CHECK MARK} <@&10> added as `Administrator`"]
+        assert await edit("moderator", 10, 13, remove=True) == [
+            "\N{WHITE HEAVY CHECK MARK} <@&10> removed from `Moderator`",
+            "\N{WARNING SIGN} <@&13> is not `Moderator`",
+        ]
+
+        assert await query("SELECT rank, role_id FROM staff_role ORDER BY rank, role_id") == [
+            ("Administrator", 10),
+            ("Moderator", 11),
+            ("Moderator", 12),
+        ]
+
+    run_with_db(test)
+
+
+def test_unknown_rank_is_refused(run_with_db):
+    async def test(query):
+        ctx = FakeContext(rank="owner", roles=[role(10)])
+        await staff_role.staff_edit_handler(ctx)
+
+        assert ctx.embeds[0].title == "Unknown rank 'owner'!" and await query("SELECT * FROM staff_role") == []
+
+    run_with_db(test)
+
+
+def test_info_resolves_roles_once_and_prunes_deleted_ones(run_with_db):
+    fetches = []
+
+    async def fetch_roles(guild_id):
+        fetches.append(guild_id)
+        return [role(10), role(20)]
+
+    bot = SimpleNamespace(
+        cache=SimpleNamespace(get_roles_view_for_guild=lambda _: {}),
+        rest=SimpleNamespace(fetch_roles=fetch_roles),
+    )
+
+    async def test(query):
+        async with staff_role.async_config_session() as session, session.begin():
+            values = "(1, 'Moderator', 10), (1, 'Moderator', 11)"
+            await session.execute(text(f"INSERT INTO staff_role (guild_id, rank, role_id) VALUES {values}"))
+        staff_role_cache.set(GUILD_ID, StaffRoleSnapshot(moderator=frozenset((10, 11)), administrator=frozenset((20,))))
+
+        ctx = FakeContext(bot, prune=False)
+        await staff_role.staff_list.callback(ctx)
+        (moderator, administrator), footer = ctx.embeds[0].fields, ctx.embeds[0].footer.text
+        assert moderator.value == "\N{BULLET} <@&10>\n\N{BULLET} ~~`11`~~ (deleted)"
+        assert administrator.value == "\N{BULLET} <@&20>" and footer.startswith("1 role(s) no longer exist")
+        assert fetches == [GUILD_ID]
+
+        await staff_role.staff_list.callback(FakeContext(bot, prune=True))
+        await asyncio.gather(*asyncio.all_tasks() - {asyncio.current_task()})
+        assert await query("SELECT role_id FROM staff_role") == [(10,)]
+
+    run_with_db(test)
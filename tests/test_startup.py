@@ -0,0 +1,28 @@
+import importlib
+import sys
+
+import pytest
+
+from remi.startup import ImportProfiler
+
+
+def test_import_profiler(tmp_path, monkeypatch):
+    (tmp_path / "profiled_parent.py").write_text("import time\nimport profiled_child\ntime.sleep(0.01)\n")
+    (tmp_path / "profiled_child.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    with ImportProfiler() as profiler:
+        module = importlib.import_module("profiled_parent")
+
+    parent, child = profiler.timings["profiled_parent"], profiler.timings["profiled_child"]
+
+    assert profiler not in sys.meta_path
+    assert type(module.__loader__).__name__ == "SourceFileLoader"
+    assert child.self_time == child.cumulative >= 0.02
+    assert 0.01 <= parent.self_time < parent.cumulative
+    assert parent.cumulative == pytest.approx(parent.self_time + child.cumulative)
+    assert profiler.total == parent.cumulative
+    assert profiler.top(1) == [child]
+
+    for name in ("profiled_parent", "profiled_child"):
+        sys.modules.pop(name)
@@ -0,0 +1,22 @@
+import asyncio
+import gc
+import logging
+
+from remi.util.task import spawn
+
+
+def test_spawned_tasks_are_kept_alive_and_their_failures_logged(caplog):
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("Broken")
+
+    async def run():
+        spawn(fail(), name="failing task")
+        gc.collect()
+        await asyncio.sleep(0.05)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(run())
+
+    (record,) = caplog.records
+    assert record.getMessage() == "Background task 'failing task' failed" and record.exc_info[0] is ValueError
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from remi.util.tracing import (
+    Tracer,
+    set_attribute,
+    span,
+    start_span,
+    to_chrome_trace,
+    to_json_lines,
+)
+
+
+def test_unsampled_invocations_are_not_traced():
+    tracer = Tracer(sample_rate=0.0)
+
+    with tracer.trace("prefix command") as root, span("invoke") as child:
+        assert root is None and child is None
+
+    assert not tracer.traces
+    assert start_span("query") is None
+
+
+def test_spans_nest_across_tasks():
+    tracer = Tracer(sample_rate=1.0)
+
+    async def check(name):
+        with span("check", check=name):
+            await asyncio.sleep(0)
+
+    async def invoke():
+        with tracer.trace("prefix command", guild_id=1):
+            set_attribute("command", "about")
+            with span("invoke"):
+                await asyncio.gather(check("a"), check("b"))
+                query = start_span("query", statement="SELECT")
+                query.finish()
+
+    asyncio.run(invoke())
+
+    (trace,) = tracer.traces
+    assert trace.root.attributes == {"guild_id": 1, "command": "about"}
+    assert [(depth, i.name) for depth, i in trace.root.walk()] == [
+        (0, "prefix command"),
+        (1, "invoke"),
+        (2, "check"),
+        (2, "check"),
+        (2, "query"),
+    ]
+    assert all(i.end is not None for _, i in trace.root.walk())
+
+
+def test_nested_trace_is_a_span():
+    tracer = Tracer(sample_rate=1.0)
+
+    with tracer.trace("prefix command"), tracer.trace("application command"):
+        pass
+
+    (trace,) = tracer.traces
+    assert [i.name for i in trace.root.children] == ["application command"]
+
+
+def test_traces_can_be_backdated():
+    tracer = Tracer(sample_rate=1.0)
+    received = time.perf_counter() - 0.2
+    resolved = received + 0.1
+
+    with tracer.trace("prefix command", received):
+        start_span("resolve context", received).finish(resolved)
+
+    (trace,) = tracer.traces
+    (resolution,) = trace.root.children
+    assert trace.root.start == resolution.start == received and trace.duration >= 0.2
+    assert resolution.duration == pytest.approx(0.1)
+
+
+def test_errors_are_recorded():
+    tracer = Tracer(sample_rate=1.0)
+
+    with pytest.raises(ValueError), tracer.trace("prefix command"), span("invoke"):
+        raise ValueError
+
+    (trace,) = tracer.traces
+    assert trace.root.attributes["error"] == trace.root.children[0].attributes["error"] == "ValueError"
+
+
+def test_exports():
+    tracer = Tracer(sample_rate=1.0, capacity=2)
+    for name in ("first", "second", "third"):
+        with tracer.trace(name), span("invoke"):
+            pass
+
+    assert [i.root.name for i in tracer.traces] == ["second", "third"]
+    assert len(tracer.slowest(1)) == 1
+    assert [i.duration for i in tracer.slowest(2)] == sorted((i.duration for i in tracer.traces), reverse=True)
+
+    lines = [json.loads(i) for i in to_json_lines(tracer.traces).splitlines()]
+    assert [i["name"] for i in lines] == ["second", "third"]
+    assert lines[0]["children"][0]["name"] == "invoke" and lines[0]["offset_ms"] == 0
+
+    events = json.loads(to_chrome_trace(tracer.traces))["traceEvents"]
+    assert [(i["name"], i["ph"], i["tid"]) for i in events] == [
+        ("second", "X", 2),
+        ("invoke", "X", 2),
+        ("third", "X", 3),
+        ("invoke", "X", 3),
+    ]
+    assert events[0]["ts"] <= events[1]["ts"]